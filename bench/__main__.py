@@ -0,0 +1,6 @@
+"""Entry point for running the benchmark suite with ``python -m bench``."""
+import sys
+
+from bench.suite import main
+
+sys.exit(main())
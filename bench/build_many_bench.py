@@ -0,0 +1,79 @@
+"""Benchmark of :meth:`~cognate.component_core.ComponentCore.build_many`
+against constructing the same components one at a time.
+
+The benchmark is to be run from the project root directory with the command:
+  <project_root>$ python -m bench.build_many_bench [count]
+"""
+import sys
+import time
+
+from cognate.component_core import ComponentCore
+
+
+class FleetMember(ComponentCore):
+    """A component with an option of its own, as a fleet member would have."""
+
+    def __init__(self, region='us-east', **kwargs):
+        self.region = region
+
+        super().__init__(**kwargs)
+
+    def cognate_options(self, arg_parser):
+        arg_parser.add_argument('--region',
+                                default=self.region,
+                                help='The region served by the member.')
+
+
+def fleet_argv(count, distinct=8):
+    """Create argument strings for a fleet with a few distinct members.
+
+    :param count: The number of argument strings.
+    :type count: int
+    :param distinct: The number of distinct service names in the fleet.
+    :type distinct: int
+    :return: The argument strings.
+    :rtype: list<str>
+    """
+    return ['--service_name fleet-%d --log_level info' % (i % distinct)
+            for i in range(count)]
+
+
+def run(count=50000):
+    """Time individual construction and *build_many* for a fleet.
+
+    :param count: The number of components to construct.
+    :type count: int
+    :return: The elapsed seconds for each approach, and the speedup.
+    :rtype: dict
+    """
+    argv_list = fleet_argv(count)
+
+    start = time.perf_counter()
+    for argv in argv_list:
+        FleetMember(argv=argv)
+    individual = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in FleetMember.build_many(argv_list):
+        pass
+    batched = time.perf_counter() - start
+
+    return {
+        'count': count,
+        'individual_sec': individual,
+        'build_many_sec': batched,
+        'speedup': individual / batched,
+    }
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 50000
+    result = run(count)
+    print('constructed %(count)d components' % result)
+    print('  individual: %(individual_sec).3fs' % result)
+    print('  build_many: %(build_many_sec).3fs' % result)
+    print('  speedup:    %(speedup).1fx' % result)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,233 @@
+"""The benchmark cases of the suite, see :mod:`bench.suite`.
+
+Each case prepares a :class:`~bench.suite.Benchmark` whose timing is
+reported as seconds per operation.
+"""
+import argparse
+import logging
+import shutil
+import subprocess
+import sys
+import tempfile
+from os import path
+
+from bench.build_many_bench import FleetMember, fleet_argv
+from bench.suite import Benchmark, benchmark
+from cognate import configuration, log_support, metrics
+from cognate.component_core import ComponentCore, copy_attribute_values
+
+# The number of classes in the deep hierarchy of the dispatch benchmark.
+HIERARCHY_DEPTH = 25
+
+# The number of properties copied by the attribute copy benchmark.
+PROPERTY_COUNT = 1000
+
+# The project root, from which the import benchmark imports cognate.
+PROJECT_ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+
+_IMPORT_SCRIPT = ('import time\n'
+                  'start = time.perf_counter()\n'
+                  'import cognate\n'
+                  'print(time.perf_counter() - start)\n')
+
+
+@benchmark('construct.argv_list')
+def construct_argv_list():
+    argv = ['--service_name', 'fleet-0', '--log_level', 'info',
+            '--region', 'eu-west']
+    return Benchmark(lambda: FleetMember(argv=argv), number=2000)
+
+
+@benchmark('construct.argv_string')
+def construct_argv_string():
+    argv = '--service_name fleet-0 --log_level info --region eu-west'
+    return Benchmark(lambda: FleetMember(argv=argv), number=2000)
+
+
+@benchmark('construct.argv_string_uncached')
+def construct_argv_string_uncached():
+    argv = '--service_name fleet-0 --log_level info --region eu-west'
+    cache = configuration.resolution_cache()
+    cache.enabled = False
+
+    def teardown():
+        cache.enabled = True
+
+    return Benchmark(lambda: FleetMember(argv=argv), number=2000,
+                     teardown=teardown)
+
+
+class CompiledFleetMember(FleetMember):
+    """A fleet member whose arguments are parsed by the compiled parser."""
+    COMPILED_PARSER = True
+
+
+@benchmark('construct.argv_compiled_uncached')
+def construct_argv_compiled_uncached():
+    argv = '--service_name fleet-0 --log_level info --region eu-west'
+    cache = configuration.resolution_cache()
+    cache.enabled = False
+
+    def teardown():
+        cache.enabled = True
+
+    return Benchmark(lambda: CompiledFleetMember(argv=argv), number=2000,
+                     teardown=teardown)
+
+
+@benchmark('construct.kwargs')
+def construct_kwargs():
+    return Benchmark(lambda: FleetMember(service_name='fleet-0',
+                                         log_level='info',
+                                         region='eu-west'),
+                     number=2000)
+
+
+@benchmark('construct.config_file')
+def construct_config_file():
+    config_dir = tempfile.mkdtemp(prefix='cognate_bench_')
+    config_path = path.join(config_dir, 'fleet.ini')
+    with open(config_path, 'w') as config_file:
+        config_file.write('[DEFAULT]\nlog_level = info\nregion = eu-west\n')
+
+    return Benchmark(lambda: FleetMember(config=config_path), number=2000,
+                     teardown=lambda: shutil.rmtree(config_dir,
+                                                    ignore_errors=True))
+
+
+@benchmark('construct.build_many')
+def construct_build_many():
+    argv_list = fleet_argv(1000)
+
+    def build():
+        for _ in FleetMember.build_many(argv_list):
+            pass
+
+    return Benchmark(build, number=2, ops=len(argv_list))
+
+
+@benchmark('dispatch.deep_hierarchy')
+def dispatch_deep_hierarchy():
+    def bench_hook(self, value):
+        self.hook_calls += value
+
+    cls = ComponentCore
+    for depth in range(HIERARCHY_DEPTH):
+        cls = type('Level%d' % depth, (cls,), {'bench_hook': bench_hook})
+    component = cls()
+    component.hook_calls = 0
+
+    return Benchmark(lambda: component.invoke_method_on_children(
+        'bench_hook', value=1), number=10000)
+
+
+@benchmark('copy.attribute_values')
+def copy_attributes():
+    names = ['property_%d' % i for i in range(PROPERTY_COUNT)]
+    source = argparse.Namespace(**dict((name, 1) for name in names))
+    target = argparse.Namespace()
+
+    return Benchmark(lambda: copy_attribute_values(source, target, names),
+                     number=200, ops=PROPERTY_COUNT)
+
+
+@benchmark('copy.copy_plan')
+def copy_plan():
+    names = ['property_%d' % i for i in range(PROPERTY_COUNT)]
+    source = argparse.Namespace(**dict((name, 1) for name in names))
+    target = argparse.Namespace()
+    plan = configuration.CopyPlan(names)
+
+    return Benchmark(lambda: plan(source, target), number=200,
+                     ops=PROPERTY_COUNT)
+
+
+def _logging_benchmark(**kwargs):
+    """Prepare a benchmark of the log output of a configured component.
+
+    :param kwargs: The log options of the component.
+    :type kwargs: dict
+    :return: A benchmark of a single log call.
+    :rtype: Benchmark
+    """
+    log_dir = tempfile.mkdtemp(prefix='cognate_bench_')
+    component = ComponentCore(service_name='BenchLog',
+                              log_level='info',
+                              log_path=log_dir,
+                              **kwargs)
+    log = component.log
+    log.propagate = False
+
+    def teardown():
+        component.close()
+        log_support.stop_async_logging()
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+    return Benchmark(lambda: log.info('Served request %d in %.3fs', 42, 0.25),
+                     number=20000, teardown=teardown)
+
+
+@benchmark('logging.disabled_level')
+def logging_disabled_level():
+    log = logging.getLogger('BenchLogDisabled')
+    log.setLevel(logging.ERROR)
+    return Benchmark(lambda: log.debug('Served request %d', 42),
+                     number=100000)
+
+
+@benchmark('logging.file')
+def logging_file():
+    return _logging_benchmark()
+
+
+@benchmark('logging.file_json')
+def logging_file_json():
+    return _logging_benchmark(log_format='json')
+
+
+@benchmark('logging.buffered_file')
+def logging_buffered_file():
+    return _logging_benchmark(log_buffer_size=1000)
+
+
+@benchmark('logging.async_file')
+def logging_async_file():
+    return _logging_benchmark(log_async=True, log_queue_size=100000)
+
+
+@benchmark('logging.rate_limited')
+def logging_rate_limited():
+    return _logging_benchmark(log_rate_limit=0.001)
+
+
+@benchmark('metrics.counter_inc')
+def metrics_counter_inc():
+    counter = metrics.Counter('bench_total')
+    return Benchmark(counter.inc, number=100000)
+
+
+@benchmark('metrics.histogram_observe')
+def metrics_histogram_observe():
+    histogram = metrics.Histogram('bench_seconds')
+    return Benchmark(lambda: histogram.observe(0.0002), number=100000)
+
+
+class _ImportBenchmark(Benchmark):
+    """Times the import of cognate in a fresh interpreter."""
+
+    def __init__(self):
+        super().__init__(None, number=1)
+
+    def measure(self, repeat):
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.check_output([sys.executable, '-c',
+                                              _IMPORT_SCRIPT],
+                                             cwd=PROJECT_ROOT)
+            runs.append(float(output))
+        return runs
+
+
+@benchmark('import.cognate')
+def import_cognate():
+    return _ImportBenchmark()
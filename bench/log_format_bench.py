@@ -0,0 +1,65 @@
+"""Benchmark of the per record cost of the JSON log formatter against the
+text log formatter of :class:`~cognate.component_core.ComponentCore`.
+
+The benchmark is to be run from the project root directory with the command:
+  <project_root>$ python -m bench.log_format_bench [count]
+"""
+import logging
+import sys
+import time
+
+from cognate import log_support
+from cognate.component_core import ComponentCore
+
+
+def format_records(formatter, count):
+    """Time the formatting of a stream of records.
+
+    :param formatter: The formatter to time.
+    :type formatter: logging.Formatter
+    :param count: The number of records to format.
+    :type count: int
+    :return: The elapsed seconds.
+    :rtype: float
+    """
+    records = [logging.LogRecord('BenchService', logging.INFO, __file__, 1,
+                                 'Served request %d in %.3fs', (i, 0.25), None)
+               for i in range(count)]
+
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return time.perf_counter() - start
+
+
+def run(count=200000):
+    """Time the text and JSON formatters for the same records.
+
+    :param count: The number of records to format.
+    :type count: int
+    :return: The elapsed seconds for each formatter, and the speedup.
+    :rtype: dict
+    """
+    text = format_records(ComponentCore.LOG_FORMATTER, count)
+    json_sec = format_records(log_support.json_formatter('BenchService'),
+                              count)
+
+    return {
+        'count': count,
+        'text_sec': text,
+        'json_sec': json_sec,
+        'speedup': text / json_sec,
+    }
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 200000
+    result = run(count)
+    print('formatted %(count)d records' % result)
+    print('  text:    %(text_sec).3fs' % result)
+    print('  json:    %(json_sec).3fs' % result)
+    print('  speedup: %(speedup).2fx' % result)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,81 @@
+"""Benchmark of the memory held by each component instance, with and without
+slotted options, as measured by *tracemalloc*.
+
+The benchmark is to be run from the project root directory with the command:
+  <project_root>$ python -m bench.memory_bench [count]
+"""
+import gc
+import sys
+import tracemalloc
+
+from bench.build_many_bench import FleetMember
+
+
+class SlottedFleetMember(FleetMember):
+    """A fleet member with its options held in slots."""
+    SLOTTED_OPTIONS = True
+
+
+def instance_memory(cls, count):
+    """Measure the memory allocated for each instance of a component class.
+
+    :param cls: The component class.
+    :type cls: type
+    :param count: The number of instances to construct.
+    :type count: int
+    :return: The bytes allocated per instance.
+    :rtype: float
+
+    Instances are constructed before measuring, so that the class template,
+    loggers and other shared state are excluded from the measure. The
+    instances share a few distinct service names, as a fleet would.
+    """
+    warm = [cls(service_name='fleet-%d' % (i % 8)) for i in range(16)]
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        instances = [cls(service_name='fleet-%d' % (i % 8))
+                     for i in range(count)]
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocated = sum(stat.size_diff
+                    for stat in after.compare_to(before, 'filename'))
+    del instances, warm
+    return allocated / count
+
+
+def run(count=10000):
+    """Measure the memory per instance of default and slotted components.
+
+    :param count: The number of components to construct of each class.
+    :type count: int
+    :return: The bytes per instance of each class, and the saving.
+    :rtype: dict
+    """
+    default = instance_memory(FleetMember, count)
+    slotted = instance_memory(SlottedFleetMember, count)
+
+    return {
+        'count': count,
+        'default_bytes': default,
+        'slotted_bytes': slotted,
+        'saving': 1 - slotted / default,
+    }
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 10000
+    result = run(count)
+    print('constructed %(count)d components of each class' % result)
+    print('  default: %(default_bytes).0f bytes per instance' % result)
+    print('  slotted: %(slotted_bytes).0f bytes per instance' % result)
+    print('  saving:  %.0f%%' % (result['saving'] * 100))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,146 @@
+"""Benchmark of the overhead of the sampling profiler on a busy process.
+
+The overhead is measured in two ways. The cost of a single sample is timed
+directly, for threads parked at a typical stack depth, which gives the
+fraction of the process time, under the GIL, taken by sampling at a rate.
+The run time of a fixed workload is also compared with and without sampling,
+which includes the effects of thread switches, though it is subject to the
+noise of the machine.
+
+The benchmark is to be run from the project root directory with the command:
+  <project_root>$ python -m bench.sampling_bench [hz] [threads]
+"""
+import sys
+import threading
+import time
+
+from bench.build_many_bench import FleetMember
+from cognate import profiling
+
+# The number of component constructions of each workload thread.
+WORKLOAD_SIZE = 4000
+
+# The stack depth of the threads sampled by the sample cost benchmark.
+STACK_DEPTH = 30
+
+
+def workload(threads):
+    """Construct components in a number of threads, as a busy process would.
+
+    :param threads: The number of threads constructing components.
+    :type threads: int
+    :return: The elapsed seconds.
+    :rtype: float
+    """
+    def construct():
+        for index in range(WORKLOAD_SIZE):
+            FleetMember(argv=['--service_name', 'fleet-%d' % (index % 8),
+                              '--region', 'eu-west'])
+
+    workers = [threading.Thread(target=construct) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def sample_cost(threads, depth=STACK_DEPTH, count=2000):
+    """Time a single sample of the stacks of parked threads.
+
+    :param threads: The number of threads, besides the calling thread.
+    :type threads: int
+    :param depth: The stack depth of each thread.
+    :type depth: int
+    :param count: The number of samples to time.
+    :type count: int
+    :return: The seconds per sample.
+    :rtype: float
+    """
+    release = threading.Event()
+    parked = threading.Barrier(threads + 1)
+
+    def park(remaining):
+        if remaining:
+            park(remaining - 1)
+        else:
+            parked.wait()
+            release.wait()
+
+    workers = [threading.Thread(target=park, args=(depth,))
+               for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    parked.wait()
+    try:
+        profiler = profiling.SamplingProfiler()
+        start = time.perf_counter()
+        for _ in range(count):
+            profiler.sample()
+        return (time.perf_counter() - start) / count
+    finally:
+        release.set()
+        for worker in workers:
+            worker.join()
+
+
+def run(hz=100, threads=4, repeat=5):
+    """Time the workload with and without the sampling profiler.
+
+    :param hz: The samples per second of the profiler.
+    :type hz: float
+    :param threads: The number of workload threads.
+    :type threads: int
+    :param repeat: The number of timed runs of each configuration, of which
+        the best is reported. The runs of the configurations alternate.
+    :type repeat: int
+    :return: The seconds per sample and the overhead of sampling at *hz*,
+        along with the best seconds of each configuration of the workload,
+        the samples taken and the workload overhead.
+    :rtype: dict
+    """
+    per_sample = sample_cost(threads)
+
+    workload(threads)  # warm up the class template and loggers
+
+    # the configurations alternate, so that drift affects both alike
+    profiler = profiling.sampling_profiler()
+    profiler.clear()
+    baseline = sampled = float('inf')
+    for _ in range(repeat):
+        baseline = min(baseline, workload(threads))
+
+        sampled_component = FleetMember(service_name='sampler',
+                                        profile_sample_hz=hz)
+        try:
+            sampled = min(sampled, workload(threads))
+        finally:
+            sampled_component.close()
+
+    return {
+        'hz': hz,
+        'threads': threads,
+        'sample_sec': per_sample,
+        'sample_overhead': per_sample * hz,
+        'baseline_sec': baseline,
+        'sampled_sec': sampled,
+        'samples': profiler.samples,
+        'workload_overhead': sampled / baseline - 1,
+    }
+
+
+def main(argv):
+    hz = float(argv[1]) if len(argv) > 1 else 100
+    threads = int(argv[2]) if len(argv) > 2 else 4
+    result = run(hz, threads)
+    print('%(threads)d threads sampled at %(hz)g Hz' % result)
+    print('  per sample: %.1f us, overhead %.3f%%' % (
+        result['sample_sec'] * 1e6, result['sample_overhead'] * 100))
+    print('  workload:   %(baseline_sec).3f s, sampled %(sampled_sec).3f s '
+          '(%(samples)d samples)' % result)
+    print('  overhead:   %.2f%%' % (result['workload_overhead'] * 100))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,242 @@
+"""The benchmark suite runner, with JSON result output and a comparison of
+results against a baseline.
+
+The suite is to be run from the project root directory with the commands:
+  <project_root>$ python -m bench run [--output RESULTS] [--filter PATTERN]
+  <project_root>$ python -m bench compare BASELINE [RESULTS] [--threshold N]
+
+The *run* command prints a result table, and writes the results as JSON when
+given an *--output* path. The *compare* command compares the results against
+a baseline results file, running the suite if no results file is given. It
+exits with a status of 1 if any benchmark is slower than the baseline by more
+than the threshold fraction.
+"""
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from os import path
+
+# The benchmarks registered with the suite, in registration order.
+_BENCHMARKS = []
+
+# The default fraction a benchmark may slow down before it is a regression.
+DEFAULT_THRESHOLD = 0.10
+
+
+class Benchmark(object):
+    """A timed operation prepared by a benchmark case.
+
+    :param func: The operation to time, called without arguments.
+    :type func: callable
+    :param number: The number of calls timed together in a single run.
+    :type number: int
+    :param ops: The number of operations performed by each call.
+    :type ops: int
+    :param teardown: A callable to release the resources of the benchmark.
+    :type teardown: callable
+    """
+
+    def __init__(self, func, number=1000, ops=1, teardown=None):
+        self.func = func
+        self.number = number
+        self.ops = ops
+        self.teardown = teardown
+
+    def measure(self, repeat):
+        """Time the operation.
+
+        :param repeat: The number of timed runs.
+        :type repeat: int
+        :return: The seconds per operation of each run.
+        :rtype: list<float>
+        """
+        try:
+            self.func()  # warm up caches before timing
+            timer = timeit.Timer(self.func, timer=time.perf_counter)
+            runs = timer.repeat(repeat=repeat, number=self.number)
+        finally:
+            if self.teardown is not None:
+                self.teardown()
+        return [run / (self.number * self.ops) for run in runs]
+
+
+def benchmark(name):
+    """Register a benchmark case with the suite.
+
+    :param name: The name of the benchmark, unique within the suite.
+    :type name: str
+    :return: A decorator for a function that prepares a
+        :class:`Benchmark`.
+    :rtype: callable
+    """
+
+    def register(setup):
+        _BENCHMARKS.append((name, setup))
+        return setup
+
+    return register
+
+
+def run_suite(pattern='*', repeat=5, out=sys.stdout):
+    """Run the benchmarks with names matching a pattern.
+
+    :param pattern: A shell style pattern of benchmark names.
+    :type pattern: str
+    :param repeat: The number of timed runs of each benchmark.
+    :type repeat: int
+    :param out: The stream to report progress on, None for silence.
+    :type out: file
+    :return: The results of the run.
+    :rtype: dict
+    """
+    from bench import cases  # pylint: disable=unused-import,import-outside-toplevel
+
+    results = {}
+    for name, setup in _BENCHMARKS:
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        runs = setup().measure(repeat)
+        results[name] = {
+            'best_sec': min(runs),
+            'median_sec': statistics.median(runs),
+            'repeat': repeat,
+        }
+        if out is not None:
+            out.write('%-40s %s\n' % (name, _format_seconds(min(runs))))
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cognate_version': _cognate_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Compare the results of a run against a baseline run.
+
+    :param baseline: The baseline results.
+    :type baseline: dict
+    :param current: The results to compare.
+    :type current: dict
+    :param threshold: The fraction a benchmark may slow down before it is
+        reported as a regression.
+    :type threshold: float
+    :return: The name, baseline seconds, current seconds, ratio and
+        regression flag of each benchmark present in both runs.
+    :rtype: list<tuple>
+    """
+    comparison = []
+    baseline_results = baseline['results']
+    for name, result in current['results'].items():
+        if name not in baseline_results:
+            continue
+        before = baseline_results[name]['best_sec']
+        after = result['best_sec']
+        ratio = after / before
+        comparison.append((name, before, after, ratio, ratio > 1 + threshold))
+    return comparison
+
+
+def _cognate_version():
+    version_path = path.join(path.dirname(path.dirname(__file__)), 'VERSION')
+    try:
+        with open(version_path) as version_file:
+            return version_file.read().strip()
+    except IOError:
+        return None
+
+
+def _format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return '%8.2f %s' % (seconds / scale, unit)
+    return '%8.2f ns' % (seconds / 1e-9)
+
+
+def _read_results(results_path):
+    with open(results_path) as results_file:
+        return json.load(results_file)
+
+
+def _write_results(results, results_path):
+    with open(results_path, 'w') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+        results_file.write('\n')
+
+
+def _run_command(args):
+    results = run_suite(args.filter, args.repeat)
+    if args.output:
+        _write_results(results, args.output)
+    return 0
+
+
+def _compare_command(args):
+    baseline = _read_results(args.baseline)
+    if args.results:
+        current = _read_results(args.results)
+    else:
+        current = run_suite(args.filter, args.repeat)
+        if args.output:
+            _write_results(current, args.output)
+
+    regressions = 0
+    print('%-40s %11s %11s %7s' % ('benchmark', 'baseline', 'current',
+                                   'ratio'))
+    for name, before, after, ratio, regressed in compare_results(
+            baseline, current, args.threshold):
+        print('%-40s %s %s %6.2fx%s' % (name,
+                                        _format_seconds(before),
+                                        _format_seconds(after),
+                                        ratio,
+                                        '  REGRESSION' if regressed else ''))
+        regressions += regressed
+
+    return 1 if regressions else 0
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m bench',
+        description='Run the cognate benchmark suite.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks.')
+    compare_parser = commands.add_parser(
+        'compare', help='Compare benchmark results against a baseline.')
+    compare_parser.add_argument('baseline',
+                                help='The baseline results file.')
+    compare_parser.add_argument('results', nargs='?',
+                                help='The results file to compare, the suite '
+                                     'is run if not given.')
+    compare_parser.add_argument('--threshold', type=float,
+                                default=DEFAULT_THRESHOLD,
+                                help='The fraction a benchmark may slow down '
+                                     'before it is a regression.')
+
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--output',
+                                    help='Write the results to this file.')
+        command_parser.add_argument('--filter', default='*',
+                                    help='Run only the benchmarks with names '
+                                         'matching this pattern.')
+        command_parser.add_argument('--repeat', type=int, default=5,
+                                    help='The number of timed runs of each '
+                                         'benchmark.')
+    run_parser.set_defaults(handler=_run_command)
+    compare_parser.set_defaults(handler=_compare_command)
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,22 @@
+#!/usr/bin/env bash
+set -x
+###########################################################
+### Script to execute the benchmark suite.
+###########################################################
+#
+# This script is to be run from the project root directory with the command:
+#   <project_root>$ bin/run_bench.sh [BASELINE]
+#
+# The command will write the benchmark results to the file
+# <project_root>/BUILD/BENCH/results.json. If a BASELINE results file is
+# given, the results are compared against it, and the script exits with a
+# non zero status on a regression.
+#
+
+mkdir -p BUILD/BENCH
+
+if [ -n "$1" ]; then
+  python -m bench compare "$1" --output BUILD/BENCH/results.json
+else
+  python -m bench run --output BUILD/BENCH/results.json
+fi
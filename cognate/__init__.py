@@ -17,6 +17,14 @@ To get up and running the following topics will be covered:
 
     - :ref:`dynamic_service_naming`
 
+    - :ref:`component_lifecycle`
+
+    - :ref:`worker_processes`
+
+    - :ref:`startup_profiling`
+
+    - :ref:`component_metrics`
+
 The intent is for *ComponentCore* to make life easier in the implementation
 of stand alone applications. The hope is to take some common service
 requirements and make the expression of those requirements trivial.
@@ -139,7 +147,8 @@ The basic call sequence is depicted in the image below.
 use of the
 :meth:`~component_core.ComponentCore.invoke_method_on_children`.
 This effectively calls the *cognate_options* and *cognate_configure* methods
-on all primary base classes that derive from *ComponentCore*.
+on all base classes, including mixin classes, that make up a *ComponentCore*
+derived class.
 
 *ComponentCore* helps out with configuration management and initialization of
 runtime services. it does this by creating a configuration loop. Utilizing the
@@ -162,6 +171,48 @@ This allows for the centralization of common options and the attending code.
 For more detail on this feature, be sure to check out
 :meth:`~ComponentCore._execute_configuration`.
 
+.. _configuration_files:
+
+Configuration Files
+--------------------
+
+Option values may also be read from a JSON or INI file, named with the
+'--config <path>' option or the *config* keyword argument. The values in the
+file replace the option defaults, and options given on the command line take
+precedence over the file::
+
+  python example/hola_mundo.py --config hola.ini --lang French
+
+Values may be given for all services, or for a single service name. See
+:mod:`cognate.configuration` for the file layout.
+
+.. _environment_variables:
+
+Environment Variables
+----------------------
+
+Option values may also be set with environment variables of the form
+'COGNATE_<SERVICE>_<OPTION>', such as::
+
+  COGNATE_HOLAMUNDO_LANG=French python example/hola_mundo.py
+
+The sources of option values take precedence in the order of option
+defaults, configuration file, environment variables and command line
+arguments. The environment is read once per process, see
+:func:`cognate.configuration.environment_snapshot`.
+
+.. _configuration_reload:
+
+Configuration Reload
+---------------------
+
+A service started with the '--config_reload' option applies changes to its
+configuration file without a restart. The configuration is reloaded when the
+process receives a SIGHUP signal, and when the configuration file changes,
+as checked every '--config_poll_interval' seconds. The changed options are
+applied with :meth:`~cognate.component_core.ComponentCore.reconfigure`, and
+logged.
+
 .. _logging_and_log_configuration:
 
 Logging and Log Configuration
@@ -187,6 +238,54 @@ The configuration logging options are:
 
     Enable verbose log output to console. Useful for debugging.
 
+  :arg: --log_async
+
+    Write log output from a background thread. See
+    :mod:`cognate.log_support`.
+
+  :arg: --log_queue_size LOG_QUEUE_SIZE
+
+    The maximum number of records held for the background log thread.
+
+  :arg: --log_queue_policy {block,drop}
+
+    Block or drop log records when the log queue is full.
+
+  :arg: --log_buffer_size LOG_BUFFER_SIZE
+
+    Buffer up to this many records before writing to the log file. Records of
+    level ERROR and above are written immediately. The default of 0 disables
+    buffering.
+
+  :arg: --log_flush_interval LOG_FLUSH_INTERVAL
+
+    The maximum seconds a record is held in the log file buffer.
+
+  :arg: --log_lazy
+
+    Configure logging on the first use of `self.log`, rather than during
+    initialization.
+
+  :arg: --log_format {text,json}
+
+    The format of the log output. The 'json' format writes one JSON object
+    per record, see :mod:`cognate.log_support`.
+
+  :arg: --log_rate_limit LOG_RATE_LIMIT
+
+    The records per second allowed for each log message and level. Records
+    over the limit are suppressed and counted in a periodic summary record.
+    The default of 0 disables rate limiting.
+
+  :arg: --log_rate_burst LOG_RATE_BURST
+
+    The records allowed in a burst for each log message and level. The
+    default of 0 allows a burst of the rate limit.
+
+  :arg: --log_sample_rate LOG_SAMPLE_RATE
+
+    The fraction of debug and info records that are logged.
+
 *ComponentCore* log configuration takes advantage of the
 :ref:`dynamic_service_naming` for log file naming, as well as in log name
 output.
@@ -223,8 +322,134 @@ classes that take advantage of *ComponentCore* dynamic naming.
 Child classes of ComponentCore can access the configured service app name
 through
 `self.service_name`.
+
+.. _component_lifecycle:
+
+Component Lifecycle
+====================
+
+In addition to the configuration hooks, classes sharing a base class chain
+with *ComponentCore* may implement *cognate_start(self)* and
+*cognate_stop(self)* hooks. The hooks are invoked by
+:meth:`~cognate.component_core.ComponentCore.start` and
+:meth:`~cognate.component_core.ComponentCore.stop`, with the stop hooks
+invoked in the reverse order of the start hooks.
+
+A service built of several components may declare the dependencies among its
+components with a :class:`~cognate.component_group.ComponentGroup`. The group
+starts each component once the components it depends on have started, with
+independent components started concurrently, and stops the components in the
+reverse order::
+
+    group = ComponentGroup()
+    group.add(store)
+    group.add(cache, depends_on=[store])
+    group.add(api, depends_on=[store, cache])
+    with group:
+        api.serve()
+
+An *asyncio* based service may derive its components from
+:class:`~cognate.async_component.AsyncComponentCore`, whose hooks may be
+coroutines. The components are created with the
+:meth:`~cognate.async_component.AsyncComponentCore.create` and
+:meth:`~cognate.async_component.AsyncComponentCore.create_many` coroutines,
+which configure many components concurrently under one event loop. The
+module, which loads *asyncio*, is imported explicitly::
+
+    from cognate.async_component import AsyncComponentCore
+
+    stores = await Store.create_many(['--service_name store-1',
+                                      '--service_name store-2'])
+
+.. _worker_processes:
+
+Worker Processes
+=================
+
+A service may make use of more than one processor core by running in worker
+processes, with the :class:`~cognate.prefork.PreforkRunner`. The component is
+configured once, and the runner forks the number of worker processes given
+by the '--workers' option, each with a service name of the form
+'<service_name>-<index>', and a log file of its own. A worker that fails is
+restarted.
+
+  :arg: --workers WORKERS
+
+    The number of worker processes, 0 to run the component in process.
+
+  :arg: --gc_freeze
+
+    Freeze the garbage collector before forking the worker processes, so that
+    the memory of the configured component is shared by the workers.
+
+.. _startup_profiling:
+
+Startup Profiling
+==================
+
+A service that is slow to start may be constructed with the
+'--profile_startup' option, which records the time spent in each phase of
+the configuration, and in the hooks of each class, as the *startup_profile*
+of the service. The profile is also logged at the debug level::
+
+  python example/hola_mundo.py --profile_startup --log_level debug --verbose
+
+  :arg: --profile_startup
+
+    Record a :class:`~cognate.profiling.StartupProfile` of the configuration.
+
+A running service may also be profiled with the '--profile_sample_hz'
+option, which samples the stacks of the threads of the process, and writes
+the counts of the stacks for flame graph tools on SIGUSR1, on close, and at
+exit, see :class:`~cognate.profiling.SamplingProfiler`::
+
+  python example/hola_mundo.py --profile_sample_hz 100 --log_path /tmp
+
+  :arg: --profile_sample_hz PROFILE_SAMPLE_HZ
+
+    The rate, in samples per second, of the sampling profiler. The default of
+    0 disables sampling.
+
+.. _component_metrics:
+
+Component Metrics
+==================
+
+Each component holds a :class:`~cognate.metrics.MetricsRegistry` as
+`self.metrics`, for the counters, gauges and latency histograms of the
+component. Updates are accumulated per thread, so that they remain cheap
+under contention, and are merged when a snapshot is taken::
+
+    self.metrics.counter('greetings_total').inc()
+    with self.metrics.histogram('greet_seconds').time():
+        greeting = self.greet(name)
+    self.metrics.snapshot()
+
+The time taken by the construction of the component, and by each log output,
+is recorded without further code with the '--metrics_timing' option. The
+metrics may be served in the Prometheus text format on a local port::
+
+  python example/hola_mundo.py --metrics_timing --metrics_port 9100
+
+  :arg: --metrics_timing
+
+    Record the time taken by the construction and by each log output of the
+    component. The default is False.
+
+  :arg: --metrics_port METRICS_PORT
+
+    The local port serving the metrics at '/metrics'. The default of 0
+    disables serving. See :mod:`cognate.metrics`.
 """
-from cognate import component_core
+from cognate import component_core, component_group, metrics, prefork, \
+    profiling
 from cognate.component_core import ComponentCore
-
-__all__ = ['ComponentCore', 'component_core']
+from cognate.component_group import ComponentGroup
+from cognate.metrics import MetricsRegistry
+from cognate.prefork import PreforkRunner
+from cognate.profiling import SamplingProfiler, StartupProfile
+
+__all__ = ['ComponentCore', 'ComponentGroup', 'MetricsRegistry',
+           'PreforkRunner', 'SamplingProfiler', 'StartupProfile',
+           'component_core', 'component_group', 'metrics', 'prefork',
+           'profiling']
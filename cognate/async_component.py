@@ -0,0 +1,184 @@
+"""The *AsyncComponentCore* class provides the configuration services of
+:class:`~cognate.component_core.ComponentCore` to *asyncio* based components,
+whose hooks may be coroutines.
+
+The *cognate_configure*, *cognate_start* and *cognate_stop* hooks of an
+*AsyncComponentCore* class hierarchy may be plain methods or coroutines. The
+hooks of a component are awaited one after the other, in the order of the
+class hierarchy, while the hooks of different components run concurrently
+under the event loop.
+
+>>> import asyncio
+>>> class Store(AsyncComponentCore):
+...     async def cognate_configure(self, args):
+...         await asyncio.sleep(0)  # open connections, load data, ...
+...         self.ready = True
+>>> async def main():
+...     stores = await Store.create_many(
+...         ['--service_name store-%d' % i for i in range(3)])
+...     return [(store.service_name, store.ready) for store in stores]
+>>> loop = asyncio.new_event_loop()
+>>> loop.run_until_complete(main())
+[('store-0', True), ('store-1', True), ('store-2', True)]
+>>> loop.close()
+"""
+import asyncio
+import functools
+import inspect
+import time
+
+from cognate.component_core import ComponentCore
+
+
+class AsyncComponentCore(ComponentCore):
+    """A *ComponentCore* whose hooks may be coroutines.
+
+    Instances are created with the :meth:`~AsyncComponentCore.create` and
+    :meth:`~AsyncComponentCore.create_many` coroutines. An instance that is
+    constructed directly has its options resolved and assigned, but its
+    *cognate_configure* hooks are not invoked until
+    :meth:`~AsyncComponentCore.configure` is awaited.
+
+    The log is configured by the *cognate_configure* hook of
+    *ComponentCore*, which opens the log files. The hook is run in the default
+    executor of the event loop, so that the loop is not blocked.
+
+    .. note:: Reconfiguration is synchronous.
+
+    The :meth:`~cognate.component_core.ComponentCore.reconfigure` method, and
+    the configuration reload, invoke the *cognate_configure* hooks without an
+    event loop. A coroutine hook can not be invoked in that way, and raises a
+    *ValueError*, in which case the previous option values are restored.
+    """
+
+    def _execute_configuration(self, argv):
+        # the cognate_configure hooks are awaited by configure
+        self._cognate_pending_args = self._prepare_configuration(argv)
+
+    @classmethod
+    async def create(cls, *args, **kwargs):
+        """Construct and configure an instance of the class.
+
+        :param args: The positional arguments of the class construction.
+        :type args: list
+        :param kwargs: The keyword arguments of the class construction.
+        :type kwargs: dict
+        :return: The configured instance.
+        :rtype: AsyncComponentCore
+        """
+        component = cls(*args, **kwargs)
+        await component.configure()
+        return component
+
+    @classmethod
+    async def create_many(cls, argv_list, **kwargs):
+        """Construct and configure an instance of the class for each
+        argument list, with the instances configured concurrently.
+
+        :param argv_list: An iterable of argument lists or argument strings,
+            one per instance to construct.
+        :type argv_list: list<str>, list<list<str>>
+        :param kwargs: The keyword arguments passed to every instance
+            construction.
+        :type kwargs: dict
+        :return: The configured instances, in the order of *argv_list*.
+        :rtype: list<AsyncComponentCore>
+
+        The instances are constructed and configured as with
+        :meth:`~cognate.component_core.ComponentCore.build_many`, sharing the
+        resolution of identical argument lists, and the logger of identical
+        service names and log options.
+        """
+        components = list(cls._build_batch(argv_list, kwargs))
+        try:
+            await asyncio.gather(*[component.configure()
+                                   for component in components])
+        finally:
+            for component in components:
+                del component._cognate_batch
+        return components
+
+    async def configure(self):
+        """Await the *cognate_configure* hooks of the instance.
+
+        :return: None
+
+        The hooks are awaited once, subsequent calls return immediately.
+        """
+        args = getattr(self, '_cognate_pending_args', None)
+        if args is None:
+            return
+        del self._cognate_pending_args
+
+        await self._await_hooks(self._dispatch_table('cognate_configure'),
+                                args=args)
+        if self.startup_profile is not None:
+            self.startup_profile.mark('configure')
+        self._complete_configuration(args)
+
+    async def start(self):
+        """Start the instance, by awaiting the *cognate_start* hooks.
+
+        :return: None
+        """
+        await self._await_hooks(self._dispatch_table('cognate_start'))
+
+    async def stop(self):
+        """Stop the instance, by awaiting the *cognate_stop* hooks in the
+        reverse order of the *cognate_start* hooks.
+
+        :return: None
+        """
+        await self._await_hooks(reversed(self._dispatch_table('cognate_stop')))
+
+    async def _await_hooks(self, hooks, **kwargs):
+        """Invoke hook functions in turn, awaiting those that are coroutines.
+
+        :param hooks: The hook functions to invoke.
+        :type hooks: iterable
+        :param kwargs: The keyword arguments of the hook functions.
+        :type kwargs: dict
+        :return: None
+        """
+        profile = self.startup_profile
+        if profile is not None and not profile.active:
+            profile = None
+
+        for func in hooks:
+            start = time.perf_counter()
+            if func is ComponentCore.cognate_configure:
+                # the log configuration opens files, off the loop thread
+                await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(func, self, **kwargs))
+            else:
+                result = func(self, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            if profile is not None:
+                profile.add_hook(func.__name__, func,
+                                 time.perf_counter() - start)
+
+    def invoke_method_on_children(self, func_name=None, *args, **kwargs):
+        """Invoke a hook on the class hierarchy without an event loop, see
+        :meth:`~cognate.component_core.ComponentCore.invoke_method_on_children`.
+
+        :raises ValueError: If a hook function is a coroutine.
+        """
+        if func_name is None:
+            raise ValueError(
+                'invoke_method_on_children:func_name parameter required')
+
+        profile = getattr(self, 'startup_profile', None)
+        if profile is not None and not profile.active:
+            profile = None
+
+        for func in self._dispatch_table(func_name):
+            start = time.perf_counter()
+            result = func(self, *args, **kwargs)
+            if inspect.isawaitable(result):
+                if inspect.iscoroutine(result):
+                    result.close()
+                raise ValueError('"%s" of %s is a coroutine, which must be '
+                                 'awaited.' % (func_name, func.__qualname__))
+            if profile is not None:
+                profile.add_hook(func_name, func, time.perf_counter() - start)
@@ -2,12 +2,65 @@
 construction of service modules.
 """
 import argparse
+import functools
 import logging
 import os
 import shlex
 import sys
+import threading
+import time
 from logging.handlers import WatchedFileHandler
 
+from cognate import configuration, log_support, metrics, profiling
+
+# Guards the materialization of lazily configured loggers.
+_LAZY_LOG_LOCK = threading.RLock()
+
+# Guards the creation of the metrics registry of an instance.
+_LAZY_METRICS_LOCK = threading.Lock()
+
+# Guards the creation of the reconfiguration lock of an instance.
+_RECONFIGURE_LOCK_GUARD = threading.Lock()
+
+
+class _LazyLog(object):
+    """Descriptor that configures the logger of a component on first access.
+
+    The descriptor is only consulted while the instance holds no *log*
+    attribute of its own. Once configured, the logger is stored on the
+    instance, so that subsequent access is an ordinary attribute lookup.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        with _LAZY_LOG_LOCK:
+            log = instance._own_log()  # pylint: disable=protected-access
+            if log is None:
+                instance._configure_logging()  # pylint: disable=protected-access
+                log = instance._own_log()  # pylint: disable=protected-access
+        return log
+
+
+class _LazyMetrics(object):
+    """Descriptor that creates the metrics registry of a component on first
+    access.
+
+    As with :class:`_LazyLog`, the registry is then stored on the instance,
+    so that a component that records no metrics holds no registry.
+    """
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        with _LAZY_METRICS_LOCK:
+            registry = _own_metrics(instance)
+            if registry is None:
+                registry = instance.metrics = metrics.MetricsRegistry()
+        return registry
+
 
 class ComponentCore(object):
     """The *ComponentCore* class provides configuration services for components.
@@ -16,9 +69,22 @@ class ComponentCore(object):
 
     *ComponentCore* supports the following command line options::
 
-        usage:  [-h] [--service_name SERVICE_NAME]
+        usage:  [-h] [--service_name SERVICE_NAME] [--config CONFIG]
+                [--config_reload]
+                [--config_poll_interval CONFIG_POLL_INTERVAL]
                 [--log_level {debug,info,warn,error}]
-                [--log_path LOG_PATH] [--verbose]
+                [--log_path LOG_PATH] [--verbose] [--log_async]
+                [--log_queue_size LOG_QUEUE_SIZE]
+                [--log_queue_policy {block,drop}]
+                [--log_buffer_size LOG_BUFFER_SIZE]
+                [--log_flush_interval LOG_FLUSH_INTERVAL]
+                [--log_lazy] [--log_format {text,json}]
+                [--log_rate_limit LOG_RATE_LIMIT]
+                [--log_rate_burst LOG_RATE_BURST]
+                [--log_sample_rate LOG_SAMPLE_RATE]
+                [--workers WORKERS] [--gc_freeze] [--profile_startup]
+                [--profile_sample_hz PROFILE_SAMPLE_HZ]
+                [--metrics_port METRICS_PORT] [--metrics_timing]
 
         optional arguments:
           -h, --help            show this help message and exit
@@ -26,6 +92,15 @@ class ComponentCore(object):
                                 This will set the name for the current instance.
                                 This will be reflected in the log output.
                                 (default:ComponentCore)
+          --config CONFIG       A JSON or INI file of option values, applied
+                                before the command line options.
+                                (default: None)
+          --config_reload       Reload the configuration on SIGHUP, or when
+                                the config file changes. (default: False)
+          --config_poll_interval CONFIG_POLL_INTERVAL
+                                The seconds between checks of the config file
+                                for changes, 0 to only reload on SIGHUP.
+                                (default: 5.0)
           --log_level {debug,info,warn,error}
                                 Set the log level for the log output.
                                 (default: error)
@@ -36,6 +111,52 @@ class ComponentCore(object):
                                 (default: None)
           --verbose             Enable verbose log output to console. Useful for
                                 debugging. (default: False)
+          --log_async           Write log output from a background thread.
+                                (default: False)
+          --log_queue_size LOG_QUEUE_SIZE
+                                The maximum number of records held for the
+                                background log thread. (default: 10000)
+          --log_queue_policy {block,drop}
+                                Block or drop log records when the log queue
+                                is full. (default: block)
+          --log_buffer_size LOG_BUFFER_SIZE
+                                Buffer up to this many records before writing
+                                to the log file, 0 disables buffering.
+                                (default: 0)
+          --log_flush_interval LOG_FLUSH_INTERVAL
+                                The maximum seconds a record is held in the log
+                                file buffer. (default: 1.0)
+          --log_lazy            Configure logging on first use of the log.
+                                (default: False)
+          --log_format {text,json}
+                                The format of the log output. (default: text)
+          --log_rate_limit LOG_RATE_LIMIT
+                                The records per second allowed for each log
+                                message and level, 0 disables rate limiting.
+                                (default: 0)
+          --log_rate_burst LOG_RATE_BURST
+                                The records allowed in a burst for each log
+                                message and level, 0 for the rate limit.
+                                (default: 0)
+          --log_sample_rate LOG_SAMPLE_RATE
+                                The fraction of debug and info records that
+                                are logged. (default: 1.0)
+          --workers WORKERS     The number of worker processes forked by the
+                                prefork runner, 0 to run in process.
+                                (default: 0)
+          --gc_freeze           Freeze the garbage collector before forking
+                                worker processes. (default: False)
+          --profile_startup     Record the time spent in each phase and hook
+                                of the configuration. (default: False)
+          --profile_sample_hz PROFILE_SAMPLE_HZ
+                                The samples per second of the sampling
+                                profiler, 0 disables sampling. (default: 0)
+          --metrics_port METRICS_PORT
+                                The local port serving the metrics in the
+                                Prometheus text format, 0 disables serving.
+                                (default: 0)
+          --metrics_timing      Time the construction and log output of the
+                                component in its metrics. (default: False)
 
     .. note:: *ComponentCore* will cause the application to exit if the ``-h``
       or ``--help`` cognate_configure arguments are one of the options. In
@@ -48,11 +169,53 @@ class ComponentCore(object):
 
       - cognate_configure(self, args)
 
+      - cognate_start(self)
+
+      - cognate_stop(self)
+
     This method operates by taking an options list in *argparse* format and
     creates an argument list. The argument list is generated by processing
     *argv* through *argparse.ArgumentParser*. The resultant arguments are
     applied to `self`.
 
+    .. note:: Parser templates.
+
+    The options declared by a class hierarchy are compiled once per class into
+    a :class:`~cognate.configuration.ConfigurationTemplate`, which is reused
+    by all instances of the class. Instance specific defaults are applied on
+    top of the template. A class may set *PARSER_TEMPLATE* to False to have
+    each instance build its own *argparse.ArgumentParser*, or may set
+    *COMPILED_PARSER* to True to have its arguments parsed by the compiled
+    parser of the template, see :mod:`cognate.configuration`.
+
+    .. note:: Slotted options.
+
+    A class may set *SLOTTED_OPTIONS* to True to have its option values held
+    in slots rather than in the instance dictionary, which reduces the memory
+    of each instance. The first instance of the class is configured as usual,
+    and is used to generate a slotted subclass from the option names of the
+    class template. Subsequent instances are created from the slotted
+    subclass, which carries the name of the class. Attribute access is
+    unchanged, though the options and the log no longer appear in *vars()*
+    of an instance.
+
+    .. note:: Resolution cache.
+
+    The arguments resolved for an instance are cached process wide, so that
+    an instance constructed again with the same arguments and option
+    defaults skips the parsing of its arguments, see
+    :mod:`cognate.configuration`. A class whose options resolve differently
+    for the same arguments, as from an option *type* that reads external
+    state, may set *RESOLUTION_CACHE* to False.
+
+    .. note:: Metrics.
+
+    Each instance holds a :class:`~cognate.metrics.MetricsRegistry` as
+    `self.metrics`, created on first access, for the counters, gauges and
+    latency histograms of the component. With the *metrics_timing* option set, the time taken by the
+    construction of the instance and by each log output is recorded as well.
+    See :mod:`cognate.metrics`.
+
     .. note: File name sniffing.
 
     The argument list that is obtained from *sys.argv* will have the path of
@@ -75,13 +238,76 @@ class ComponentCore(object):
         '%(threadName)s:%(asctime)s -%(name)s - %(levelname)s -- '
         '%(pathname)s:%(lineno)d -- %(message)s')
 
+    # Set to False to disable the per class compiled parser template.
+    PARSER_TEMPLATE = True
+
+    # Set to True to parse arguments with the compiled parser of the
+    # template, rather than with argparse.
+    COMPILED_PARSER = False
+
+    # Set to True to store the options of instances in slots, see
+    # _slotted_class.
+    SLOTTED_OPTIONS = False
+
+    # Set to False to bypass the resolution cache for the class.
+    RESOLUTION_CACHE = True
+
+    # The attributes of the instance itself that are held in slots by a
+    # slotted class, in addition to the options.
+    _CORE_SLOTS = ('log', 'service_name_set', 'changed_options',
+                   'startup_profile', 'metrics', '_construct_start',
+                   '_log_handles', '_log_owned', '_reconfigure_lock', '_argv',
+                   '_cognate_batch')
+
+    # The options whose change requires the configuration watch to be renewed.
+    _WATCH_OPTIONS = frozenset(['config', 'config_reload',
+                                'config_poll_interval', 'service_name'])
+
+    # The options whose change requires the log to be configured again.
+    LOG_OPTIONS = frozenset([
+        'service_name', 'verbose', 'log_level', 'log_path', 'log_async',
+        'log_queue_size', 'log_queue_policy', 'log_buffer_size',
+        'log_flush_interval', 'log_format', 'log_rate_limit', 'log_rate_burst',
+        'log_sample_rate', 'metrics_timing'])
+
+    # Configures the log on first access when the '--log_lazy' option is set.
+    log = _LazyLog()
+
+    # Creates the metrics registry on first access.
+    metrics = _LazyMetrics()
+
+    def __new__(cls, *args, **kwargs):  # pylint: disable=unused-argument
+        # instances of a class with slotted options are created from the
+        # slotted class, once it is generated by the first instance
+        slotted = cls.__dict__.get('_cognate_slotted')
+        return object.__new__(cls if slotted is None else slotted)
+
     def __init__(self,  # pylint: disable=too-many-arguments
                  argv=None,
                  log=None,
                  log_level='error',
                  log_path=None,
                  service_name=None,
-                 verbose=False):
+                 verbose=False,
+                 log_async=False,
+                 log_queue_size=log_support.DEFAULT_QUEUE_SIZE,
+                 log_queue_policy='block',
+                 log_buffer_size=0,
+                 log_flush_interval=log_support.DEFAULT_FLUSH_INTERVAL,
+                 log_lazy=False,
+                 log_format='text',
+                 log_rate_limit=0,
+                 log_rate_burst=0,
+                 log_sample_rate=1.0,
+                 config=None,
+                 config_reload=False,
+                 config_poll_interval=configuration.DEFAULT_POLL_INTERVAL,
+                 workers=0,
+                 gc_freeze=False,
+                 profile_startup=False,
+                 profile_sample_hz=0,
+                 metrics_port=0,
+                 metrics_timing=False):
         """ Initializes the ComponentCore support infrastructure.
 
         :param argv: An array of arguments of the form
@@ -104,6 +330,75 @@ class ComponentCore(object):
         :type service_name: str
         :param verbose: Enable verbose log output to console. Defaults to False.
         :type verbose: bool
+        :param log_async: Write file and console log output from a background
+            thread. Defaults to False.
+        :type log_async: bool
+        :param log_queue_size: The maximum number of log records held for the
+            background thread. The size is fixed by the first component to
+            enable *log_async*.
+        :type log_queue_size: int
+        :param log_queue_policy: The action taken when the log queue is full,
+            either 'block' until there is room or 'drop' the record.
+        :type log_queue_policy: str
+        :param log_buffer_size: The number of records buffered before writing
+            to the log file. Records of level ERROR and above are written
+            immediately. The default of 0 disables buffering.
+        :type log_buffer_size: int
+        :param log_flush_interval: The maximum seconds a record is held in the
+            log file buffer.
+        :type log_flush_interval: float
+        :param log_lazy: Defer the configuration of logging until the first
+            access of `self.log`. Defaults to False.
+        :type log_lazy: bool
+        :param log_format: The format of the log output, either 'text' or
+            'json'. Defaults to 'text'.
+        :type log_format: str
+        :param log_rate_limit: The records per second allowed for each log
+            message template and level. The default of 0 disables rate
+            limiting.
+        :type log_rate_limit: float
+        :param log_rate_burst: The records allowed in a burst for each log
+            message template and level. The default of 0 allows a burst of
+            the rate limit.
+        :type log_rate_burst: int
+        :param log_sample_rate: The fraction of debug and info records that
+            are logged. Defaults to 1.0.
+        :type log_sample_rate: float
+        :param config: The path of a JSON or INI file of option values. The
+            values replace the option defaults, including the keyword
+            argument values. See :mod:`cognate.configuration`.
+        :type config: str
+        :param config_reload: Reload the configuration file and environment
+            variables on SIGHUP, or when the configuration file changes.
+            Defaults to False.
+        :type config_reload: bool
+        :param config_poll_interval: The seconds between checks of the
+            configuration file for changes, 0 to only reload on SIGHUP.
+        :type config_poll_interval: float
+        :param workers: The number of worker processes forked by a
+            :class:`~cognate.prefork.PreforkRunner`, 0 to run the component in
+            process. Defaults to 0.
+        :type workers: int
+        :param gc_freeze: Freeze the objects tracked by the garbage collector
+            before forking worker processes. Defaults to False.
+        :type gc_freeze: bool
+        :param profile_startup: Record the time spent in each phase and hook
+            of the configuration as `self.startup_profile`, see
+            :mod:`cognate.profiling`. Defaults to False.
+        :type profile_startup: bool
+        :param profile_sample_hz: The samples per second taken of the stacks
+            of the process, written in the collapsed stack format beside the
+            log file. The default of 0 disables sampling. See
+            :mod:`cognate.profiling`.
+        :type profile_sample_hz: float
+        :param metrics_port: The local port serving the metrics of the
+            instance in the Prometheus text format. The default of 0
+            disables serving. See :mod:`cognate.metrics`.
+        :type metrics_port: int
+        :param metrics_timing: Record the time taken by the construction of
+            the instance, and by each log output, in the metrics of the
+            instance. The default is False.
+        :type metrics_timing: bool
         :return: `ComponentCore` child instance
 
         A default ComponentCore will assume the name of the instantiating
@@ -139,6 +434,15 @@ class ComponentCore(object):
         >>> assert dude.log_level == logging.INFO
         >>> assert dude.verbose == False
         """
+        # The start of the construction, observed once it completes.
+        self._construct_start = time.perf_counter()
+        # a member of a build_many batch whose arguments were resolved by an
+        # earlier member is assigned the state of that member in one step, by
+        # _prepare_configuration, in place of the assignments that follow
+        batch = getattr(self, '_cognate_batch', None)
+        if batch is not None and batch.kept_state(argv) is not None:
+            self._execute_configuration(argv)
+            return
         # Current log level, set to logging.DEBUG, INFO, WARNING, OR ERROR at
         # runtime.
         self.log_level = log_level
@@ -154,12 +458,71 @@ class ComponentCore(object):
             self.service_name_set = True
         # Set to true if '--verbose' option flag is utilized
         self.verbose = verbose
+        # Set to true if '--log_async' option flag is utilized
+        self.log_async = log_async
+        # The bound of the queue feeding the background log thread.
+        self.log_queue_size = log_queue_size
+        # The policy applied when the background log queue is full.
+        self.log_queue_policy = log_queue_policy
+        # The number of records buffered before writing the log file.
+        self.log_buffer_size = log_buffer_size
+        # The maximum seconds a record is held in the log file buffer.
+        self.log_flush_interval = log_flush_interval
+        # Set to true if the '--log_lazy' option flag is utilized
+        self.log_lazy = log_lazy
+        # The format of the log output, 'text' or 'json'.
+        self.log_format = log_format
+        # The records per second allowed for each log message and level.
+        self.log_rate_limit = log_rate_limit
+        # The records allowed in a burst for each log message and level.
+        self.log_rate_burst = log_rate_burst
+        # The fraction of debug and info records that are logged.
+        self.log_sample_rate = log_sample_rate
+        # The path of the file of option values, if one is set.
+        self.config = config
+        # Set to true if the '--config_reload' option flag is utilized
+        self.config_reload = config_reload
+        # The seconds between checks of the file of option values.
+        self.config_poll_interval = config_poll_interval
+        # The number of worker processes forked by the prefork runner.
+        self.workers = workers
+        # Set to true if the '--gc_freeze' option flag is utilized
+        self.gc_freeze = gc_freeze
+        # Set to true if the '--profile_startup' option flag is utilized
+        self.profile_startup = profile_startup
+        # The samples per second of the sampling profiler, 0 if disabled.
+        self.profile_sample_hz = profile_sample_hz
+        # The local port serving the metrics, 0 if disabled.
+        self.metrics_port = metrics_port
+        # Set to true if the '--metrics_timing' option flag is utilized
+        self.metrics_timing = metrics_timing
+        # The profile of the configuration, with the '--profile_startup'
+        # option flag.
+        self.startup_profile = None
+        if profile_startup or (argv and '--profile_startup' in argv):
+            self.startup_profile = profiling.StartupProfile()
 
         # : The log attribute to use for logging message
         self.log = log
+        # The shared log handlers held by the instance, released on close.
+        self._log_handles = ()
+        # Set to True once the log is configured by the instance itself.
+        self._log_owned = False
+        # The names of the options changed by reconfigure, while the
+        # cognate_configure hooks run for a reconfiguration.
+        self.changed_options = None
+        # Serializes the reconfiguration of the instance, created on the
+        # first reconfiguration.
+        self._reconfigure_lock = None
         # helper to allow using string for configuration
         if argv is not None and isinstance(argv, str):
-            argv = shlex.split(argv)  # convert string to args style list
+            # convert string to args style list
+            if self.RESOLUTION_CACHE:
+                argv = configuration.resolution_cache().split(argv)
+            else:
+                argv = shlex.split(argv)
+            if self.startup_profile is not None:
+                self.startup_profile.mark('tokenize')
 
         # determine if a name has been set for the instantiating class instance
         # from command line
@@ -168,6 +531,228 @@ class ComponentCore(object):
 
         self._execute_configuration(argv)
 
+    def close(self):
+        """Release the shared log handlers held by the instance.
+
+        :return: None
+
+        An instance registered for configuration reload, with the sampling
+        profiler, or with a metrics server, is unregistered. The output of
+        the sampling profiler is written.
+
+        A log handler is shared by all instances that log to the same target.
+        The handler is detached from a logger once no instance utilizing the
+        logger holds it, and closed once no instance holds it at all. The
+        instance logger remains usable after the instance is closed, without
+        the released handlers.
+        """
+        if self.config_reload:
+            configuration.config_watcher().unregister(self)
+        if self.profile_sample_hz:
+            profiling.sampling_profiler().unregister(self)
+        if self.metrics_port:
+            metrics.serve_metrics(self, 0)
+
+        log_handles, self._log_handles = self._log_handles, ()
+        for logger, handler_key, _ in reversed(log_handles):
+            log_support.HANDLER_REGISTRY.detach(logger, handler_key)
+
+    def start(self):
+        """Start the instance, by invoking the *cognate_start* hooks.
+
+        :return: None
+
+        The *cognate_start* hooks are invoked on the class hierarchy in the
+        order of the *cognate_configure* hooks, from *ComponentCore* toward
+        the instance class. A hook is the place to acquire the resources of a
+        component, such as connections and worker threads, or to warm up its
+        caches. Components that depend on one another may be started
+        concurrently, in dependency order, with a
+        :class:`~cognate.component_group.ComponentGroup`.
+        """
+        self.invoke_method_on_children(func_name='cognate_start')
+
+    def stop(self):
+        """Stop the instance, by invoking the *cognate_stop* hooks.
+
+        :return: None
+
+        The *cognate_stop* hooks are invoked in the reverse order of the
+        *cognate_start* hooks, from the instance class toward
+        *ComponentCore*, so that a class releases its resources before the
+        classes it builds upon.
+        """
+        for func in reversed(self._dispatch_table('cognate_stop')):
+            func(self)
+
+    def reconfigure(self, argv_or_dict):
+        """Apply a change of configuration options to the instance.
+
+        :param argv_or_dict: The options to change, as an argument list, an
+            argument string, or a dictionary of option names and values.
+        :type argv_or_dict: str, list<str>, dict
+        :return: The names of the options whose values changed.
+        :rtype: frozenset
+        :raises ValueError: If a dictionary names an unknown option, or holds
+            a value that is not valid for its option.
+
+        Only the given options are applied, all other options retain their
+        current values. Should any option value change, the
+        *cognate_configure* hooks are invoked again, with the names of the
+        changed options available to them as `self.changed_options`. The log
+        is configured again only if one of the *LOG_OPTIONS* changed.
+
+        An argument list that names a ``--config`` file applies the file, and
+        the environment variables, beneath the given arguments.
+
+        Should a *cognate_configure* hook raise an exception, the previous
+        option values are restored before the exception is raised.
+
+        Reconfiguration is serialized, and the option values of the instance
+        are not modified by a concurrent reconfiguration while the
+        *cognate_configure* hooks run.
+
+        >>> dude = ComponentCore('--service_name Dude')
+        >>> sorted(dude.reconfigure({'verbose': False, 'log_level': 'info'}))
+        ['log_level']
+        >>> assert dude.log_level == logging.INFO
+        """
+        with self._reconfiguration_lock():
+            return self._reconfigure(argv_or_dict)
+
+    def _own_log(self):
+        """Retrieve the log held by the instance itself.
+
+        :return: The log of the instance, or None if the log is yet to be
+            configured on first access.
+        :rtype: logging.Logger
+        """
+        return self.__dict__.get('log')
+
+    def _reconfiguration_lock(self):
+        """Retrieve the lock serializing the reconfiguration of the instance,
+        creating it on first use.
+
+        :return: The reconfiguration lock.
+        :rtype: threading.RLock
+        """
+        lock = self._reconfigure_lock
+        if lock is None:
+            with _RECONFIGURE_LOCK_GUARD:
+                lock = self._reconfigure_lock
+                if lock is None:
+                    lock = self._reconfigure_lock = threading.RLock()
+        return lock
+
+    def reload_configuration(self):
+        """Reload the option values of the configuration file and the
+        environment variables.
+
+        :return: The names of the options whose values changed.
+        :rtype: frozenset
+        :raises ValueError: If the configuration file can not be read, or
+            holds a value that is not valid for its option.
+
+        The values are applied with :meth:`~ComponentCore.reconfigure`.
+        Options given as arguments on construction retain their values, as
+        do options no longer held by the file. A component configured with
+        the ``--config_reload`` option is reloaded by the
+        :class:`~cognate.configuration.ConfigWatcher`.
+        """
+        with self._reconfiguration_lock():
+            template = self._option_template()
+            values = {}
+            if self.config:
+                config_file = configuration.load_config_file(self.config)
+                values.update(config_file.defaults_for(template,
+                                                       self.service_name))
+            values.update(configuration.environment_snapshot().defaults_for(
+                template, self.service_name))
+            for name in template.argv_names(self._argv):
+                values.pop(name, None)
+
+            changed = self._reconfigure(values)
+            if not changed and self._own_log() is not None:
+                self.log.debug('Configuration reloaded without change.')
+            return changed
+
+    def _reconfigure(self, argv_or_dict):
+        """Apply a change of configuration options, see
+        :meth:`~ComponentCore.reconfigure`.
+        """
+        template = self._option_template()
+        previous = dict((name, getattr(self, name))
+                        for name in template.property_list
+                        if hasattr(self, name))
+        previous_name_set = self.service_name_set
+
+        if isinstance(argv_or_dict, dict):
+            unknown = set(argv_or_dict) - set(template.actions)
+            if unknown:
+                raise ValueError('"%s" is not an option of %s.' %
+                                 (sorted(unknown)[0], self.__class__.__name__))
+            values = template.source_defaults(argv_or_dict, 'reconfigure')
+        else:
+            argv = argv_or_dict
+            if isinstance(argv, str):
+                argv = shlex.split(argv)
+            sources = {}
+            if _scan_option(argv, '--config'):
+                sources = self._apply_configuration_sources(argv)
+            args, property_list = self._resolve_arguments(argv, sources)
+            # only the options given, or held by the sources, are applied
+            given = template.argv_names(argv).union(sources)
+            values = dict((name, getattr(args, name))
+                          for name in property_list
+                          if name in given and hasattr(args, name))
+
+        log_level = values.get('log_level')
+        if log_level is not None and not isinstance(log_level, int):
+            values['log_level'] = self.LOG_LEVEL_MAP.get(log_level,
+                                                         logging.ERROR)
+
+        changed = frozenset(name for name, value in values.items()
+                            if name not in previous or
+                            previous[name] != value)
+        for name, value in values.items():
+            setattr(self, name, value)
+        if not changed:
+            return changed
+        if 'service_name' in changed:
+            self.service_name_set = True
+
+        args = argparse.Namespace(**dict(
+            (name, getattr(self, name)) for name in template.property_list
+            if hasattr(self, name)))
+        self.changed_options = changed
+        try:
+            self.invoke_method_on_children(func_name='cognate_configure',
+                                           args=args)
+        except Exception:
+            for name, value in previous.items():
+                setattr(self, name, value)
+            self.service_name_set = previous_name_set
+            if not changed.isdisjoint(self.LOG_OPTIONS):
+                self._reconfigure_logging()
+            raise
+        finally:
+            self.changed_options = None
+
+        if self._own_log() is not None:
+            self.log.info('Reconfigured options: %s', ', '.join(
+                '%s=%r' % (name, getattr(self, name))
+                for name in sorted(changed)))
+
+        if (self.config_reload or 'config_reload' in changed) and \
+                not changed.isdisjoint(self._WATCH_OPTIONS):
+            self._watch_configuration()
+        if 'profile_sample_hz' in changed:
+            self._watch_sampling()
+        if 'metrics_port' in changed:
+            self._watch_metrics()
+
+        return changed
+
     def cognate_options(self, arg_parser):
         """This method will be called to get the *ComponentCore* configuration
         options.
@@ -182,6 +767,22 @@ class ComponentCore(object):
                                 help='This will set the name for the current '
                                      'instance. This will be reflected in the '
                                      'log output.')
+        arg_parser.add_argument('--config',
+                                default=self.config,
+                                help='A JSON or INI file of option values, '
+                                     'applied before the command line '
+                                     'options.')
+        arg_parser.add_argument('--config_reload',
+                                action='store_true',
+                                default=self.config_reload,
+                                help='Reload the configuration on SIGHUP, or '
+                                     'when the config file changes.')
+        arg_parser.add_argument('--config_poll_interval',
+                                type=float,
+                                default=self.config_poll_interval,
+                                help='The seconds between checks of the '
+                                     'config file for changes, 0 to only '
+                                     'reload on SIGHUP.')
         arg_parser.add_argument('--log_level',
                                 default=self.log_level,
                                 choices=['debug', 'info', 'warn', 'error'],
@@ -198,6 +799,90 @@ class ComponentCore(object):
                                 default=self.verbose,
                                 help='Enable verbose log output to console. '
                                      'Useful for debugging.')
+        arg_parser.add_argument('--log_async',
+                                action='store_true',
+                                default=self.log_async,
+                                help='Write log output from a background '
+                                     'thread.')
+        arg_parser.add_argument('--log_queue_size',
+                                type=int,
+                                default=self.log_queue_size,
+                                help='The maximum number of records held for '
+                                     'the background log thread.')
+        arg_parser.add_argument('--log_queue_policy',
+                                default=self.log_queue_policy,
+                                choices=log_support.QUEUE_POLICIES,
+                                help='Block or drop log records when the log '
+                                     'queue is full.')
+        arg_parser.add_argument('--log_buffer_size',
+                                type=int,
+                                default=self.log_buffer_size,
+                                help='Buffer up to this many records before '
+                                     'writing to the log file, 0 disables '
+                                     'buffering.')
+        arg_parser.add_argument('--log_flush_interval',
+                                type=float,
+                                default=self.log_flush_interval,
+                                help='The maximum seconds a record is held in '
+                                     'the log file buffer.')
+        arg_parser.add_argument('--log_lazy',
+                                action='store_true',
+                                default=self.log_lazy,
+                                help='Configure logging on first use of the '
+                                     'log.')
+        arg_parser.add_argument('--log_format',
+                                default=self.log_format,
+                                choices=log_support.LOG_FORMATS,
+                                help='The format of the log output.')
+        arg_parser.add_argument('--log_rate_limit',
+                                type=float,
+                                default=self.log_rate_limit,
+                                help='The records per second allowed for each '
+                                     'log message and level, 0 disables rate '
+                                     'limiting.')
+        arg_parser.add_argument('--log_rate_burst',
+                                type=int,
+                                default=self.log_rate_burst,
+                                help='The records allowed in a burst for each '
+                                     'log message and level, 0 for the rate '
+                                     'limit.')
+        arg_parser.add_argument('--log_sample_rate',
+                                type=float,
+                                default=self.log_sample_rate,
+                                help='The fraction of debug and info records '
+                                     'that are logged.')
+        arg_parser.add_argument('--workers',
+                                type=int,
+                                default=self.workers,
+                                help='The number of worker processes forked '
+                                     'by the prefork runner, 0 to run in '
+                                     'process.')
+        arg_parser.add_argument('--gc_freeze',
+                                action='store_true',
+                                default=self.gc_freeze,
+                                help='Freeze the garbage collector before '
+                                     'forking worker processes.')
+        arg_parser.add_argument('--profile_startup',
+                                action='store_true',
+                                default=self.profile_startup,
+                                help='Record the time spent in each phase '
+                                     'and hook of the configuration.')
+        arg_parser.add_argument('--profile_sample_hz',
+                                type=float,
+                                default=self.profile_sample_hz,
+                                help='The samples per second of the sampling '
+                                     'profiler, 0 disables sampling.')
+        arg_parser.add_argument('--metrics_port',
+                                type=int,
+                                default=self.metrics_port,
+                                help='The local port serving the metrics in '
+                                     'the Prometheus text format, 0 disables '
+                                     'serving.')
+        arg_parser.add_argument('--metrics_timing',
+                                action='store_true',
+                                default=self.metrics_timing,
+                                help='Time the construction and log output of '
+                                     'the component in its metrics.')
 
     def cognate_configure(self, args):
         """ This method is called by *ComponentCore* during instance
@@ -212,11 +897,30 @@ class ComponentCore(object):
         In addition to setting the configuration options to *self*, the *args*
         parameter has the configuration. This should allow for most complex
         configuration scenarios.
+
+        .. note:: Lazy log configuration.
+
+        With the *log_lazy* option set, the logger is configured on the first
+        access of `self.log`, rather than during initialization. Components
+        that seldom log avoid the creation of loggers and log files.
         """
         assert args
 
-        if not self.log:
-            self._configure_logging()
+        if self.changed_options is not None:
+            if not self.changed_options.isdisjoint(self.LOG_OPTIONS):
+                self._reconfigure_logging()
+        elif not self.log:
+            if self.log_lazy:
+                self._resolve_log_level()
+                del self.log  # configured on first access by _LazyLog
+            elif self.startup_profile is not None and \
+                    self.startup_profile.active:
+                start = time.perf_counter()
+                self._configure_logging()
+                self.startup_profile.add_phase('logging',
+                                               time.perf_counter() - start)
+            else:
+                self._configure_logging()
 
     def _configure_logging(self):
         """This method configures the self.log entity for log handling.
@@ -227,35 +931,274 @@ class ComponentCore(object):
         derive service instance. This includes setting up logging to files
         and console. The configured log will be available to the service
         instance with `self.log`
+
+        The file and console handlers are shared with other instances that
+        log to the same target, through
+        :data:`~cognate.log_support.HANDLER_REGISTRY`. The handlers are
+        released with :meth:`~ComponentCore.close`.
+
+        When constructed by :meth:`~ComponentCore.build_many`, a logger that
+        has already been configured for the same service name and log options
+        is reused by the instance.
         """
-        self.log_level = ComponentCore.LOG_LEVEL_MAP.get(self.log_level,
-                                                         logging.ERROR)
+        batch = getattr(self, '_cognate_batch', None)
+        if batch is None:
+            self._configure_log(None)
+        else:
+            # the instances of a batch may configure their logs concurrently,
+            # as do those of AsyncComponentCore.create_many
+            with batch.lock:
+                self._configure_log(batch)
+
+    def _configure_log(self, batch):
+        """Configure the self.log entity, see
+        :meth:`~ComponentCore._configure_logging`.
+
+        :param batch: The batch of the instance, if any.
+        :type batch: _BuildBatch
+        :return: None
+        """
+        self._log_owned = True
+        if batch is not None:
+            # the instances of an argument list resolve the same log options
+            logged = batch.argv_loggers.get(self._argv)
+            if logged is None:
+                log_key = (self.service_name, self.log_level, self.log_path,
+                           self.verbose, self.log_async, self.log_queue_size,
+                           self.log_queue_policy, self.log_buffer_size,
+                           self.log_flush_interval, self.log_format,
+                           self.log_rate_limit, self.log_rate_burst,
+                           self.log_sample_rate, self.metrics_timing)
+                logged = batch.loggers.get(log_key)
+                if logged is not None:
+                    batch.argv_loggers[self._argv] = logged
+            if logged is not None:
+                self.log_level, self.log, log_handles = logged
+                for logger, handler_key, factory in log_handles:
+                    log_support.HANDLER_REGISTRY.attach(logger, handler_key,
+                                                        factory)
+                self._log_handles += log_handles
+                if self.metrics_timing:
+                    self._register_log_metrics()
+                return
+
+        self._resolve_log_level()
 
         # assign the windmill instance logger
         self.log = logging.getLogger(self.service_name)
         self.log.setLevel(self.log_level)
 
+        for handler_key, factory in self._log_specs():
+            log_support.HANDLER_REGISTRY.attach(self.log, handler_key, factory)
+            self._log_handles += ((self.log, handler_key, factory),)
+        self._register_log_metrics()
+
+        self.log.info('Logging configured for: %s', self.service_name)
+
+        if batch is not None:
+            batch.loggers[log_key] = batch.argv_loggers[self._argv] = (
+                self.log_level, self.log, self._log_handles)
+
+    def _log_specs(self):
+        """Determine the handlers and filters of the logger.
+
+        :return: The registry keys and factories of the handlers and filters,
+            in the order they are attached.
+        :rtype: list<tuple>
+        """
+        handler_specs = self._log_handler_specs()
+
+        # in async mode the output handlers are served by the log listener
+        if self.log_async and handler_specs:
+            handler_specs = [self._async_handler_spec(handler_specs)]
+
+        # the emit timer surrounds the output handlers, to time them
+        if handler_specs and self.metrics_timing:
+            start_spec, timer_spec = self._emit_timer_specs()
+            handler_specs = [start_spec] + handler_specs + [timer_spec]
+
+        # the storm filter follows the handlers, to summarize before release
+        if self.log_rate_limit or self.log_sample_rate < 1.0:
+            handler_specs.append(self._storm_filter_spec())
+
+        return handler_specs
+
+    def _reconfigure_logging(self):
+        """Configure the log again, for a change of the log options.
+
+        :return: None
+
+        A log that was given to the instance, rather than configured by it,
+        is left as is, as is a lazily configured log that has not been
+        accessed yet.
+        """
+        self._resolve_log_level()
+        if not self._log_owned or self._own_log() is None:
+            return
+
+        registry = log_support.HANDLER_REGISTRY
+        log_handles = self._log_handles
+        logger = logging.getLogger(self.service_name)
+        logger.setLevel(self.log_level)
+        handler_specs = self._log_specs()
+
+        # the handlers of the logger are replaced in a single step, so that a
+        # record logged concurrently is neither lost nor written twice
+        registry.replace(logger,
+                         [handler_key for log, handler_key, _ in log_handles
+                          if log is logger],
+                         handler_specs)
+        for log, handler_key, _ in reversed(log_handles):
+            if log is not logger:
+                registry.detach(log, handler_key)
+
+        self.log = logger
+        self._log_handles = tuple((logger, handler_key, factory)
+                                  for handler_key, factory in handler_specs)
+        self._register_log_metrics()
+
+        self.log.info('Logging configured for: %s', self.service_name)
+
+    def _resolve_log_level(self):
+        """Convert the configured log level name to a ``logging`` level.
+
+        :return: None
+        """
+        if not isinstance(self.log_level, int):
+            self.log_level = ComponentCore.LOG_LEVEL_MAP.get(self.log_level,
+                                                             logging.ERROR)
+
+    def _log_handler_specs(self):
+        """Determine the output handlers required by the log configuration.
+
+        :return: A list of registry keys and factories for the file and
+            console handlers.
+        :rtype: list<tuple>
+        """
+        formatter = self._log_formatter()
+
+        def formatted(handler_class, target):
+            def factory():
+                handler = handler_class(target)
+                handler.setFormatter(formatter)
+                return handler
+
+            return factory
+
+        handler_specs = []
+
         # cognate_configure log file output if necessary
         if self.log_path:
             file_path = self.log_path
             if not self.log_path.endswith('.log'):
                 file_path = os.path.join(self.log_path,
                                          self.service_name + '.log')
-
-            file_handler = WatchedFileHandler(file_path)
-            file_handler.setLevel(self.log_level)
-            file_handler.setFormatter(self._log_formatter())
-            self.log.addHandler(file_handler)
+            file_path = os.path.abspath(file_path)
+
+            if self.log_buffer_size > 0:
+                handler_specs.append((
+                    ('buffered_file', file_path, formatter,
+                     self.log_buffer_size, self.log_flush_interval),
+                    formatted(functools.partial(
+                        log_support.BufferedFileHandler,
+                        buffer_size=self.log_buffer_size,
+                        flush_interval=self.log_flush_interval), file_path)))
+            else:
+                handler_specs.append((
+                    ('file', file_path, formatter),
+                    formatted(WatchedFileHandler, file_path)))
 
         # if we are in verbose mode, the we send log output to console
         if self.verbose:
-            # add the console logger for verbose mode
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(self.log_level)
-            console_handler.setFormatter(self._log_formatter())
-            self.log.addHandler(console_handler)
+            stream = sys.stderr
+            handler_specs.append((('console', stream, formatter),
+                                  formatted(logging.StreamHandler, stream)))
 
-        self.log.info('Logging configured for: %s', self.service_name)
+        return handler_specs
+
+    def _async_handler_spec(self, handler_specs):
+        """Wrap output handlers in a queue handler served by the log listener.
+
+        :param handler_specs: The registry keys and factories of the output
+            handlers.
+        :type handler_specs: list<tuple>
+        :return: The registry key and factory of the queue handler.
+        :rtype: tuple
+        """
+        registry = log_support.HANDLER_REGISTRY
+        listener = log_support.async_listener(queue_size=self.log_queue_size)
+        policy = self.log_queue_policy
+
+        def release_targets():
+            for handler_key, _ in handler_specs:
+                registry.release(handler_key)
+
+        def factory():
+            targets = [registry.acquire(handler_key, target_factory)
+                       for handler_key, target_factory in handler_specs]
+            return log_support.AsyncQueueHandler(targets, listener,
+                                                 policy=policy,
+                                                 on_close=release_targets)
+
+        handler_key = ('async',
+                       tuple(handler_key for handler_key, _ in handler_specs),
+                       policy)
+        return handler_key, factory
+
+    def _storm_filter_spec(self):
+        """Create the rate limiting and sampling filter for the logger.
+
+        :return: The registry key and factory of the filter.
+        :rtype: tuple
+        """
+        name = self.service_name
+        rate_limit = self.log_rate_limit
+        rate_burst = self.log_rate_burst
+        sample_rate = self.log_sample_rate
+
+        def factory():
+            return log_support.LogStormFilter(name,
+                                              rate_limit=rate_limit,
+                                              rate_burst=rate_burst,
+                                              sample_rate=sample_rate)
+
+        handler_key = ('storm', name, rate_limit, rate_burst, sample_rate)
+        return handler_key, factory
+
+    def _emit_timer_specs(self):
+        """Create the timer of the log output of the logger.
+
+        :return: The registry keys and factories of the filter that marks
+            the start of the emit of a record, and of the timer.
+        :rtype: list<tuple>
+        """
+        histogram = metrics.shared_histogram(
+            self.service_name, 'cognate_log_emit_seconds',
+            'The seconds taken to write a log record.')
+
+        def factory():
+            return metrics.LogEmitTimer(histogram)
+
+        return [(('emit_start',), metrics.LogEmitStart),
+                (('emit_timer', self.service_name), factory)]
+
+    def _register_log_metrics(self):
+        """Add the log emit histogram of the logger to the metrics.
+
+        :return: None
+
+        The timer is moved behind the output handlers attached after it, as
+        by the reconfiguration of the log, so that it times them as well.
+        """
+        if not self.metrics_timing:
+            return
+        for handler in self.log.handlers:
+            if isinstance(handler, metrics.LogEmitTimer):
+                self.metrics.register(handler.histogram)
+                if handler is not self.log.handlers[-1]:
+                    self.log.removeHandler(handler)
+                    self.log.addHandler(handler)
+                return
 
     def _execute_configuration(self, argv):
         """This method assigns an argument list to attributes assigned to self.
@@ -269,6 +1212,37 @@ class ComponentCore(object):
         classes of *ComponentCore*. In addition it takes the resolved
         arguments from *argparse.ArgumentParser* and assigns them to `self`.
         """
+        args = self._prepare_configuration(argv)
+
+        # now execute the configuration call on each base class
+        # in the class inheritance chain
+        self.invoke_method_on_children(func_name='cognate_configure',
+                                       args=args)
+        if self.startup_profile is not None:
+            self.startup_profile.mark('configure')
+
+        self._complete_configuration(args)
+
+    def _prepare_configuration(self, argv):
+        """Resolve the configuration arguments and assign them to the
+        instance, ahead of the *cognate_configure* hooks.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :return: The resolved arguments.
+        :rtype: argparse.Namespace
+        """
+        # the instances of a build_many batch that follow the first with the
+        # same argument list are assigned its state in one step
+        batch = getattr(self, '_cognate_batch', None)
+        if batch is not None:
+            kept = batch.kept_state(argv)
+            if kept is not None:
+                state_plan, state, args = kept
+                state_plan.apply(state, self)
+                return _copy_namespace(args)
+            state_key = () if argv is None else tuple(argv)
+
         if argv is None:
             argv = []  # just create an empty arg list
 
@@ -282,41 +1256,405 @@ class ComponentCore(object):
         if len(argv) > 0 and argv[0].endswith('.py'):
             argv.pop(0)
 
-        # execute configuration_option method on all child classes of
-        # ComponentCore to gather all of the runtime options.
+        # identical argument lists within a build_many batch are resolved once,
+        # along with the values of their configuration sources
+        resolved = None
+        if batch is not None:
+            argv_key = tuple(argv)
+            resolved = batch.resolved.get(argv_key)
+        if resolved is None:
+            sources = self._apply_configuration_sources(argv)
+        else:
+            sources = resolved[2]
+            if sources:
+                self._apply_defaults(sources)
+        profile = self.startup_profile
+        if profile is not None:
+            profile.mark('sources')
+        elif self.profile_startup:
+            # enabled by the configuration file or environment, and so timed
+            # from the resolution of the arguments
+            profile = self.startup_profile = profiling.StartupProfile()
+
+        if resolved is None:
+            args, property_list = self._resolve_arguments(argv, sources)
+            if batch is not None:
+                batch.resolved[argv_key] = (_copy_namespace(args),
+                                            property_list, sources)
+        else:
+            args = _copy_namespace(resolved[0])
+            property_list = resolved[1]
+        if profile is not None:
+            profile.mark('arguments')
+
+        # map the properties to attributes assigned to self instance, with
+        # the compiled copy plan of the class template when it applies
+        template = self.__class__.__dict__.get('_cognate_template')
+        if template is not None and property_list is template.property_list:
+            template.copy_plan(args, self)
+        else:
+            copy_attribute_values(source=args,
+                                  target=self,
+                                  property_names=property_list)
+
+        # the construction arguments take precedence over reloaded values
+        self._argv = tuple(argv)
+        if profile is not None:
+            profile.mark('assign')
+        elif batch is not None:
+            # the state of a profiled instance is not shared, as its profile
+            batch.keep_state(self, state_key, argv_key)
+        return args
+
+    def _complete_configuration(self, args):
+        """Complete the configuration of the instance, once the
+        *cognate_configure* hooks have run.
+
+        :param args: The resolved arguments.
+        :type args: argparse.Namespace
+        :return: None
+        """
+        if self.config_reload:
+            self._watch_configuration()
+        if self.profile_sample_hz:
+            self._watch_sampling()
+        if self.metrics_port:
+            self._watch_metrics()
+
+        if self.SLOTTED_OPTIONS and \
+                '_cognate_slotted' not in self.__class__.__dict__:
+            self._slotted_class()
+
+        # a lazily configured log is not materialized for these messages
+        if self._own_log() is not None:
+            self.log.debug(
+                'Component service configuration complete with argv: %s',
+                args)
+
+        if self.metrics_timing:
+            histogram = metrics.shared_histogram(
+                self.service_name, 'cognate_construct_seconds',
+                'The seconds taken to construct the component.')
+            self.metrics.register(histogram)
+            histogram.observe(time.perf_counter() - self._construct_start)
+
+        profile = self.startup_profile
+        if profile is not None and profile.active:
+            profile.mark('complete')
+            profile.finish()
+            if self._own_log() is not None:
+                self.log.debug('Startup profile: %s', profile,
+                               extra={'fields': profile.as_dict()})
+
+    def _watch_configuration(self):
+        """Register, or unregister, the instance for configuration reload.
+
+        :return: None
+        """
+        watcher = configuration.config_watcher()
+        if self.config_reload:
+            watcher.register(self, self.config, self.config_poll_interval)
+        else:
+            watcher.unregister(self)
+
+    def _watch_sampling(self):
+        """Register, or unregister, the instance with the sampling profiler.
+
+        :return: None
+        """
+        profiler = profiling.sampling_profiler()
+        if self.profile_sample_hz:
+            profiler.register(self)
+        else:
+            profiler.unregister(self)
+
+    def _watch_metrics(self):
+        """Serve the metrics of the instance on its metrics port, or
+        withdraw them.
+
+        :return: None
+        """
+        server = metrics.serve_metrics(self, self.metrics_port)
+        if server is not None and self._own_log() is not None:
+            self.log.info('Serving metrics on %s:%d', metrics.METRICS_HOST,
+                          server.port)
+
+    def _apply_configuration_sources(self, argv):
+        """Apply the option values of a configuration file and of environment
+        variables as the option defaults of the instance.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :return: The option values of the sources, keyed by option name, to
+            be applied over the declared option defaults when the arguments
+            are resolved.
+        :rtype: dict
+
+        The sources apply in the order of configuration file, then
+        environment variables, so that an environment variable takes
+        precedence over the file. The values of both sources are selected by
+        the service name given by the ``--service_name`` argument, or keyword
+        argument.
+
+        The file is named by the ``--config`` argument, an environment
+        variable, or the *config* keyword argument, in that order of
+        precedence.
+        """
+        service_name = _scan_option(argv, '--service_name') or \
+            self.service_name
+        environment = configuration.environment_snapshot()
+        if environment.values:
+            env_defaults = environment.defaults_for(self._option_template(),
+                                                    service_name)
+        else:
+            env_defaults = {}
+
+        config_path = _scan_option(argv, '--config') or \
+            env_defaults.get('config') or self.config
+        sources = {}
+        if config_path:
+            config_file = configuration.load_config_file(config_path)
+            sources.update(config_file.defaults_for(self._option_template(),
+                                                    service_name))
+        sources.update(env_defaults)
+        self._apply_defaults(sources)
+        return sources
+
+    def _apply_defaults(self, defaults):
+        """Assign option defaults to the instance.
+
+        :param defaults: The option values, keyed by option name.
+        :type defaults: dict
+        :return: None
+        """
+        for name, value in defaults.items():
+            setattr(self, name, value)
+        if 'service_name' in defaults:
+            self.service_name_set = True
+
+    def _resolve_arguments(self, argv, sources=None):
+        """Resolve the configuration arguments for the instance.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :param sources: The option values of the configuration sources, which
+            take precedence over the declared option defaults.
+        :type sources: dict
+        :return: The resolved arguments and the names of the properties to
+            assign to the instance.
+        :rtype: tuple<argparse.Namespace, list<str>>
+        """
+        # resolve the runtime options from the compiled class template,
+        # otherwise execute configuration_option method on all child classes
+        # of ComponentCore to gather all of the runtime options.
+        template = self._configuration_template()
+        if template is not None:
+            # a build_many batch resolves its argument lists once without the
+            # resolution cache
+            cache = configuration.resolution_cache() \
+                if self.RESOLUTION_CACHE and \
+                getattr(self, '_cognate_batch', None) is None else None
+            args = template.parse_args(self, argv, cache=cache,
+                                       compiled=self.COMPILED_PARSER,
+                                       sources=sources)
+            if args is not None:
+                return args, template.property_list
+
         arg_parser = argparse.ArgumentParser(
             formatter_class=argparse.ArgumentDefaultsHelpFormatter)
         self.invoke_method_on_children(func_name='cognate_options',
                                        arg_parser=arg_parser)
 
         # resolve configuration options necessary for runtime execution
-        property_list = []
-        # noinspection PyProtectedMember
-        for action in arg_parser._get_positional_actions():  # pylint: disable=protected-access
-            property_list.append(action.dest)
-            # noinspection PyProtectedMember
-        for action in arg_parser._get_optional_actions():  # pylint: disable=protected-access
-            property_list.append(action.dest)
-        property_list.remove('help')  # remove the help option
+        property_list = configuration.property_names(arg_parser)
+        if sources:
+            arg_parser.set_defaults(**sources)
 
         args = arg_parser.parse_args(argv)
 
-        # map the properties to attributes assigned to self instance
-        copy_attribute_values(source=args,
-                              target=self,
-                              property_names=property_list)
+        return args, property_list
 
-        # now execute the configuration call on each base class
-        # in the class inheritance chain
-        self.invoke_method_on_children(func_name='cognate_configure',
-                                       args=args)
+    def _configuration_template(self):
+        """Retrieve the compiled parser template for the instance class.
+
+        :return: The class template, or None if templates are disabled.
+        :rtype: cognate.configuration.ConfigurationTemplate
+        """
+        if not self.PARSER_TEMPLATE:
+            return None
+
+        return self._option_template()
+
+    def _option_template(self):
+        """Retrieve the compiled option template for the instance class,
+        whether or not it is utilized for parsing.
+
+        :return: The class template.
+        :rtype: cognate.configuration.ConfigurationTemplate
+
+        The template is compiled on first use and stored on the class itself,
+        so that a subclass never reuses the template of its parent class.
+        """
+        cls = self.__class__
+        template = cls.__dict__.get('_cognate_template')
+        if template is None:
+            template = configuration.ConfigurationTemplate(self)
+            setattr(cls, '_cognate_template', template)
+
+        return template
+
+    def _slotted_class(self):
+        """Retrieve the slotted class of the instance class, generating it on
+        first use.
+
+        :return: The slotted class.
+        :rtype: type
+
+        The slotted class is a subclass with a slot for each attribute in
+        *_CORE_SLOTS*, and for each option name of the class template. An
+        option name that is already an attribute of the class, such as a
+        property, is left out, so that the class attribute is not shadowed.
+        The slotted class shares the template and hook dispatch tables of the
+        class, and is stored on the class itself.
+
+        An instance of the slotted class holds no instance dictionary, unless
+        a subclass assigns attributes other than its options.
+        """
+        cls = self.__class__
+        slotted = cls.__dict__.get('_cognate_slotted')
+        if slotted is None:
+            template = self._option_template()
+            slot_names = list(self._CORE_SLOTS)
+            for name in template.property_list:
+                if name.isidentifier() and name not in slot_names and \
+                        not hasattr(cls, name):
+                    slot_names.append(name)
+
+            # ensure the dispatch tables exist, so that they are shared
+            cls._dispatch_table('cognate_configure')
+            slotted = type(cls.__name__, (cls,), {
+                '__slots__': tuple(slot_names),
+                '__module__': cls.__module__,
+                '__qualname__': cls.__qualname__,
+                '__doc__': cls.__doc__,
+                '_cognate_template': template,
+                '_cognate_dispatch': cls.__dict__['_cognate_dispatch'],
+                '_own_log': _slotted_own_log,
+                '__getattr__': _slotted_getattr,
+            })
+            setattr(slotted, '_cognate_slotted', slotted)
+            setattr(cls, '_cognate_slotted', slotted)
+
+        return slotted
+
+    @classmethod
+    def build_many(cls, argv_list, **kwargs):
+        """Construct an instance of the class for each argument list.
+
+        :param argv_list: An iterable of argument lists or argument strings,
+            one per instance to construct.
+        :type argv_list: list<str>, list<list<str>>
+        :param kwargs: The keyword arguments passed to every instance
+            construction.
+        :type kwargs: dict
+        :return: A generator of the constructed instances, in the order of
+            *argv_list*.
+        :rtype: generator
+
+        The instances are constructed as if by ``cls(argv=argv, **kwargs)``,
+        except that work is shared across the batch. Identical argument lists
+        are tokenized and parsed only once, and logging is configured only
+        once for each distinct combination of service name and log options,
+        with the instances sharing the configured logger.
+
+        .. warning:: Construction is assumed to be deterministic.
+
+        Instances within a batch are expected to resolve the same
+        configuration for the same arguments. Classes whose option defaults
+        depend on external state should be constructed individually.
+
+        >>> names = ['--service_name svc-%d' % i for i in range(3)]
+        >>> services = list(ComponentCore.build_many(names))
+        >>> [service.service_name for service in services]
+        ['svc-0', 'svc-1', 'svc-2']
+        """
+        for component in cls._build_batch(argv_list, kwargs):
+            del component._cognate_batch
+            yield component
+
+    @classmethod
+    def _build_batch(cls, argv_list, kwargs):
+        """Construct the instances of a batch, as for
+        :meth:`~ComponentCore.build_many`.
+
+        :param argv_list: An iterable of argument lists or argument strings.
+        :type argv_list: list<str>, list<list<str>>
+        :param kwargs: The keyword arguments of every instance construction.
+        :type kwargs: dict
+        :return: A generator of the constructed instances, which hold the
+            batch as `_cognate_batch` until it is deleted by the caller.
+        :rtype: generator
+        """
+        batch = _BuildBatch()
+        for argv in argv_list:
+            if isinstance(argv, str):
+                tokens = batch.tokens.get(argv)
+                if tokens is None:
+                    tokens = batch.tokens[argv] = shlex.split(argv)
+                argv = list(tokens)
+
+            component = cls.__new__(cls)
+            component._cognate_batch = batch  # pylint: disable=protected-access
+            component.__init__(argv=argv, **kwargs)
+            yield component
+
+    @classmethod
+    def reset_class_caches(cls):
+        """Discard the compiled parser template, hook dispatch tables and
+        slotted class of the class.
+
+        :return: None
+
+        The caches are rebuilt on the next instance construction. This is
+        only required if the *cognate_options*, *cognate_configure* or other
+        hook methods of a class hierarchy are altered after instances have
+        been constructed.
+        """
+        for cache_name in ('_cognate_template', '_cognate_dispatch',
+                           '_cognate_slotted'):
+            if cache_name in cls.__dict__:
+                delattr(cls, cache_name)
 
-        self.log.debug(
-            'Component service configuration complete with argv: %s', args)
+    @classmethod
+    def _dispatch_table(cls, func_name):
+        """Retrieve the functions to invoke for a given hook name.
+
+        :param func_name: The name of the hook function.
+        :type func_name: str
+        :return: The functions defined for *func_name* by the classes in the
+            method resolution order, from the most basic class onward.
+        :rtype: tuple
+
+        The table is resolved once per class and hook name, and is stored on
+        the class itself.
+        """
+        tables = cls.__dict__.get('_cognate_dispatch')
+        if tables is None:
+            tables = {}
+            setattr(cls, '_cognate_dispatch', tables)
+
+        table = tables.get(func_name)
+        if table is None:
+            table = tuple(getattr(base, func_name)
+                          for base in reversed(cls.__mro__)
+                          if base is not object and func_name in base.__dict__)
+            tables[func_name] = table
+
+        return table
 
     def invoke_method_on_children(self, func_name=None, *args, **kwargs):
-        """This helper method will walk the primary base class hierarchy to
-        invoke a method if it exists for a given child base class.
+        """This helper method will walk the class hierarchy to invoke a method
+        if it exists for a given child base class.
 
         :param func_name: The name of a function to search for invocation.
         :type func_name: str
@@ -347,6 +1685,14 @@ class ComponentCore(object):
         as the starting point, and the search continuing out toward the final
         ancestor class.
 
+        .. note:: Mixin classes are included.
+
+        The classes are visited in the reverse of the method resolution order
+        of the instance class, so mixin classes that define *func_name* are
+        invoked along with the primary base classes. The functions to invoke
+        are resolved once per class and hook name, see
+        :meth:`~ComponentCore.reset_class_caches`.
+
         ::Example Usage:
 
         To utilize this method, a function name must be provided.
@@ -390,27 +1736,167 @@ class ComponentCore(object):
             raise ValueError(
                 'invoke_method_on_children:func_name parameter required')
 
-        class_stack = []
-        base = self.__class__  # The root class in the hierarchy.
-        while base is not None and base is not object:
-            class_stack.append(base)
-            base = base.__base__  # iterate to the next base class
+        profile = getattr(self, 'startup_profile', None)
+        if profile is not None and profile.active:
+            clock = time.perf_counter
+            for func in self._dispatch_table(func_name):
+                start = clock()
+                func(self, *args, **kwargs)
+                profile.add_hook(func_name, func, clock() - start)
+            return
 
-        while len(class_stack) != 0:
-            base = class_stack.pop()
-            if func_name in base.__dict__:  # check the func exist on class
-                # instance
-                func = getattr(base, func_name)
-                func(self, *args,
-                     **kwargs)  # This is the function getting invoked
+        for func in self._dispatch_table(func_name):
+            func(self, *args, **kwargs)  # This is the function getting invoked
 
     def _log_formatter(self):
+        if self.log_format == 'json':
+            return log_support.json_formatter(
+                self.service_name, debug=self.log_level == logging.DEBUG)
         if self.log_level != logging.DEBUG:
             return self.LOG_FORMATTER
         else:
             return self.DEBUG_LOG_FORMATTER
 
 
+class _BuildBatch(object):
+    """The state shared by the instances of a :meth:`ComponentCore.build_many`
+    invocation.
+    """
+
+    # The attributes assigned by the construction of an instance, ahead of
+    # the cognate_configure hooks, in addition to the options.
+    STATE_NAMES = ('log', 'service_name_set', 'changed_options',
+                   'startup_profile', '_log_handles', '_log_owned',
+                   '_reconfigure_lock', '_argv')
+
+    def __init__(self):
+        # Tokenized argument strings, keyed by argument string.
+        self.tokens = {}
+        # Resolved arguments, property names and configuration source
+        # values, keyed by argument tuple.
+        self.resolved = {}
+        # The state of the first instance of an argument list, with the copy
+        # plan that assigns it and the resolved arguments, keyed by the
+        # argument tuple of the construction.
+        self.states = {}
+        # Configured loggers, with their log level and handles, keyed by
+        # service name and log options.
+        self.loggers = {}
+        # The configured loggers, keyed by the argument tuple they were
+        # resolved for.
+        self.argv_loggers = {}
+        # Serializes the configuration of the loggers.
+        self.lock = threading.Lock()
+
+    def keep_state(self, component, state_key, argv_key):
+        """Keep the state of the first instance constructed with an argument
+        list, for the instances that follow with the same arguments.
+
+        :param component: The instance, with its options assigned.
+        :type component: ComponentCore
+        :param state_key: The argument list the instance was constructed
+            with.
+        :type state_key: tuple
+        :param argv_key: The argument list the instance resolved.
+        :type argv_key: tuple
+        :return: None
+        """
+        args, property_list, _ = self.resolved[argv_key]
+        plan = configuration.CopyPlan(self.STATE_NAMES + tuple(property_list))
+        self.states[state_key] = (plan, plan.capture(component), args)
+
+    def kept_state(self, argv):
+        """Retrieve the state kept for an argument list.
+
+        :param argv: The argument list of an instance.
+        :type argv: list<str>
+        :return: The copy plan and values of the state, and the resolved
+            arguments, or None if no state is kept for the argument list.
+        :rtype: tuple
+        """
+        if argv is None:
+            return self.states.get(())
+        if isinstance(argv, str):
+            return None
+        return self.states.get(tuple(argv))
+
+
+def _copy_namespace(args):
+    """Create a shallow copy of resolved arguments.
+
+    :param args: The resolved arguments.
+    :type args: argparse.Namespace
+    :return: The copy of the arguments.
+    :rtype: argparse.Namespace
+    """
+    namespace = argparse.Namespace.__new__(argparse.Namespace)
+    namespace.__dict__.update(args.__dict__)
+    return namespace
+
+
+def _slotted_own_log(component):
+    """The *_own_log* method of a slotted class, reading the log slot."""
+    try:
+        return component.__class__.__dict__['log'].__get__(component)
+    except AttributeError:
+        return None
+
+
+def _slotted_getattr(component, name):
+    """The *__getattr__* method of a slotted class.
+
+    The method is only invoked for an attribute that is not found, which for
+    an empty log slot configures the log, as with :class:`_LazyLog`, and for
+    an empty metrics slot creates the registry, as with :class:`_LazyMetrics`.
+    """
+    if name == 'log':
+        return ComponentCore.log.__get__(component, component.__class__)
+    if name == 'metrics':
+        return ComponentCore.metrics.__get__(component, component.__class__)
+    raise AttributeError('%r object has no attribute %r' %
+                         (component.__class__.__name__, name))
+
+
+def _own_metrics(component):
+    """Retrieve the metrics registry held by an instance itself.
+
+    :param component: The instance.
+    :type component: ComponentCore
+    :return: The registry, or None if it is yet to be created.
+    :rtype: cognate.metrics.MetricsRegistry
+    """
+    slot = component.__class__.__dict__.get('metrics')
+    if slot is None or isinstance(slot, _LazyMetrics):
+        return component.__dict__.get('metrics')
+    try:
+        return slot.__get__(component)
+    except AttributeError:
+        return None
+
+
+def _scan_option(argv, option_string):
+    """Find the value of an option in an argument list, ahead of parsing.
+
+    :param argv: A list of arguments.
+    :type argv: list<str>
+    :param option_string: The option to find, such as '--config'.
+    :type option_string: str
+    :return: The last value given for the option, or None.
+    :rtype: str
+    """
+    value = None
+    prefix = option_string + '='
+    for index, arg in enumerate(argv):
+        if arg == '--':
+            break
+        if arg == option_string:
+            if index + 1 < len(argv):
+                value = argv[index + 1]
+        elif arg.startswith(prefix):
+            value = arg[len(prefix):]
+    return value
+
+
 def copy_attribute_values(source, target, property_names):
     """Function to copy attributes from a source to a target object.
 
@@ -436,6 +1922,10 @@ when a property name is found in the src. In cases where a property
 value is not found in the src object, then no change to the target object is
 made.
 
+A copy that is repeated for the same property names is better served by a
+compiled :class:`~cognate.configuration.CopyPlan`, as is done for the
+configuration of *ComponentCore* instances.
+
 :Example Usage:
 
 >>> src = type('attr_bag', (object,), dict())
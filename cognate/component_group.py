@@ -0,0 +1,245 @@
+"""The *ComponentGroup* class starts and stops a set of components that depend
+on one another.
+
+Components are started with :meth:`~cognate.component_core.ComponentCore.start`
+once the components they depend on have started, and are stopped with
+:meth:`~cognate.component_core.ComponentCore.stop` once the components that
+depend on them have stopped. Components whose dependencies are satisfied are
+started concurrently on a thread pool, so that the time to start a group is
+that of its longest chain of dependencies, rather than the sum of the start
+times of its components.
+
+>>> from cognate.component_core import ComponentCore
+>>> store = ComponentCore(service_name='Store')
+>>> cache = ComponentCore(service_name='Cache')
+>>> api = ComponentCore(service_name='Api')
+>>> group = ComponentGroup()
+>>> group.add(store)
+>>> group.add(cache, depends_on=[store])
+>>> group.add(api, depends_on=[store, cache])
+>>> with group:
+...     assert group.started == [store, cache, api]
+>>> group.started
+[]
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class ComponentGroup(object):
+    """A group of components started in dependency order, and stopped in the
+    reverse order.
+
+    :param components: Components to add to the group, without dependencies.
+    :type components: list<cognate.component_core.ComponentCore>
+    :param max_workers: The maximum number of components started, or stopped,
+        concurrently. The default is the number of components in the group.
+    :type max_workers: int
+    :param log: The logger for the group. The default is a logger named for
+        the class of the group.
+    :type log: logging.Logger
+
+    Should a component fail to start, no further components are started, the
+    components already started are stopped, and the exception of the failed
+    component is raised by :meth:`~ComponentGroup.start`. Should a component
+    fail to stop, the remaining components are still stopped, and the first
+    exception is raised by :meth:`~ComponentGroup.stop` once all components
+    are stopped.
+    """
+
+    def __init__(self, components=None, max_workers=None, log=None):
+        # The components of the group, in the order they were added.
+        self.components = []
+        # The started components, in the order they finished starting.
+        self.started = []
+        self.max_workers = max_workers
+        self.log = log or logging.getLogger(self.__class__.__name__)
+
+        # The components each component depends on, keyed by the component.
+        self._dependencies = {}
+        # Serializes the start and stop of the group.
+        self._lock = threading.RLock()
+
+        for component in components or ():
+            self.add(component)
+
+    def add(self, component, depends_on=None):
+        """Add a component to the group.
+
+        :param component: The component to add.
+        :type component: cognate.component_core.ComponentCore
+        :param depends_on: The components of the group that must be started
+            before *component*, and stopped after it.
+        :type depends_on: list<cognate.component_core.ComponentCore>
+        :return: None
+        :raises ValueError: If *component* is already in the group, or a
+            component of *depends_on* is not.
+        """
+        depends_on = tuple(depends_on or ())
+        if component in self._dependencies:
+            raise ValueError('"component" %s is already in the group.' %
+                             _name(component))
+        for dependency in depends_on:
+            if dependency not in self._dependencies:
+                raise ValueError('"depends_on" component %s is not in the '
+                                 'group.' % _name(dependency))
+
+        self.components.append(component)
+        self._dependencies[component] = depends_on
+
+    def start(self):
+        """Start the components of the group that are not started.
+
+        :return: None
+        :raises Exception: The exception raised by the first component to fail
+            to start, after the started components are stopped.
+        """
+        with self._lock:
+            pending = self._pending(
+                [component for component in self.components
+                 if component not in self.started],
+                lambda component: self._dependencies[component])
+            start_time = time.perf_counter()
+            errors = self._run(pending, 'start', self.started.append,
+                               halt_on_error=True)
+            if errors:
+                self.log.error('Failed to start: %s', _name(errors[0][0]))
+                self.stop()
+                raise errors[0][1]
+
+            self.log.info('Started %d components in %.3fs',
+                          len(pending), time.perf_counter() - start_time)
+
+    def stop(self):
+        """Stop the started components of the group.
+
+        :return: None
+        :raises Exception: The exception raised by the first component to fail
+            to stop, after the other components are stopped.
+        """
+        with self._lock:
+            dependents = dict((component, []) for component in self.started)
+            for component in self.started:
+                for dependency in self._dependencies[component]:
+                    if dependency in dependents:
+                        dependents[dependency].append(component)
+
+            pending = self._pending(list(reversed(self.started)),
+                                    dependents.get)
+            errors = self._run(pending, 'stop', self.started.remove,
+                               halt_on_error=False)
+            # a component that failed to stop is no longer considered started
+            for component, _ in errors:
+                self.started.remove(component)
+            if errors:
+                self.log.error('Failed to stop: %s', _name(errors[0][0]))
+                raise errors[0][1]
+
+    @staticmethod
+    def _pending(components, prerequisites):
+        """Resolve the prerequisites of each component to be run.
+
+        :param components: The components to run, in submission order.
+        :type components: list<cognate.component_core.ComponentCore>
+        :param prerequisites: A function returning the components that must
+            be run before a given component.
+        :type prerequisites: callable
+        :return: The prerequisites of each component that are also to be run,
+            in the order of *components*.
+        :rtype: list<tuple>
+
+        The dependencies of a component are added to the group before the
+        component itself, so that the prerequisites never form a cycle.
+        """
+        included = set(components)
+        return [(component, set(prerequisite
+                                for prerequisite in prerequisites(component)
+                                if prerequisite in included))
+                for component in components]
+
+    def _run(self, pending, method_name, on_success, halt_on_error):
+        """Invoke a method on each component once its prerequisites are done.
+
+        :param pending: The components to run with their prerequisites, see
+            :meth:`~ComponentGroup._pending`.
+        :type pending: list<tuple>
+        :param method_name: The name of the component method to invoke.
+        :type method_name: str
+        :param on_success: Called with each component whose method returned.
+        :type on_success: callable
+        :param halt_on_error: Set to True to submit no further components once
+            a component raises an exception.
+        :type halt_on_error: bool
+        :return: The components that raised an exception, with the exception.
+        :rtype: list<tuple>
+        """
+        errors = []
+        if not pending:
+            return errors
+
+        max_workers = self.max_workers or len(pending)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                if not (errors and halt_on_error):
+                    waiting = []
+                    for component, prerequisites in pending:
+                        if prerequisites:
+                            waiting.append((component, prerequisites))
+                        else:
+                            future = executor.submit(
+                                getattr(component, method_name))
+                            running[future] = component
+                    pending = waiting
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    component = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        errors.append((component, error))
+                        if not halt_on_error:
+                            self._release(pending, component)
+                        continue
+
+                    on_success(component)
+                    self._release(pending, component)
+
+        return errors
+
+    @staticmethod
+    def _release(pending, component):
+        """Remove a component from the prerequisites of the pending
+        components.
+
+        :param pending: The pending components with their prerequisites.
+        :type pending: list<tuple>
+        :param component: The component that has been run.
+        :type component: cognate.component_core.ComponentCore
+        :return: None
+        """
+        for _, prerequisites in pending:
+            prerequisites.discard(component)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def _name(component):
+    """The name of a component, for messages.
+
+    :param component: A component.
+    :type component: cognate.component_core.ComponentCore
+    :return: The service name of the component, or its representation.
+    :rtype: str
+    """
+    return getattr(component, 'service_name', None) or repr(component)
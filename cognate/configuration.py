@@ -0,0 +1,1625 @@
+"""The *configuration* module provides the option templates that allow
+:class:`~cognate.component_core.ComponentCore` instances to be configured
+without rebuilding an *argparse.ArgumentParser* for every instance.
+
+A :class:`ConfigurationTemplate` is compiled once per *ComponentCore* derived
+class. It holds an *argparse.ArgumentParser* populated with the options that
+the class hierarchy declares through *cognate_options*, along with the
+resolved property names. Instances of the class reuse the template parser,
+with their instance specific defaults applied on top of it.
+
+Compiled Parser
+================
+
+A class may set *COMPILED_PARSER* to True to have its argument lists parsed
+by the :class:`CompiledParser` of its template, in place of the template
+*argparse.ArgumentParser*. The compiled parser looks each argument up in a
+table of the option strings, and resolves the arguments in a single pass.
+It supports the common option forms, being options that store a single
+value, flag options that store a constant, and positional arguments. An
+argument list that it can not resolve exactly as argparse would, such as a
+request for help, an abbreviated option or an invalid value, is handed to
+argparse, which produces the help and error messages.
+
+Configuration Files
+====================
+
+A component configured with the ``--config`` option reads option values from
+a JSON file, when the file name ends with ``.json``, or from an INI file
+otherwise. The values replace the defaults of the component options, so that
+arguments given on the command line take precedence over the file.
+
+Values at the top level of a JSON file, or in the ``[DEFAULT]`` section of an
+INI file, apply to every component. Values in a JSON object, or an INI
+section, named after the service name of a component apply to that
+component only, and take precedence over the top level values::
+
+    [DEFAULT]
+    log_level = info
+
+    [OrderService]
+    log_level = debug
+
+Names that are not options of a component are ignored, so that a single file
+may serve components of different classes. Parsed files are cached by
+:func:`load_config_file` for the process, and a file is parsed again only
+once its modification time or size changes.
+
+Environment Variables
+======================
+
+Option values are also read from environment variables named
+``COGNATE_<SERVICE>_<OPTION>``, where *SERVICE* is the service name of the
+component and *OPTION* the option name, both in upper case with any
+character other than a letter or digit replaced by an underscore::
+
+    COGNATE_ORDERSERVICE_LOG_LEVEL=debug
+
+The environment is read once per process, see :func:`environment_snapshot`.
+The sources of option values take precedence in the order of option
+defaults, configuration file, environment variables and command line
+arguments, with the command line arguments taking precedence over all.
+
+Configuration Reload
+=====================
+
+A component configured with the ``--config_reload`` option is registered
+with the process wide :class:`ConfigWatcher`. The watcher reloads the
+configuration of every registered component when the process receives a
+SIGHUP signal, and reloads the configuration of a component when its
+configuration file changes, as found by polling the file modification time
+every ``--config_poll_interval`` seconds. A single watcher thread serves all
+components, and each distinct file is checked once per poll.
+
+A reload applies the values of the configuration file and environment
+variables to the component with
+:meth:`~cognate.component_core.ComponentCore.reconfigure`. Options given
+as command line arguments on construction retain their values, and options
+removed from the file retain their current values.
+
+Resolution Cache
+=================
+
+The arguments resolved for an instance are held in the process wide
+:class:`ResolutionCache`, keyed by the class template, the argument list and
+the instance specific option defaults. An instance constructed again with
+the same arguments and defaults has its arguments copied from the cache,
+without tokenizing the argument string or running argparse. An empty
+argument list, as with configuration purely by keyword arguments, is
+resolved directly from the defaults and is not cached. The
+*cognate_options* hooks are still invoked, to collect the defaults of the
+instance, as are the *cognate_configure* hooks.
+
+A class whose options resolve to different values for the same arguments,
+such as an option *type* that reads external state, should set
+*RESOLUTION_CACHE* to False. The cache as a whole is disabled through
+:func:`resolution_cache`, and emptied with :func:`clear_resolution_cache`::
+
+    configuration.resolution_cache().enabled = False
+"""
+import argparse
+import configparser
+import copy
+import json
+import os
+import re
+import shlex
+import signal
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from operator import attrgetter, itemgetter
+
+# Marker for an *add_argument* call that does not declare a default.
+_NO_DEFAULT = object()
+
+# The string values accepted for flag options, as with *configparser*.
+_BOOLEAN_STATES = configparser.ConfigParser.BOOLEAN_STATES
+
+# The prefix of the environment variables that hold option values.
+ENV_PREFIX = 'COGNATE_'
+
+# The characters replaced by an underscore in environment variable names.
+_ENV_NAME_PATTERN = re.compile('[^A-Z0-9]')
+
+# The process wide snapshot of the environment, taken on first use.
+_environment = None
+
+# The default seconds between checks of a watched configuration file.
+DEFAULT_POLL_INTERVAL = 5.0
+
+# The process wide configuration watcher, created on first use.
+_watcher = None
+_watcher_lock = threading.Lock()
+
+# The parsed configuration files, keyed by absolute path.
+_config_files = {}
+_config_files_lock = threading.Lock()
+
+# The default number of entries held by the resolution cache.
+DEFAULT_RESOLUTION_CACHE_SIZE = 256
+
+# The process wide cache of resolved arguments, created on first use.
+_resolution_cache = None
+_resolution_cache_lock = threading.Lock()
+
+
+class _TemplateMiss(Exception):
+    """Raised when an instance can not be configured from its class template.
+    """
+
+
+class _TemplateHelpAction(argparse.Action):
+    """Help action for the template parser.
+
+    The template parser carries the defaults of the instance that compiled
+    it, so the help message is rendered by a parser built for the requesting
+    instance instead.
+    """
+
+    def __init__(self,  # pylint: disable=redefined-builtin
+                 option_strings,
+                 dest=argparse.SUPPRESS,
+                 default=argparse.SUPPRESS,
+                 help=None):
+        super().__init__(option_strings=option_strings,
+                         dest=dest,
+                         default=default,
+                         nargs=0,
+                         help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        raise _TemplateMiss('help requested')
+
+
+class _TemplateArgumentParser(argparse.ArgumentParser):
+    """An *ArgumentParser* that records the *add_argument* calls made on it.
+
+    Any use of the parser beyond *add_argument*, such as argument groups or
+    parser level defaults, marks the parser as not templatable.
+    """
+
+    def __init__(self):
+        self.option_calls = []
+        self.templatable = True
+        self._recording = False
+        super().__init__(add_help=False,
+                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+        self.add_argument('-h', '--help',
+                          action=_TemplateHelpAction,
+                          help='show this help message and exit')
+        self._recording = True
+
+    def add_argument(self, *args, **kwargs):
+        action = super().add_argument(*args, **kwargs)
+        if self._recording:
+            self.option_calls.append((args, kwargs, action))
+        return action
+
+    def add_argument_group(self, *args, **kwargs):
+        if self._recording:
+            self.templatable = False
+        return super().add_argument_group(*args, **kwargs)
+
+    def add_mutually_exclusive_group(self, **kwargs):
+        if self._recording:
+            self.templatable = False
+        return super().add_mutually_exclusive_group(**kwargs)
+
+    def add_subparsers(self, **kwargs):
+        if self._recording:
+            self.templatable = False
+        return super().add_subparsers(**kwargs)
+
+    def set_defaults(self, **kwargs):
+        if self._recording:
+            self.templatable = False
+        return super().set_defaults(**kwargs)
+
+
+class _OptionRecorder(object):
+    """A lightweight stand-in for *ArgumentParser* that only records the
+    *add_argument* calls made by *cognate_options*.
+    """
+
+    def __init__(self):
+        self.option_calls = []
+
+    def add_argument(self, *args, **kwargs):
+        self.option_calls.append((args, kwargs))
+
+    def __getattr__(self, name):
+        raise _TemplateMiss('unsupported parser attribute: %s' % name)
+
+
+class _OptionSpec(object):
+    """The compiled form of a single *add_argument* call."""
+
+    def __init__(self, args, kwargs, action):
+        self.args = args
+        self.action = action
+        # The declaration of the option, less the instance specific default.
+        self.shape = dict((key, value) for key, value in kwargs.items()
+                          if key != 'default')
+        self.has_default = 'default' in kwargs
+        # Set for positional arguments, which are given no option strings.
+        self.positional = not action.option_strings
+        # Positional arguments that may be omitted are assigned their default
+        # by argparse directly, which prevents overriding the default.
+        self.fixed_default = self.positional and action.nargs in ('?', '*')
+
+    def matches(self, args, kwargs):
+        """Determine if an *add_argument* call declares this option.
+
+        :param args: The positional arguments of the *add_argument* call.
+        :type args: tuple
+        :param kwargs: The keyword arguments of the *add_argument* call.
+        :type kwargs: dict
+        :return: True if the call differs from this option only by default.
+        :rtype: bool
+        """
+        if args != self.args:
+            return False
+
+        shape = self.shape
+        if len(kwargs) - ('default' in kwargs) != len(shape):
+            return False
+        for key, expected in shape.items():
+            value = kwargs.get(key, _NO_DEFAULT)
+            if value is not expected and value != expected:
+                return False
+
+        return True
+
+
+class ConfigurationTemplate(object):
+    """A compiled record of the options declared by a class hierarchy.
+
+    :param component: The instance used to compile the template.
+    :type component: cognate.component_core.ComponentCore
+
+    The template is compiled by invoking *cognate_options* on *component*
+    with a recording parser. Subsequent instances invoke *cognate_options*
+    with a lightweight recorder to collect their instance specific defaults,
+    which are then applied to the namespace handed to the template parser.
+
+    An instance configured with an empty argument list, as is the case for
+    configuration by keyword arguments alone, has its arguments resolved from
+    the defaults directly, without running argparse.
+
+    An instance whose options differ in any way other than their defaults,
+    that requests help, or whose defaults can not be applied on top of the
+    template, is reported as a template miss. In that case the instance is
+    configured with a freshly built parser, so that behavior and *--help*
+    output are identical to an untemplated configuration.
+    """
+
+    def __init__(self, component):
+        parser = _TemplateArgumentParser()
+        component.invoke_method_on_children(func_name='cognate_options',
+                                            arg_parser=parser)
+
+        # The parser that is shared by all instances of the class.
+        self.parser = parser
+        # Set to False if the options can not be captured as a template.
+        self.enabled = parser.templatable
+        # The compiled options, in declaration order.
+        self.options = [_OptionSpec(args, kwargs, action)
+                        for args, kwargs, action in parser.option_calls]
+        # The names of the properties to assign to configured instances.
+        self.property_list = property_names(parser)
+        # The option actions that store a value, keyed by destination name.
+        self.actions = dict(
+            # noinspection PyProtectedMember
+            (action.dest, action) for action in parser._actions  # pylint: disable=protected-access
+            if action.dest not in (argparse.SUPPRESS, 'help'))
+        # The environment variable name suffix of each option.
+        self.env_names = dict((name, env_name(name)) for name in self.actions)
+        # Copies the resolved arguments to configured instances.
+        self.copy_plan = CopyPlan(self.property_list)
+        # The compiled parser, created on first use.
+        self._compiled_parser = _NO_DEFAULT
+
+    @property
+    def compiled_parser(self):
+        """The compiled parser of the template, created on first use, or
+        None if the options can not be parsed by a compiled parser.
+
+        :rtype: CompiledParser
+        """
+        compiled_parser = self._compiled_parser
+        if compiled_parser is _NO_DEFAULT:
+            compiled_parser = self._compiled_parser = \
+                CompiledParser.compile(self.options)
+        return compiled_parser
+
+    def parse_args(self, component, argv, cache=None, compiled=False,
+                   sources=None):
+        """Resolve the configuration arguments for a component instance.
+
+        :param component: The instance to resolve arguments for.
+        :type component: cognate.component_core.ComponentCore
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :param cache: The cache of resolved arguments to utilize, if any.
+        :type cache: ResolutionCache
+        :param compiled: Parse *argv* with the compiled parser, falling back
+            to argparse for the arguments it can not resolve.
+        :type compiled: bool
+        :param sources: The option values of the configuration sources,
+            keyed by option name, applied over the instance defaults.
+        :type sources: dict
+        :return: The resolved arguments, or None if the template can not be
+            utilized for *component*.
+        :rtype: argparse.Namespace
+
+        An empty *argv*, as with configuration purely by keyword arguments,
+        is resolved from the instance defaults without running argparse.
+        """
+        if not self.enabled:
+            return None
+
+        recorder = _OptionRecorder()
+        try:
+            component.invoke_method_on_children(func_name='cognate_options',
+                                                arg_parser=recorder)
+            defaults = self._instance_defaults(recorder.option_calls)
+            if sources:
+                defaults = [(option, sources.get(option.action.dest, default))
+                            for option, default in defaults]
+
+            # an empty argv is resolved from the defaults for less than the
+            # cost of a cache key
+            key = None
+            if argv and cache is not None and cache.enabled:
+                key = self._resolution_key(argv, defaults)
+                if key is not None:
+                    args = cache.get(key)
+                    if args is not None:
+                        return args
+
+            if not argv:
+                args = self._resolve_defaults(defaults)
+            else:
+                namespace = self._instance_namespace(defaults)
+                compiled_parser = self.compiled_parser if compiled else None
+                if compiled_parser is None or \
+                        not compiled_parser.parse(argv, namespace):
+                    args = self.parser.parse_args(argv, namespace=namespace)
+                else:
+                    args = namespace
+        except _TemplateMiss:
+            return None
+
+        if key is not None:
+            cache.put(key, args)
+        return args
+
+    def _resolution_key(self, argv, defaults):
+        """Create the resolution cache key of an instance.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :param defaults: The option specs paired with the instance defaults.
+        :type defaults: list<tuple>
+        :return: The key, or None if a default can not be hashed.
+        :rtype: tuple
+        """
+        # the type of each default is included, so that 1 and True differ
+        key = (self, tuple(argv),
+               tuple((default.__class__, default) for _, default in defaults))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def source_defaults(self, values, source):
+        """Convert the option values of a configuration source to defaults.
+
+        :param values: The option values, keyed by option destination name.
+        :type values: dict
+        :param source: A description of the source, for error messages.
+        :type source: str
+        :return: The converted values of the options declared by the
+            template, less any other names.
+        :rtype: dict
+        :raises ValueError: If a value can not be converted with the option
+            type, or is not one of the option choices.
+
+        String values are converted with the option *type*, and the values
+        of flag options are read as booleans, such as 'true' or 'off'.
+        """
+        defaults = {}
+        for name, value in values.items():
+            action = self.actions.get(name)
+            if action is None:
+                continue
+
+            try:
+                if isinstance(value, str):
+                    if action.nargs == 0 and isinstance(action.const, bool):
+                        value = _BOOLEAN_STATES[value.lower()]
+                    elif action.type is not None:
+                        value = action.type(value)
+            except (KeyError, TypeError, ValueError,
+                    argparse.ArgumentTypeError):
+                raise ValueError('"%s" value %r from %s is not valid.' %
+                                 (name, value, source))
+
+            if action.choices is not None and value not in action.choices:
+                raise ValueError('"%s" value %r from %s must be one of: %s' %
+                                 (name, value, source,
+                                  ', '.join(map(str, action.choices))))
+
+            defaults[name] = value
+
+        return defaults
+
+    def argv_names(self, argv):
+        """Determine the options given in an argument list.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :return: The destination names of the options given in *argv*, along
+            with the names of all positional arguments.
+        :rtype: frozenset
+        """
+        # noinspection PyProtectedMember
+        option_actions = self.parser._option_string_actions  # pylint: disable=protected-access
+        names = set(name for name, action in self.actions.items()
+                    if not action.option_strings)
+        for arg in argv:
+            if arg == '--':
+                break
+            action = option_actions.get(arg.split('=', 1)[0])
+            if action is not None:
+                names.add(action.dest)
+        return frozenset(names)
+
+    def _instance_defaults(self, option_calls):
+        """Resolve the instance specific default of each option.
+
+        :param option_calls: The *add_argument* calls made by the instance.
+        :type option_calls: list<tuple>
+        :return: The option specs paired with the instance defaults, for
+            options that store a value.
+        :rtype: list<tuple>
+        :raises _TemplateMiss: If the calls do not match the template.
+        """
+        options = self.options
+        if len(option_calls) != len(options):
+            raise _TemplateMiss('option count mismatch')
+
+        defaults = []
+        for (args, kwargs), option in zip(option_calls, options):
+            if not option.matches(args, kwargs):
+                raise _TemplateMiss('option mismatch: %s' % (args,))
+
+            default = kwargs.get('default', _NO_DEFAULT)
+            if default is _NO_DEFAULT:
+                if option.has_default:
+                    raise _TemplateMiss('default omitted: %s' % (args,))
+                default = option.action.default
+
+            if option.action.dest is not argparse.SUPPRESS:
+                defaults.append((option, default))
+
+        return defaults
+
+    @staticmethod
+    def _instance_namespace(defaults):
+        """Create a namespace populated with instance specific defaults.
+
+        :param defaults: The option specs paired with the instance defaults.
+        :type defaults: list<tuple>
+        :return: A namespace to hand to the template parser.
+        :rtype: argparse.Namespace
+        :raises _TemplateMiss: If a default can not be applied over the
+            template parser.
+        """
+        namespace = argparse.Namespace()
+        for option, default in defaults:
+            action = option.action
+            if default is not action.default:
+                if option.fixed_default or default is argparse.SUPPRESS:
+                    raise _TemplateMiss(
+                        'default can not be applied: %s' % (option.args,))
+                if isinstance(default, str) and action.type is not None:
+                    # argparse converts string defaults, leave that to argparse
+                    raise _TemplateMiss(
+                        'default requires conversion: %s' % (option.args,))
+
+            if default is not argparse.SUPPRESS:
+                setattr(namespace, action.dest, default)
+
+        return namespace
+
+    @staticmethod
+    def _resolve_defaults(defaults):
+        """Resolve the arguments for an empty argument list without argparse.
+
+        :param defaults: The option specs paired with the instance defaults.
+        :type defaults: list<tuple>
+        :return: The resolved arguments.
+        :rtype: argparse.Namespace
+        :raises _TemplateMiss: If argparse is required to report an error.
+
+        The resolution mirrors *ArgumentParser.parse_args* for an empty list.
+        String defaults are converted with the option *type*, and the
+        defaults of optional positional arguments are checked against the
+        option *choices*. Anything that argparse would report as an error,
+        such as a missing required argument, is left to argparse.
+        """
+        namespace = argparse.Namespace()
+        try:
+            for option, value in defaults:
+                if value is argparse.SUPPRESS:
+                    continue
+
+                action = option.action
+                if action.required:
+                    raise _TemplateMiss('required: %s' % (option.args,))
+
+                if option.positional:
+                    if action.nargs == '?':
+                        if isinstance(value, str):
+                            value = _convert(action, value)
+                            _check_choices(action, value)
+                    elif action.nargs == '*':
+                        if value is None:
+                            value = []
+                        _check_choices(action, value)
+                    else:
+                        raise _TemplateMiss('positional: %s' % (option.args,))
+                elif isinstance(value, str):
+                    value = _convert(action, value)
+
+                setattr(namespace, action.dest, value)
+        except (TypeError, ValueError, argparse.ArgumentTypeError):
+            raise _TemplateMiss('default conversion failed')
+
+        return namespace
+
+
+def _convert(action, value):
+    """Convert a string value with the type of an option, as argparse does."""
+    if action.type is None:
+        return value
+    if not callable(action.type):
+        raise _TemplateMiss('type not callable: %r' % (action.type,))
+    return action.type(value)
+
+
+def _check_choices(action, value):
+    """Check a value against the choices of an option, as argparse does."""
+    if action.choices is not None and value not in action.choices:
+        raise _TemplateMiss('invalid choice: %r' % (value,))
+
+
+class _Fallback(Exception):
+    """Raised when an argument list is left to argparse by the compiled
+    parser.
+    """
+
+
+class CompiledParser(object):
+    """A single pass parser of the argument lists of a template.
+
+    :param optionals: The actions of the options, keyed by option string.
+    :type optionals: dict
+    :param positionals: The actions of the positional arguments, in order.
+    :type positionals: list<argparse.Action>
+    :param actions: The actions of all options, in declaration order.
+    :type actions: list<argparse.Action>
+
+    Parsers are created with :meth:`~CompiledParser.compile`. An argument
+    list is resolved by :meth:`~CompiledParser.parse`, which reports the
+    argument lists that are to be parsed by argparse instead.
+    """
+
+    # The action types that are resolved by the compiled parser.
+    STORE_ACTIONS = (argparse._StoreAction,)  # pylint: disable=protected-access
+    CONST_ACTIONS = (argparse._StoreConstAction,  # pylint: disable=protected-access
+                     argparse._StoreTrueAction,  # pylint: disable=protected-access
+                     argparse._StoreFalseAction)  # pylint: disable=protected-access
+
+    def __init__(self, optionals, positionals, actions):
+        self.optionals = optionals
+        self.positionals = positionals
+        self.actions = actions
+        # Set if a positional argument may be omitted.
+        self.optional_positionals = any(action.nargs is not None
+                                        for action in positionals)
+        # The count of argument lists handed to argparse.
+        self.fallbacks = 0
+
+    @classmethod
+    def compile(cls, options):
+        """Compile a parser for the options of a template.
+
+        :param options: The compiled options of a template.
+        :type options: list<_OptionSpec>
+        :return: The parser, or None if an option is not supported.
+        :rtype: CompiledParser
+        """
+        optionals = {}
+        positionals = []
+        actions = []
+        for option in options:
+            action = option.action
+            action_type = type(action)
+            if action.type is not None and not callable(action.type):
+                return None
+
+            if option.positional:
+                if action_type not in cls.STORE_ACTIONS or \
+                        action.nargs not in (None, '?', '*'):
+                    return None
+                positionals.append(action)
+            elif action_type in cls.STORE_ACTIONS and action.nargs is None:
+                optionals.update((option_string, action)
+                                 for option_string in action.option_strings)
+            elif action_type in cls.CONST_ACTIONS:
+                optionals.update((option_string, action)
+                                 for option_string in action.option_strings)
+            else:
+                return None
+            actions.append(action)
+
+        return cls(optionals, positionals, actions)
+
+    def parse(self, argv, namespace):
+        """Resolve an argument list into a namespace.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :param namespace: The namespace holding the option defaults, which
+            receives the resolved values.
+        :type namespace: argparse.Namespace
+        :return: True if the arguments are resolved, or False if they are to
+            be parsed by argparse, in which case *namespace* is unchanged.
+        :rtype: bool
+        """
+        try:
+            values = self._resolve(argv, namespace)
+        except _Fallback:
+            self.fallbacks += 1
+            return False
+
+        for name, value in values.items():
+            setattr(namespace, name, value)
+        return True
+
+    def _resolve(self, argv, namespace):
+        """Resolve the values of an argument list, as argparse does.
+
+        :param argv: A list of arguments.
+        :type argv: list<str>
+        :param namespace: The namespace holding the option defaults.
+        :type namespace: argparse.Namespace
+        :return: The resolved values, keyed by destination name.
+        :rtype: dict
+        :raises _Fallback: If the arguments are to be parsed by argparse.
+        """
+        optionals = self.optionals
+        values = {}
+        seen = set()
+        strings = []
+        # the index in strings of the first positional following an option
+        trailing = 0
+
+        index = 0
+        count = len(argv)
+        while index < count:
+            arg = argv[index]
+            index += 1
+            if not arg.startswith('-'):
+                strings.append(arg)
+                continue
+
+            action = optionals.get(arg)
+            explicit = None
+            if action is None:
+                # abbreviations, negative numbers, '--' and errors
+                name, equals, explicit = arg.partition('=')
+                action = optionals.get(name) if name.startswith('--') else None
+                if action is None or not explicit:
+                    raise _Fallback()
+
+            if action.nargs == 0:
+                if explicit is not None:
+                    raise _Fallback()
+                values[action.dest] = action.const
+            else:
+                if explicit is None:
+                    if index == count or argv[index].startswith('-'):
+                        raise _Fallback()
+                    explicit = argv[index]
+                    index += 1
+                values[action.dest] = self._value(action, explicit)
+            seen.add(action)
+            trailing = len(strings)
+
+        if strings and trailing and self.optional_positionals:
+            # argparse may assign an empty value to an optional positional
+            # ahead of an option, left to argparse to determine
+            raise _Fallback()
+        self._assign_positionals(strings, values)
+
+        for action in self.actions:
+            if action in seen or not action.option_strings:
+                continue
+            if action.required:
+                raise _Fallback()
+            default = action.default
+            if isinstance(default, str) and \
+                    getattr(namespace, action.dest, None) is default:
+                values[action.dest] = self._convert(action, default)
+
+        return values
+
+    def _assign_positionals(self, strings, values):
+        """Assign the positional strings to the positional arguments, as the
+        greedy matching of argparse does.
+
+        :param strings: The positional strings, in order.
+        :type strings: list<str>
+        :param values: The resolved values, keyed by destination name.
+        :type values: dict
+        :return: None
+        :raises _Fallback: If the strings do not match the arguments.
+        """
+        positionals = self.positionals
+        required = sum(1 for action in positionals if action.nargs is None)
+        if len(strings) < required:
+            raise _Fallback()
+
+        index = 0
+        for action in positionals:
+            available = len(strings) - index
+            nargs = action.nargs
+            if nargs is None:
+                required -= 1
+                values[action.dest] = self._value(action, strings[index])
+                index += 1
+            elif nargs == '?':
+                if available > required:
+                    values[action.dest] = self._value(action, strings[index])
+                    index += 1
+                else:
+                    value = action.default
+                    if isinstance(value, str):
+                        value = self._value(action, value)
+                    values[action.dest] = value
+            else:
+                taken = strings[index:index + available - required]
+                index += len(taken)
+                if taken:
+                    value = [self._convert(action, arg) for arg in taken]
+                    for item in value:
+                        self._check(action, item)
+                else:
+                    if action.choices is not None:
+                        raise _Fallback()
+                    value = [] if action.default is None else action.default
+                values[action.dest] = value
+
+        if index != len(strings):
+            raise _Fallback()
+
+    def _value(self, action, arg):
+        """Convert and check the value of an option."""
+        value = self._convert(action, arg)
+        self._check(action, value)
+        return value
+
+    @staticmethod
+    def _convert(action, arg):
+        """Convert a string with the type of an option."""
+        if action.type is None:
+            return arg
+        try:
+            return action.type(arg)
+        except (TypeError, ValueError, argparse.ArgumentTypeError):
+            raise _Fallback()
+
+    @staticmethod
+    def _check(action, value):
+        """Check a value against the choices of an option."""
+        if action.choices is not None and value not in action.choices:
+            raise _Fallback()
+
+
+class CopyPlan(object):
+    """A compiled copy of named values from a source to a target object.
+
+    :param property_names: The names of the values to copy.
+    :type property_names: list, set
+    :raises ValueError: If the property names are not given as a sequence.
+
+    A plan performs the copy of
+    :func:`~cognate.component_core.copy_attribute_values`, with the
+    inputs validated once, on construction. The values are read from the
+    source in a single *attrgetter* call, or a single *itemgetter* call for
+    a mapping source. The values are written to the instance dictionary of
+    the target in a single update, less any names that the target class
+    implements with a data descriptor, such as a property or a
+    ``__slots__`` member, which are assigned with *setattr*. The layout of
+    each target class is resolved once.
+
+    As with *copy_attribute_values*, a name that is not held by the source
+    is not copied.
+
+    The values of a source that is copied to many targets may be captured
+    once, with :meth:`capture`, and copied with :meth:`apply`.
+
+    >>> plan = CopyPlan(['color', 'size'])
+    >>> target = argparse.Namespace()
+    >>> plan({'color': 'red', 'size': 9}, target)
+    >>> target
+    Namespace(color='red', size=9)
+    """
+
+    def __init__(self, property_names):
+        if property_names is None:
+            raise ValueError('"property_names" must be provided.')
+        if (not hasattr(property_names, '__iter__') or
+                isinstance(property_names, str)):
+            raise ValueError(
+                '"property_names" must be a sequence type, such as list or '
+                'set.')
+
+        # The names of the values to copy, in copy order.
+        self.property_names = tuple(property_names)
+        names = self.property_names
+        self._attr_getter = _tuple_getter(attrgetter, names)
+        self._item_getter = _tuple_getter(itemgetter, names)
+        self._layouts = {}
+
+    def __call__(self, source, target):
+        """Copy the values held by the source to the target.
+
+        :param source: The object, or mapping, holding the values.
+        :type source: object, dict
+        :param target: The object to assign the values to.
+        :type target: object
+        :return: None
+        """
+        names = self.property_names
+        if isinstance(source, (dict, Mapping)):
+            try:
+                values = self._item_getter(source)
+            except KeyError:
+                names, values = _held_items(source, names)
+        else:
+            try:
+                values = self._attr_getter(source)
+            except AttributeError:
+                names, values = _held_attributes(source, names)
+
+        layout = self._layout(target)
+        if layout is _DICT_LAYOUT:
+            target.__dict__.update(zip(names, values))
+        else:
+            _assign(target, layout, zip(names, values))
+
+    def capture(self, source):
+        """Read the values held by a source, to be copied to any number of
+        targets with :meth:`apply`.
+
+        :param source: The object holding the values.
+        :type source: object
+        :return: The values held by the source, keyed by name.
+        :rtype: dict
+        """
+        try:
+            values = self._attr_getter(source)
+            names = self.property_names
+        except AttributeError:
+            names, values = _held_attributes(source, self.property_names)
+        return dict(zip(names, values))
+
+    def apply(self, values, target):
+        """Copy values captured by :meth:`capture` to a target.
+
+        :param values: The captured values, keyed by name.
+        :type values: dict
+        :param target: The object to assign the values to.
+        :type target: object
+        :return: None
+
+        The instance dictionary of the target is replaced by a copy of the
+        captured dictionary, which is faster to create than the update of
+        a dictionary already holding values, with the values the target held
+        of other names carried over.
+        """
+        layout = self._layout(target)
+        if layout is _DICT_LAYOUT:
+            merged = values.copy()
+            for name, value in target.__dict__.items():
+                merged.setdefault(name, value)
+            target.__dict__ = merged
+        else:
+            _assign(target, layout, values.items())
+
+    def _layout(self, target):
+        """Resolve the layout of the class of a target, once per class."""
+        layout = self._layouts.get(target.__class__)
+        if layout is None:
+            layout = self._layouts.setdefault(
+                target.__class__, _target_layout(target, self.property_names))
+        return layout
+
+
+# The layout of a target class whose values all go to the instance dictionary.
+_DICT_LAYOUT = frozenset()
+
+
+def _assign(target, layout, items):
+    """Assign named values to a target, with setattr for the names in the
+    layout of its class, and to the instance dictionary otherwise."""
+    for name, value in items:
+        if name in layout:
+            setattr(target, name, value)
+        else:
+            target.__dict__[name] = value
+
+
+def _tuple_getter(getter_type, names):
+    """Create a getter that always returns a tuple of values."""
+    if not names:
+        return lambda source: ()
+    getter = getter_type(*names)
+    if len(names) == 1:
+        return lambda source: (getter(source),)
+    return getter
+
+
+def _held_attributes(source, names):
+    """Select the names, and values, of the attributes held by a source."""
+    held = [name for name in names if hasattr(source, name)]
+    return held, [getattr(source, name) for name in held]
+
+
+def _held_items(source, names):
+    """Select the names, and values, of the items held by a mapping."""
+    held = [name for name in names if name in source]
+    return held, [source[name] for name in held]
+
+
+def _target_layout(target, property_names):
+    """Resolve the names a target class requires to be assigned with setattr.
+
+    :param target: An instance of the target class.
+    :type target: object
+    :param property_names: The names copied to the target.
+    :type property_names: tuple
+    :return: The copied names that the class implements with a data
+        descriptor. Every name is contained in the layout of a class without
+        an instance dictionary, or with a custom *__setattr__*.
+    :rtype: frozenset
+    """
+    cls = target.__class__
+    if not hasattr(target, '__dict__') or \
+            cls.__setattr__ is not object.__setattr__:
+        return _SETATTR_LAYOUT
+
+    names = set()
+    for name in property_names:
+        for klass in cls.__mro__:
+            if name in vars(klass):
+                if hasattr(type(vars(klass)[name]), '__set__'):
+                    names.add(name)
+                break
+    return frozenset(names) if names else _DICT_LAYOUT
+
+
+class _SetattrLayout(object):
+    """The layout of a target class whose values all require setattr."""
+
+    def __contains__(self, name):
+        return True
+
+
+_SETATTR_LAYOUT = _SetattrLayout()
+
+
+def _copy_args(args):
+    """Copy resolved arguments, along with any list, dict or set values, so
+    that the copy may be modified without affecting the original.
+
+    :param args: The resolved arguments.
+    :type args: argparse.Namespace
+    :return: The copy of the arguments.
+    :rtype: argparse.Namespace
+    """
+    args = copy.copy(args)
+    for name, value in vars(args).items():
+        if isinstance(value, (list, dict, set)):
+            setattr(args, name, copy.copy(value))
+    return args
+
+
+class ResolutionCache(object):
+    """A bounded cache of resolved configuration arguments, and of tokenized
+    argument strings, evicting the least recently used entries.
+
+    :param maxsize: The maximum number of entries held of each kind.
+    :type maxsize: int
+
+    The cache holds copies of the arguments, and hands out copies, so that
+    an instance may modify its arguments without affecting the cache.
+    """
+
+    def __init__(self, maxsize=DEFAULT_RESOLUTION_CACHE_SIZE):
+        # The maximum number of entries held of each kind.
+        self.maxsize = maxsize
+        # Set to False to bypass the cache.
+        self.enabled = True
+        # The count of resolved arguments found in the cache.
+        self.hits = 0
+        # The count of resolved arguments not found in the cache.
+        self.misses = 0
+        self._arguments = OrderedDict()
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._arguments)
+
+    def get(self, key):
+        """Retrieve the resolved arguments for a key.
+
+        :param key: The key of the arguments.
+        :type key: tuple
+        :return: A copy of the arguments, or None if not cached.
+        :rtype: argparse.Namespace
+        """
+        with self._lock:
+            args = self._arguments.get(key)
+            if args is None:
+                self.misses += 1
+                return None
+            self._arguments.move_to_end(key)
+            self.hits += 1
+        return _copy_args(args)
+
+    def put(self, key, args):
+        """Cache the resolved arguments for a key.
+
+        :param key: The key of the arguments.
+        :type key: tuple
+        :param args: The resolved arguments.
+        :type args: argparse.Namespace
+        :return: None
+        """
+        self._store(self._arguments, key, _copy_args(args))
+
+    def split(self, argv):
+        """Split an argument string into a list of arguments, as with
+        *shlex.split*.
+
+        :param argv: The argument string.
+        :type argv: str
+        :return: The arguments.
+        :rtype: list<str>
+        """
+        if not self.enabled:
+            return shlex.split(argv)
+
+        with self._lock:
+            tokens = self._tokens.get(argv)
+            if tokens is not None:
+                self._tokens.move_to_end(argv)
+        if tokens is None:
+            tokens = tuple(shlex.split(argv))
+            self._store(self._tokens, argv, tokens)
+        return list(tokens)
+
+    def clear(self):
+        """Discard the cached entries, and reset the hit and miss counts.
+
+        :return: None
+        """
+        with self._lock:
+            self._arguments.clear()
+            self._tokens.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _store(self, entries, key, value):
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+
+class ConfigFile(object):
+    """The parsed option values of a configuration file.
+
+    :param config_path: The absolute path of the file.
+    :type config_path: str
+    :param stamp: The modification time and size of the parsed file.
+    :type stamp: tuple
+    :param values: The option values that apply to every component.
+    :type values: dict
+    :param sections: The option values that apply to a service, keyed by
+        service name.
+    :type sections: dict
+    """
+
+    def __init__(self, config_path, stamp, values, sections):
+        # The absolute path of the file.
+        self.path = config_path
+        # The modification time and size of the parsed file.
+        self.stamp = stamp
+        # The option values that apply to every component.
+        self.values = values
+        # The option values that apply to a service, keyed by service name.
+        self.sections = sections
+        # The converted option values, keyed by class template, then by the
+        # service name of a section, or None for the values without one.
+        self._defaults = weakref.WeakKeyDictionary()
+
+    def defaults_for(self, template, service_name):
+        """Resolve the option defaults of a component.
+
+        :param template: The option template of the component class.
+        :type template: ConfigurationTemplate
+        :param service_name: The service name of the component.
+        :type service_name: str
+        :return: The converted option values that apply to the component.
+        :rtype: dict
+        :raises ValueError: If a value is not valid for its option.
+
+        The defaults are resolved once per class template and section of the
+        file. The service names without a section share the defaults of the
+        template, so that the resolved defaults are bounded by the file
+        rather than by the service names of the components.
+        """
+        converted = self._defaults.get(template)
+        if converted is None:
+            converted = self._defaults.setdefault(template, {})
+
+        section = service_name if service_name in self.sections else None
+        defaults = converted.get(section)
+        if defaults is None:
+            values = dict(self.values)
+            if section is not None:
+                values.update(self.sections[section])
+            values.pop('config', None)
+            defaults = template.source_defaults(
+                values, 'config file "%s"' % self.path)
+            converted[section] = defaults
+        return defaults
+
+
+class EnvironmentSnapshot(object):
+    """The option values held by environment variables.
+
+    :param environ: The environment variables to hold. Only the variables
+        with the ``COGNATE_`` prefix are retained.
+    :type environ: dict
+    """
+
+    def __init__(self, environ):
+        # The environment variables with the ``COGNATE_`` prefix.
+        self.values = dict((name, value) for name, value in environ.items()
+                           if name.startswith(ENV_PREFIX))
+        # The service names held by the variables, in their environment
+        # variable form, and the converted option values of each, keyed by
+        # class template.
+        self._defaults = weakref.WeakKeyDictionary()
+
+    def defaults_for(self, template, service_name):
+        """Resolve the option defaults of a component.
+
+        :param template: The option template of the component class.
+        :type template: ConfigurationTemplate
+        :param service_name: The service name of the component.
+        :type service_name: str
+        :return: The converted option values that apply to the component.
+        :rtype: dict
+        :raises ValueError: If a value is not valid for its option.
+
+        The defaults are resolved once per class template and service name
+        held by the variables. The service names that no variable is named
+        for have no defaults, and are not held, so that the resolved defaults
+        are bounded by the variables rather than by the service names of the
+        components.
+        """
+        entry = self._defaults.get(template)
+        if entry is None:
+            entry = self._defaults.setdefault(
+                template, (self._service_names(template), {}))
+        service_names, converted = entry
+
+        key = env_name(service_name)
+        if key not in service_names:
+            return {}
+        defaults = converted.get(key)
+        if defaults is None:
+            defaults = {}
+            values = self.values
+            prefix = '%s%s_' % (ENV_PREFIX, key)
+            for name, suffix in template.env_names.items():
+                var_name = prefix + suffix
+                if var_name in values:
+                    defaults.update(template.source_defaults(
+                        {name: values[var_name]},
+                        'environment variable "%s"' % var_name))
+            converted[key] = defaults
+        return defaults
+
+    def _service_names(self, template):
+        """Determine the service names the variables may be named for.
+
+        :param template: The option template of the component class.
+        :type template: ConfigurationTemplate
+        :return: The service names, in their environment variable form, of
+            the variables that end with an option name of the template.
+        :rtype: frozenset
+        """
+        names = set()
+        for var_name in self.values:
+            for suffix in template.env_names.values():
+                if var_name.endswith('_' + suffix):
+                    names.add(var_name[len(ENV_PREFIX):-len(suffix) - 1])
+        return frozenset(names)
+
+
+class ConfigWatcher(object):
+    """A background thread that reloads the configuration of components.
+
+    Components configured with the ``--config_reload`` option are registered
+    with the process wide watcher, and are held by weak reference. Each
+    component is reloaded with
+    :meth:`~cognate.component_core.ComponentCore.reload_configuration`.
+
+    All registered components are reloaded on SIGHUP, provided that the
+    watcher thread is started from the main thread, on a platform that
+    supports the signal. A previously installed SIGHUP handler is still
+    invoked.
+    """
+
+    def __init__(self):
+        # The watch entries of the registered components: the configuration
+        # file path, poll interval, next poll time and last file loaded.
+        self._components = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._reload_all = False
+        self._thread = None
+        self._previous_handler = None
+        self._signal_installed = False
+
+    def register(self, component, config_path=None,
+                 poll_interval=DEFAULT_POLL_INTERVAL):
+        """Register a component to have its configuration reloaded.
+
+        :param component: The component to reload.
+        :type component: cognate.component_core.ComponentCore
+        :param config_path: The configuration file to watch, if any.
+        :type config_path: str
+        :param poll_interval: The seconds between checks of the file, zero
+            to reload on SIGHUP only.
+        :type poll_interval: float
+        :return: None
+        """
+        config_file = None
+        if config_path and poll_interval:
+            config_file = load_config_file(config_path)
+
+        with self._lock:
+            self._components[component] = [
+                config_path if poll_interval else None,
+                poll_interval,
+                time.monotonic() + poll_interval,
+                config_file]
+            if self._thread is None:
+                if not self._signal_installed:
+                    self._install_signal_handler()
+                self._thread = threading.Thread(target=self._watch_loop,
+                                                name='CognateConfigWatcher')
+                self._thread.daemon = True
+                self._thread.start()
+        self._wakeup.set()
+
+    def unregister(self, component):
+        """Stop reloading the configuration of a component.
+
+        :param component: The component to stop reloading.
+        :type component: cognate.component_core.ComponentCore
+        :return: None
+        """
+        with self._lock:
+            self._components.pop(component, None)
+
+    def reload_all(self):
+        """Have the watcher thread reload every registered component.
+
+        :return: None
+
+        This is the action taken on SIGHUP. It is safe to call from a signal
+        handler, as the reload is performed by the watcher thread.
+        """
+        self._reload_all = True
+        self._wakeup.set()
+
+    def is_registered(self, component):
+        """Determine if a component is registered with the watcher.
+
+        :param component: The component to check.
+        :type component: cognate.component_core.ComponentCore
+        :return: True if the component is registered.
+        :rtype: bool
+        """
+        with self._lock:
+            return component in self._components
+
+    def _install_signal_handler(self):
+        if not hasattr(signal, 'SIGHUP') or \
+                threading.current_thread() is not threading.main_thread():
+            return
+        self._previous_handler = signal.signal(signal.SIGHUP,
+                                               self._handle_signal)
+        self._signal_installed = True
+
+    def _after_fork(self):
+        """Reset the watcher in a forked child process, which inherits the
+        registered components and the SIGHUP handler, but no watcher thread.
+        The thread is started again by the next registration.
+        """
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def _handle_signal(self, signum, frame):
+        self.reload_all()
+        previous = self._previous_handler
+        if callable(previous):
+            previous(signum, frame)
+
+    def _watch_loop(self):
+        timeout = None
+        while True:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            reload_all, self._reload_all = self._reload_all, False
+            timeout = self._poll(reload_all)
+
+    def _poll(self, reload_all):
+        """Reload the components that are due, returning the seconds until
+        the next poll, or None if no file is watched.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._components.items())
+
+        timeout = None
+        loaded = {}
+        for component, entry in entries:
+            config_path, poll_interval, next_poll, config_file = entry
+            changed = False
+            if config_path and next_poll <= now:
+                entry[2] = next_poll = now + poll_interval
+                if config_path not in loaded:
+                    try:
+                        loaded[config_path] = load_config_file(config_path)
+                    except ValueError:
+                        loaded[config_path] = None  # retried next poll
+                current = loaded[config_path]
+                if current is not None and current is not config_file:
+                    entry[3] = current
+                    changed = True
+            if config_path and (timeout is None or
+                                next_poll - now < timeout):
+                timeout = next_poll - now
+
+            if reload_all or changed:
+                _reload_component(component)
+
+        return timeout
+
+
+def _reload_component(component):
+    """Reload the configuration of a component, logging any failure."""
+    try:
+        component.reload_configuration()
+    except Exception as error:  # pylint: disable=broad-except
+        component.log.error('Configuration reload failed: %s', error)
+
+
+def config_watcher():
+    """Retrieve the process wide configuration watcher.
+
+    :return: The configuration watcher.
+    :rtype: ConfigWatcher
+    """
+    global _watcher  # pylint: disable=global-statement
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = ConfigWatcher()
+    return _watcher
+
+
+def resolution_cache():
+    """Retrieve the process wide cache of resolved arguments.
+
+    :return: The resolution cache.
+    :rtype: ResolutionCache
+    """
+    global _resolution_cache  # pylint: disable=global-statement
+    if _resolution_cache is None:
+        with _resolution_cache_lock:
+            if _resolution_cache is None:
+                _resolution_cache = ResolutionCache()
+    return _resolution_cache
+
+
+def clear_resolution_cache():
+    """Discard the entries of the process wide resolution cache, and reset
+    its hit and miss counts.
+
+    :return: None
+    """
+    resolution_cache().clear()
+
+
+def environment_snapshot():
+    """Retrieve the process wide snapshot of the environment.
+
+    :return: The snapshot, taken on first use.
+    :rtype: EnvironmentSnapshot
+
+    Changes to *os.environ* after the snapshot is taken are not visible to
+    components, until the snapshot is discarded with
+    :func:`clear_environment_snapshot`.
+    """
+    global _environment  # pylint: disable=global-statement
+    environment = _environment
+    if environment is None:
+        environment = _environment = EnvironmentSnapshot(os.environ)
+    return environment
+
+
+def clear_environment_snapshot():
+    """Discard the process wide snapshot of the environment.
+
+    :return: None
+    """
+    global _environment  # pylint: disable=global-statement
+    _environment = None
+
+
+def env_name(name):
+    """Convert a service or option name to its environment variable form.
+
+    :param name: The name to convert.
+    :type name: str
+    :return: The name in upper case, with any character other than a letter
+        or digit replaced by an underscore.
+    :rtype: str
+
+    >>> env_name('order-service')
+    'ORDER_SERVICE'
+    """
+    return _ENV_NAME_PATTERN.sub('_', name.upper())
+
+
+def load_config_file(config_path):
+    """Load a configuration file, utilizing the process wide cache.
+
+    :param config_path: The path of a JSON or INI configuration file.
+    :type config_path: str
+    :return: The parsed file.
+    :rtype: ConfigFile
+    :raises ValueError: If the file can not be read or parsed.
+
+    A file is parsed once, and again only when its modification time or
+    size changes, no matter how many components are configured from it.
+    """
+    config_path = os.path.abspath(config_path)
+    try:
+        stat = os.stat(config_path)
+    except OSError as error:
+        raise ValueError('"config" file "%s" can not be read: %s' %
+                         (config_path, error))
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    config_file = _config_files.get(config_path)
+    if config_file is None or config_file.stamp != stamp:
+        with _config_files_lock:
+            config_file = _config_files.get(config_path)
+            if config_file is None or config_file.stamp != stamp:
+                config_file = _parse_config_file(config_path, stamp)
+                _config_files[config_path] = config_file
+
+    return config_file
+
+
+def clear_config_cache():
+    """Discard the parsed configuration files held by the process wide cache.
+
+    :return: None
+    """
+    with _config_files_lock:
+        _config_files.clear()
+
+
+def _parse_config_file(config_path, stamp):
+    """Parse a JSON or INI configuration file."""
+    try:
+        with open(config_path) as config_stream:
+            if config_path.endswith('.json'):
+                content = json.load(config_stream)
+                if not isinstance(content, dict):
+                    raise ValueError('expected a JSON object')
+                values = dict((_option_name(name), value)
+                              for name, value in content.items()
+                              if not isinstance(value, dict))
+                sections = dict(
+                    (name, dict((_option_name(key), value)
+                                for key, value in section.items()))
+                    for name, section in content.items()
+                    if isinstance(section, dict))
+            else:
+                parser = configparser.ConfigParser(interpolation=None)
+                parser.optionxform = _option_name
+                parser.read_file(config_stream)
+                values = dict(parser.defaults())
+                sections = dict((name, dict(parser.items(name)))
+                                for name in parser.sections())
+    except (OSError, ValueError, configparser.Error) as error:
+        raise ValueError('"config" file "%s" can not be parsed: %s' %
+                         (config_path, error))
+
+    return ConfigFile(config_path, stamp, values, sections)
+
+
+def _option_name(name):
+    """Convert a configuration file key to an option destination name."""
+    return name.strip().replace('-', '_')
+
+
+def property_names(arg_parser):
+    """Resolve the property names for the options held by a parser.
+
+    :param arg_parser: The parser holding configuration options.
+    :type arg_parser: argparse.ArgumentParser
+    :return: The destination names of the positional and optional arguments,
+        less the help option.
+    :rtype: list<str>
+    """
+    property_list = []
+    # noinspection PyProtectedMember
+    for action in arg_parser._get_positional_actions():  # pylint: disable=protected-access
+        property_list.append(action.dest)
+    # noinspection PyProtectedMember
+    for action in arg_parser._get_optional_actions():  # pylint: disable=protected-access
+        property_list.append(action.dest)
+    property_list.remove('help')  # remove the help option
+
+    return property_list
+
+
+def _after_fork_in_child():
+    """Reset the process wide configuration watcher, and the locks of the
+    process wide caches, in a forked child process.
+    """
+    global _watcher_lock, _resolution_cache_lock  # pylint: disable=global-statement
+    _watcher_lock = threading.Lock()
+    _resolution_cache_lock = threading.Lock()
+    if _resolution_cache is not None:
+        _resolution_cache._lock = threading.Lock()  # pylint: disable=protected-access
+    if _watcher is not None:
+        _watcher._after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
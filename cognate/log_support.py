@@ -0,0 +1,1017 @@
+"""The *log_support* module provides the logging facilities utilized by the
+:class:`~cognate.component_core.ComponentCore` log configuration.
+
+Asynchronous Logging
+=====================
+
+When a component is configured with the ``--log_async`` option, its logger is
+given an :class:`AsyncQueueHandler` in place of the file and console handlers.
+Log records are placed on a bounded queue by the logging thread, and a single
+process wide :class:`AsyncLogListener` thread dispatches the records to the
+file and console handlers of the originating component. This removes the
+record formatting and the output write from the logging thread.
+
+When the queue is full, the ``--log_queue_policy`` option determines whether
+the logging thread blocks until there is room on the queue, or drops the
+record. Dropped records are counted on the handler that dropped them, as well
+as on the listener.
+
+The listener is stopped, and all queued records are written, at interpreter
+exit. The listener may also be stopped explicitly with
+:func:`stop_async_logging`.
+
+Buffered File Output
+=====================
+
+When a component is configured with a ``--log_buffer_size`` greater than
+zero, its file output is written by a :class:`BufferedFileHandler`. Formatted
+records are held in memory and written to the file in a single write once the
+buffer holds ``--log_buffer_size`` records, once the oldest buffered record
+has waited ``--log_flush_interval`` seconds, or as soon as a record of level
+ERROR or above is logged. The buffer is also written at interpreter exit.
+
+JSON Log Output
+================
+
+When a component is configured with ``--log_format json``, its log output is
+formatted by a :class:`JsonFormatter`, which emits one JSON object per line.
+Structured fields are passed to a log call as a ``fields`` mapping in the
+*extra* argument::
+
+    self.log.info('Request served', extra={'fields': {'status': 200}})
+
+Log Storm Control
+==================
+
+When a component is configured with a ``--log_rate_limit`` greater than zero,
+or a ``--log_sample_rate`` less than one, its logger is given a
+:class:`LogStormFilter`. The filter limits each message template, at each
+level, to ``--log_rate_limit`` records per second with bursts of up to
+``--log_rate_burst`` records, and keeps only a ``--log_sample_rate`` fraction
+of the DEBUG and INFO records. The filter sits on the logger, so suppressed
+records are never formatted or handed to a handler.
+
+The count of suppressed records is reported in a WARNING summary record,
+written directly to the handlers of the logger. A summary is written with
+the first record logged once the summary interval has passed, and when the
+filter is closed.
+
+Shared Handlers
+================
+
+The log handlers created by *ComponentCore* are held by the process wide
+:data:`HANDLER_REGISTRY`, keyed by handler kind and output target. Components
+that log to the same target share a single handler, and a handler is attached
+to a given logger only once, no matter how many components utilize the
+logger. Handlers are reference counted, and are closed once the last
+component holding them is closed.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import weakref
+from json.encoder import encode_basestring_ascii
+from logging.handlers import QueueHandler, WatchedFileHandler
+
+# The default number of records that may be held by the log queue.
+DEFAULT_QUEUE_SIZE = 10000
+
+# The policies applied by an AsyncQueueHandler when the log queue is full.
+QUEUE_POLICIES = ['block', 'drop']
+
+# The default seconds a record may wait in the buffer of a BufferedFileHandler.
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# The supported log output formats.
+LOG_FORMATS = ['text', 'json']
+
+# The default seconds between the summary records of a LogStormFilter.
+DEFAULT_SUMMARY_INTERVAL = 10.0
+
+# The maximum message templates tracked before idle buckets are discarded.
+_MAX_BUCKETS = 1024
+
+# Marker placed on the log queue to stop the listener thread.
+_STOP = object()
+
+# Marker placed on the log queue to close an AsyncQueueHandler.
+_CLOSE = object()
+
+# The process wide log listener, created on first use.
+_listener = None
+_listener_lock = threading.Lock()
+
+# The process wide flusher of buffered handlers, created on first use.
+_flusher = None
+_flusher_lock = threading.Lock()
+
+# The JSON formatters shared by components, keyed by service name and mode.
+_json_formatters = {}
+
+
+class AsyncLogListener(object):
+    """A background thread that dispatches queued log records.
+
+    :param queue_size: The maximum number of records held by the queue.
+    :type queue_size: int
+
+    Each queued item carries the :class:`AsyncQueueHandler` that enqueued
+    the record, so that a single listener serves the handlers of all
+    components.
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE):
+        # The queue shared by all AsyncQueueHandler instances.
+        self.queue = queue.Queue(maxsize=queue_size)
+        # The total count of records dropped due to a full queue.
+        self.dropped = 0
+        self._handlers = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        """True if the listener thread is dispatching records."""
+        return self._thread is not None
+
+    def register(self, handler):
+        """Register a queue handler to be flushed when the listener stops.
+
+        :param handler: The handler to register.
+        :type handler: AsyncQueueHandler
+        :return: None
+        """
+        self._handlers.add(handler)
+
+    def unregister(self, handler):
+        """Remove a queue handler from the listener.
+
+        :param handler: The handler to remove.
+        :type handler: AsyncQueueHandler
+        :return: None
+        """
+        self._handlers.discard(handler)
+
+    def count_drop(self, handler):
+        """Count a record dropped by a queue handler.
+
+        :param handler: The handler that dropped the record.
+        :type handler: AsyncQueueHandler
+        :return: None
+        """
+        with self._lock:
+            self.dropped += 1
+            handler.dropped += 1
+
+    def start(self):
+        """Start the listener thread, if not already started.
+
+        :return: None
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._dispatch_loop,
+                                            name='CognateLogListener')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop the listener thread after all queued records are dispatched.
+
+        :return: None
+
+        Records that are logged after the listener has stopped are handled
+        synchronously by the logging thread.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._thread = None
+
+        self.queue.put(_STOP)
+        thread.join()
+
+        # dispatch any records queued while the listener was stopping
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[0].dispatch(item[1])
+
+        for handler in list(self._handlers):
+            handler.flush()
+
+    def _after_fork(self):
+        """Reset the listener in a forked child process, which inherits no
+        listener thread. The records queued by the parent process are left to
+        the parent, and the child dispatches records synchronously until the
+        listener is started again.
+        """
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        for handler in list(self._handlers):
+            handler.queue = self.queue
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _dispatch_loop(self):
+        get = self.queue.get
+        while True:
+            item = get()
+            if item is _STOP:
+                break
+            handler, record = item
+            try:
+                handler.dispatch(record)
+            except Exception:  # pylint: disable=broad-except
+                handler.handleError(record)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """A handler that queues records for dispatch by an
+    :class:`AsyncLogListener`.
+
+    :param handlers: The handlers that output the records.
+    :type handlers: list<logging.Handler>
+    :param listener: The listener that dispatches the queued records.
+    :type listener: AsyncLogListener
+    :param policy: The policy applied when the queue is full, one of
+        'block' or 'drop'.
+    :type policy: str
+    :param on_close: A callable invoked once the records queued by the
+        handler have been dispatched after the handler is closed.
+    :type on_close: callable
+    :raises ValueError: If the policy is not supported.
+    """
+
+    def __init__(self, handlers, listener, policy='block', on_close=None):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError('"policy" must be one of %s.' % QUEUE_POLICIES)
+
+        super().__init__(listener.queue)
+        # The handlers the records are dispatched to.
+        self.target_handlers = list(handlers)
+        # The listener dispatching the records of this handler.
+        self.async_listener = listener
+        # The queue full policy.
+        self.policy = policy
+        # The count of records dropped by this handler due to a full queue.
+        self.dropped = 0
+        self._on_close = on_close
+
+        listener.register(self)
+
+    def prepare(self, record):
+        """Merge the message arguments of a record prior to queueing.
+
+        :param record: The record to prepare.
+        :type record: logging.LogRecord
+        :return: The prepared record.
+        :rtype: logging.LogRecord
+
+        Only the message is merged on the logging thread, so that the
+        arguments are captured in their current state. All other formatting
+        is left to the target handlers on the listener thread.
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.policy == 'drop':
+            try:
+                self.queue.put_nowait((self, record))
+            except queue.Full:
+                self.async_listener.count_drop(self)
+        else:
+            self.queue.put((self, record))
+
+    def emit(self, record):
+        if self.async_listener.running:
+            super().emit(record)
+        else:
+            self.dispatch(self.prepare(record))
+
+    def dispatch(self, record):
+        """Output a record with the target handlers.
+
+        :param record: The record to output.
+        :type record: logging.LogRecord
+        :return: None
+        """
+        if record is _CLOSE:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+            return
+
+        for handler in self.target_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def flush(self):
+        for handler in self.target_handlers:
+            handler.flush()
+
+    def close(self):
+        self.async_listener.unregister(self)
+        if self.async_listener.running:
+            # close after the records already queued are dispatched
+            self.queue.put((self, _CLOSE))
+        else:
+            self.dispatch(_CLOSE)
+        super().close()
+
+
+class BufferedFileHandler(WatchedFileHandler):
+    """A file handler that writes formatted records in batches.
+
+    :param filename: The path of the log file.
+    :type filename: str
+    :param buffer_size: The number of records that triggers a write.
+    :type buffer_size: int
+    :param flush_interval: The maximum seconds a record is held before it is
+        written.
+    :type flush_interval: float
+    :param flush_level: The level at or above which a record is written
+        immediately, along with all buffered records.
+    :type flush_level: int
+    :raises ValueError: If the buffer size is less than one.
+
+    The file is checked for rotation, as with *WatchedFileHandler*, once per
+    batch rather than once per record. A registered handler writes its
+    buffered records ahead of a fork of the process, and a forked child
+    process discards those it inherits, so that each record is written once.
+    """
+
+    def __init__(self, filename,
+                 buffer_size=100,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 flush_level=logging.ERROR):
+        if buffer_size < 1:
+            raise ValueError('"buffer_size" must be at least 1.')
+
+        super().__init__(filename)
+        # The formatted records waiting to be written.
+        self.buffer = []
+        # The number of records that triggers a write.
+        self.buffer_size = buffer_size
+        # The maximum seconds a record is held before it is written.
+        self.flush_interval = flush_interval
+        # The level at or above which records are written immediately.
+        self.flush_level = flush_level
+        # The monotonic time by which the buffer is to be written, if any.
+        self.flush_deadline = None
+
+        if flush_interval:
+            buffer_flusher().register(self)
+
+    def emit(self, record):
+        try:
+            msg = self.format(record)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+            return
+
+        buffer = self.buffer
+        if not buffer and self.flush_interval:
+            self.flush_deadline = time.monotonic() + self.flush_interval
+            buffer_flusher().wake()
+
+        buffer.append(msg + self.terminator)
+        if len(buffer) >= self.buffer_size or record.levelno >= self.flush_level:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered records to the file.
+
+        :return: None
+        """
+        self.acquire()
+        try:
+            if self.buffer:
+                buffer, self.buffer = self.buffer, []
+                self.reopenIfNeeded()
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write(''.join(buffer))
+                self.stream.flush()
+        finally:
+            # cleared once written, so a cleared deadline means on file
+            self.flush_deadline = None
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.flush()
+            super().close()
+        finally:
+            self.release()
+
+
+class BufferFlusher(object):
+    """A background thread that writes buffered records on their deadline.
+
+    Each :class:`BufferedFileHandler` with a flush interval is registered
+    with the process wide flusher, so that records are written within the
+    flush interval even when no further records are logged.
+    """
+
+    def __init__(self):
+        self._handlers = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def register(self, handler):
+        """Register a handler to be flushed on its deadline.
+
+        :param handler: The handler to register.
+        :type handler: BufferedFileHandler
+        :return: None
+        """
+        with self._lock:
+            self._handlers.add(handler)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop,
+                                                name='CognateLogFlusher')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _after_fork(self):
+        """Reset the flusher in a forked child process, which inherits no
+        flusher thread. The thread is started again by the next registration.
+        """
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def wake(self):
+        """Have the flusher thread recompute the next deadline.
+
+        :return: None
+        """
+        self._wakeup.set()
+
+    def _flush_loop(self):
+        timeout = None
+        while True:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+            now = time.monotonic()
+            timeout = None
+            for handler in list(self._handlers):
+                deadline = handler.flush_deadline
+                if deadline is None:
+                    continue
+                if deadline <= now:
+                    handler.flush()
+                elif timeout is None or deadline - now < timeout:
+                    timeout = deadline - now
+
+
+class JsonFormatter(logging.Formatter):
+    """A formatter that renders each record as a single line JSON object.
+
+    :param static_fields: Fields added to every record, such as the service
+        name. The fields are serialized once, on construction.
+    :type static_fields: dict
+    :param debug: Include the source file and line of the log call.
+    :type debug: bool
+
+    Each object holds the static fields, followed by ``time`` (seconds since
+    the epoch), ``level``, ``logger``, ``pid``, ``thread`` and ``message``.
+    In debug mode, ``file`` and ``line`` precede the message. An
+    ``exc_info`` and ``stack_info`` text is added when present, as is a
+    ``fields`` object for records logged with structured fields.
+
+    A record is rendered with a single string interpolation into a template
+    prepared on construction, with encoded level names cached by level.
+
+    >>> formatter = JsonFormatter({'service': 'Demo'})
+    >>> record = logging.LogRecord('Demo', logging.INFO, __file__, 1,
+    ...                            'Hello %s', ('World',), None)
+    >>> record.created = 0.5
+    >>> record.process = 42
+    >>> formatter.format(record)
+    '{"service":"Demo","time":0.5,"level":"INFO","logger":"Demo","pid":42,\
+"thread":"MainThread","message":"Hello World"}'
+    """
+
+    def __init__(self, static_fields=None, debug=False):
+        super().__init__()
+
+        static = ''.join('%s:%s,' % (encode_basestring_ascii(str(key)),
+                                     json.dumps(value, default=str))
+                         for key, value in (static_fields or {}).items())
+        template = ('{' + static.replace('%', '%%') +
+                    '"time":%r,"level":%s,"logger":%s,"pid":%s,"thread":%s,')
+        if debug:
+            template += '"file":%s,"line":%s,'
+        template += '"message":%s'
+
+        # Set to True to include the source file and line.
+        self.debug = debug
+        self._template = template
+        self._levels = {}
+
+    def format(self, record):
+        level = self._levels.get(record.levelno)
+        if level is None:
+            level = self._levels[record.levelno] = encode_basestring_ascii(
+                record.levelname)
+
+        thread = record.threadName
+        process = record.process
+        values = (record.created,
+                  level,
+                  encode_basestring_ascii(record.name),
+                  'null' if process is None else process,
+                  'null' if thread is None else encode_basestring_ascii(thread))
+        if self.debug:
+            values += (encode_basestring_ascii(record.pathname),
+                       record.lineno)
+        text = self._template % (values +
+                                 (encode_basestring_ascii(record.getMessage()),))
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            text += ',"exc_info":' + encode_basestring_ascii(record.exc_text)
+        if record.stack_info:
+            text += ',"stack_info":' + encode_basestring_ascii(
+                self.formatStack(record.stack_info))
+
+        fields = getattr(record, 'fields', None)
+        if fields:
+            text += ',"fields":' + json.dumps(fields, default=str)
+
+        return text + '}'
+
+
+class LogStormFilter(logging.Filter):
+    """A logger filter that rate limits and samples log records.
+
+    :param name: The name of the logger the filter is attached to, which
+        receives the summary records.
+    :type name: str
+    :param rate_limit: The records per second allowed for each message
+        template and level. Zero disables rate limiting.
+    :type rate_limit: float
+    :param rate_burst: The records allowed in a burst for each message
+        template and level. Defaults to the rate limit, and at least 1.
+    :type rate_burst: int
+    :param sample_rate: The fraction of DEBUG and INFO records that are kept.
+    :type sample_rate: float
+    :param summary_interval: The minimum seconds between summary records.
+    :type summary_interval: float
+    :raises ValueError: If the rate limit is negative, or the sample rate is
+        not between 0 and 1.
+
+    Rate limiting applies a token bucket to each message template and level,
+    that is the unformatted *msg* of the record, so that a storm of one error
+    does not suppress other records. Sampled records do not consume tokens.
+    """
+
+    def __init__(self, name='',
+                 rate_limit=0,
+                 rate_burst=0,
+                 sample_rate=1.0,
+                 summary_interval=DEFAULT_SUMMARY_INTERVAL):
+        if rate_limit < 0:
+            raise ValueError('"rate_limit" must not be negative.')
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError('"sample_rate" must be between 0 and 1.')
+
+        super().__init__()
+        # The name of the logger that receives the summary records.
+        self.logger_name = name
+        # The records per second allowed for each template and level.
+        self.rate_limit = rate_limit
+        # The records allowed in a burst for each template and level.
+        self.rate_burst = max(rate_burst or rate_limit, 1)
+        # The fraction of DEBUG and INFO records that are kept.
+        self.sample_rate = sample_rate
+        # The minimum seconds between summary records.
+        self.summary_interval = summary_interval
+        # The counts of records suppressed since the last summary.
+        self.rate_limited = 0
+        self.sampled = 0
+        # The total count of suppressed records.
+        self.suppressed = 0
+        self._buckets = {}
+        self._limited_templates = {}
+        self._summary_deadline = time.monotonic() + summary_interval
+        self._lock = threading.Lock()
+        self._random = random.random
+
+    def filter(self, record):
+        now = time.monotonic()
+        if now >= self._summary_deadline:
+            self._summarize(now)
+
+        levelno = record.levelno
+        if levelno < logging.WARNING and self._random() >= self.sample_rate:
+            with self._lock:
+                self.sampled += 1
+            return False
+
+        if not self.rate_limit:
+            return True
+
+        key = (record.msg, levelno)
+        with self._lock:
+            try:
+                bucket = self._buckets.get(key)
+            except TypeError:  # an unhashable msg
+                key = (str(record.msg), levelno)
+                bucket = self._buckets.get(key)
+
+            if bucket is None:
+                self._buckets[key] = [self.rate_burst - 1, now]
+                return True
+
+            tokens = bucket[0] + (now - bucket[1]) * self.rate_limit
+            if tokens > self.rate_burst:
+                tokens = self.rate_burst
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return True
+
+            bucket[0] = tokens
+            self.rate_limited += 1
+            self._limited_templates[key] = \
+                self._limited_templates.get(key, 0) + 1
+            return False
+
+    def close(self):
+        """Write a summary record for any records suppressed since the last
+        summary.
+
+        :return: None
+        """
+        self._summarize(time.monotonic())
+
+    def _summarize(self, now):
+        """Write a summary of the suppressed records to the logger handlers.
+
+        :param now: The current monotonic time.
+        :type now: float
+        :return: None
+        """
+        with self._lock:
+            self._summary_deadline = now + self.summary_interval
+            rate_limited, self.rate_limited = self.rate_limited, 0
+            sampled, self.sampled = self.sampled, 0
+            templates, self._limited_templates = self._limited_templates, {}
+            self.suppressed += rate_limited + sampled
+            if len(self._buckets) > _MAX_BUCKETS:
+                self._discard_idle_buckets(now)
+
+        if not (rate_limited or sampled):
+            return
+
+        logger = logging.getLogger(self.logger_name)
+        record = logger.makeRecord(
+            logger.name, logging.WARNING, __file__, 0,
+            'Suppressed %d log records (%d rate limited, %d sampled)',
+            (rate_limited + sampled, rate_limited, sampled), None)
+        record.fields = {
+            'rate_limited': rate_limited,
+            'sampled': sampled,
+            'templates': dict(
+                ('%s %s' % (logging.getLevelName(levelno), msg), count)
+                for (msg, levelno), count in templates.items()),
+        }
+        # bypass the logger filters, this filter included
+        logger.callHandlers(record)
+
+    def _discard_idle_buckets(self, now):
+        """Discard the buckets that have refilled, as they are at rest.
+
+        :param now: The current monotonic time.
+        :type now: float
+        :return: None
+        """
+        burst = self.rate_burst
+        rate = self.rate_limit
+        self._buckets = dict(
+            (key, bucket) for key, bucket in self._buckets.items()
+            if bucket[0] + (now - bucket[1]) * rate < burst)
+
+
+class HandlerRegistry(object):
+    """A reference counted registry of shared log handlers.
+
+    Handlers are registered under a key that identifies the kind and target
+    of the handler, such as ``('file', '/var/log/service.log', formatter)``.
+    A handler is created by the factory given on first acquisition, and is
+    closed when its last reference is released.
+
+    A *logging.Filter* with a *close* method, such as :class:`LogStormFilter`,
+    may be registered as well, and is attached to a logger as a filter.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # The registered handlers and reference counts, keyed by handler key.
+        self._handlers = {}
+        # The attachment counts, keyed by logger and handler key.
+        self._attached = {}
+
+    def acquire(self, key, factory=None):
+        """Acquire a reference to a registered handler.
+
+        :param key: The key of the handler.
+        :type key: tuple
+        :param factory: A callable that creates the handler if the key is not
+            registered.
+        :type factory: callable
+        :return: The registered handler.
+        :rtype: logging.Handler
+        :raises KeyError: If the key is not registered and no factory is
+            given.
+        """
+        with self._lock:
+            entry = self._handlers.get(key)
+            if entry is None:
+                if factory is None:
+                    raise KeyError(key)
+                entry = self._handlers[key] = [factory(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key):
+        """Release a reference to a registered handler.
+
+        :param key: The key of the handler.
+        :type key: tuple
+        :return: None
+
+        The handler is closed and removed from the registry once its last
+        reference is released.
+        """
+        with self._lock:
+            entry = self._handlers.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._handlers[key]
+
+        entry[0].close()
+
+    def attach(self, logger, key, factory=None):
+        """Acquire a registered handler and attach it to a logger.
+
+        :param logger: The logger to attach the handler to.
+        :type logger: logging.Logger
+        :param key: The key of the handler.
+        :type key: tuple
+        :param factory: A callable that creates the handler if the key is not
+            registered.
+        :type factory: callable
+        :return: The attached handler.
+        :rtype: logging.Handler
+
+        The handler is added to the logger on the first attachment only.
+        """
+        with self._lock:
+            handler = self.acquire(key, factory)
+            attach_key = (logger, key)
+            count = self._attached.get(attach_key, 0)
+            if count == 0:
+                if isinstance(handler, logging.Filter):
+                    logger.addFilter(handler)
+                else:
+                    logger.addHandler(handler)
+            self._attached[attach_key] = count + 1
+            return handler
+
+    def detach(self, logger, key):
+        """Detach a registered handler from a logger and release it.
+
+        :param logger: The logger the handler is attached to.
+        :type logger: logging.Logger
+        :param key: The key of the handler.
+        :type key: tuple
+        :return: None
+
+        The handler is removed from the logger on the last detachment.
+        """
+        with self._lock:
+            attach_key = (logger, key)
+            count = self._attached.get(attach_key)
+            if count is None:
+                return
+            if count == 1:
+                del self._attached[attach_key]
+                handler = self._handlers[key][0]
+                if isinstance(handler, logging.Filter):
+                    logger.removeFilter(handler)
+                else:
+                    logger.removeHandler(handler)
+            else:
+                self._attached[attach_key] = count - 1
+            self.release(key)
+
+    def replace(self, logger, old_keys, specs):
+        """Detach registered handlers from a logger and attach others, in a
+        single step.
+
+        :param logger: The logger of the handlers.
+        :type logger: logging.Logger
+        :param old_keys: The keys of the handlers to detach.
+        :type old_keys: list<tuple>
+        :param specs: The keys and factories of the handlers to attach, in
+            the order they are attached.
+        :type specs: list<tuple>
+        :return: None
+
+        The handlers and filters of the logger are assigned at once, so that
+        a record logged concurrently is handled by either the old or the new
+        handlers, and is neither lost nor written by both. A handler that is
+        both detached and attached remains attached, and is not closed.
+        """
+        released = []
+        with self._lock:
+            attached = []
+            for key, factory in specs:
+                attached.append(self.acquire(key, factory))
+                attach_key = (logger, key)
+                self._attached[attach_key] = \
+                    self._attached.get(attach_key, 0) + 1
+
+            moved = set(id(handler) for handler in attached)
+            for key in old_keys:
+                attach_key = (logger, key)
+                count = self._attached.get(attach_key)
+                if count is None:
+                    continue
+                if count == 1:
+                    del self._attached[attach_key]
+                    moved.add(id(self._handlers[key][0]))
+                else:
+                    self._attached[attach_key] = count - 1
+                released.append(key)
+
+            handlers = [handler for handler in logger.handlers
+                        if id(handler) not in moved]
+            filters = [log_filter for log_filter in logger.filters
+                       if id(log_filter) not in moved]
+            for handler in attached:
+                if isinstance(handler, logging.Filter):
+                    filters.append(handler)
+                else:
+                    handlers.append(handler)
+            with logging._lock:  # pylint: disable=protected-access
+                logger.handlers = handlers
+                logger.filters = filters
+
+        for key in released:
+            self.release(key)
+
+    def reference_count(self, key):
+        """Retrieve the reference count of a registered handler.
+
+        :param key: The key of the handler.
+        :type key: tuple
+        :return: The reference count, zero if the key is not registered.
+        :rtype: int
+        """
+        with self._lock:
+            entry = self._handlers.get(key)
+            return entry[1] if entry is not None else 0
+
+
+# The process wide registry of the handlers created by ComponentCore.
+HANDLER_REGISTRY = HandlerRegistry()
+
+
+def async_listener(queue_size=DEFAULT_QUEUE_SIZE):
+    """Retrieve the process wide log listener, starting it if necessary.
+
+    :param queue_size: The maximum number of records held by the queue. Only
+        utilized when the listener is first created.
+    :type queue_size: int
+    :return: The running listener.
+    :rtype: AsyncLogListener
+    """
+    global _listener  # pylint: disable=global-statement
+    with _listener_lock:
+        if _listener is None:
+            _listener = AsyncLogListener(queue_size=queue_size)
+            atexit.register(stop_async_logging)
+        _listener.start()
+        return _listener
+
+
+def buffer_flusher():
+    """Retrieve the process wide flusher of buffered handlers.
+
+    :return: The buffer flusher.
+    :rtype: BufferFlusher
+    """
+    global _flusher  # pylint: disable=global-statement
+    if _flusher is None:
+        with _flusher_lock:
+            if _flusher is None:
+                _flusher = BufferFlusher()
+    return _flusher
+
+
+def json_formatter(service_name, debug=False):
+    """Retrieve the JSON formatter shared by the components of a service.
+
+    :param service_name: The service name added to every record.
+    :type service_name: str
+    :param debug: Include the source file and line of the log call.
+    :type debug: bool
+    :return: The JSON formatter for the service.
+    :rtype: JsonFormatter
+
+    Sharing the formatter allows the components of a service to share their
+    log handlers through :data:`HANDLER_REGISTRY`.
+    """
+    key = (service_name, debug)
+    formatter = _json_formatters.get(key)
+    if formatter is None:
+        formatter = _json_formatters.setdefault(
+            key, JsonFormatter({'service': service_name}, debug=debug))
+    return formatter
+
+
+def stop_async_logging():
+    """Stop the process wide log listener, writing out all queued records.
+
+    :return: None
+    """
+    listener = _listener
+    if listener is not None:
+        listener.stop()
+
+
+def dropped_records():
+    """Retrieve the count of records dropped due to a full log queue.
+
+    :return: The count of dropped records across all components.
+    :rtype: int
+    """
+    listener = _listener
+    return listener.dropped if listener is not None else 0
+
+
+def _buffered_handlers():
+    """Retrieve the registered handlers that buffer records.
+
+    :return: The buffered handlers.
+    :rtype: list<BufferedFileHandler>
+    """
+    # pylint: disable=protected-access
+    with HANDLER_REGISTRY._lock:
+        return [entry[0] for entry in HANDLER_REGISTRY._handlers.values()
+                if isinstance(entry[0], BufferedFileHandler)]
+
+
+def _before_fork():
+    """Write the buffered records of the registered handlers ahead of a fork,
+    so that the records are not inherited by the child process.
+    """
+    for handler in _buffered_handlers():
+        handler.flush()
+
+
+def _after_fork_in_child():
+    """Reset the process wide log state in a forked child process, in which
+    only the forking thread exists, and locks may have been held by others.
+    """
+    global _listener_lock, _flusher_lock  # pylint: disable=global-statement
+    _listener_lock = threading.Lock()
+    _flusher_lock = threading.Lock()
+    HANDLER_REGISTRY._lock = threading.RLock()  # pylint: disable=protected-access
+    if _listener is not None:
+        _listener._after_fork()  # pylint: disable=protected-access
+    if _flusher is not None:
+        _flusher._after_fork()  # pylint: disable=protected-access
+    # the records buffered by the parent process are written by the parent
+    for handler in _buffered_handlers():
+        handler.buffer = []
+        handler.flush_deadline = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(before=_before_fork,
+                        after_in_child=_after_fork_in_child)
@@ -0,0 +1,782 @@
+"""The *metrics* module provides the counters, gauges and latency histograms
+of a component, available as `self.metrics` of a
+:class:`~cognate.component_core.ComponentCore`.
+
+>>> from cognate.component_core import ComponentCore
+>>> class OrderService(ComponentCore):
+...     def place(self, order):
+...         with self.metrics.histogram('order_place_seconds').time():
+...             self.metrics.counter('orders_total').inc()
+>>> service = OrderService()
+>>> service.place('order')
+>>> service.metrics.snapshot()['orders_total']
+1
+
+The metrics of a registry are created on first use, by name. A name is
+limited to the letters, digits, underscores and colons allowed by the
+Prometheus text format.
+
+Thread Local Accumulation
+==========================
+
+Each thread that updates a metric is given a cell of its own, so that an
+increment or an observation is a plain update of a list item, without a lock
+and without contention among threads. The cells are merged when a
+:meth:`~MetricsRegistry.snapshot` is taken, and the cells of threads that
+have exited are folded into the metric, so that their counts are kept.
+
+Automatic Metrics
+==================
+
+A component configured with the ``--metrics_timing`` option records the
+seconds taken by its construction, as the *cognate_construct_seconds*
+histogram. If the component configures its own log output, it also records
+the seconds taken by its logger to filter, format and write each log record,
+as the *cognate_log_emit_seconds* histogram. Both histograms are shared by
+the components of the same service name, as is their logger, and are
+discarded once the last of those components is.
+
+Prometheus Output
+==================
+
+A component configured with the ``--metrics_port`` option serves its metrics
+in the Prometheus text format at ``http://127.0.0.1:<port>/metrics``, with a
+*service* label of its service name. The components served on the same port
+share a single server thread, and the metrics of components of the same
+service name are added together::
+
+    # HELP cognate_construct_seconds The seconds taken to construct the component.
+    # TYPE cognate_construct_seconds histogram
+    cognate_construct_seconds_bucket{service="OrderService",le="1e-05"} 0
+    ...
+
+The server is held by the process that started it. The worker processes of
+a :class:`~cognate.prefork.PreforkRunner` do not serve metrics of their own.
+"""
+import bisect
+import contextlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+import weakref
+
+# The default upper bounds, in seconds, of the buckets of a histogram.
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+# The interface the metrics server listens on.
+METRICS_HOST = '127.0.0.1'
+
+# The content type of the Prometheus text format.
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# The names allowed for a metric.
+_NAME_PATTERN = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*$')
+
+# Guards the cells of all metrics, taken only to add a cell and to merge the
+# cells of a metric.
+_cells_lock = threading.Lock()
+
+# The histograms shared by the components of a service, keyed by service name
+# and histogram name, held only as long as a component holds them.
+_shared_histograms = weakref.WeakValueDictionary()
+_shared_histograms_lock = threading.Lock()
+
+# The running metrics servers, keyed by port.
+_servers = {}
+_servers_lock = threading.Lock()
+
+# The request handler class of the metrics servers, created with the first
+# server.
+_request_handler = None
+
+
+class _Metric(object):
+    """The base of the metrics, holding a cell of values for each thread.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param description: The description of the metric.
+    :type description: str
+    """
+
+    # The kind of the metric, as named by the Prometheus text format.
+    kind = None
+
+    def __init__(self, name, description=''):
+        if not _NAME_PATTERN.match(name):
+            raise ValueError('"name" of %r is not a valid metric name.' %
+                             name)
+        self.name = name
+        self.description = description
+        self._local = threading.local()
+        # The cell of each thread that has updated the metric, with a weak
+        # reference to the thread.
+        self._cells = []
+        # The sum of the cells of the threads that have exited.
+        self._retired = self._new_values()
+
+    def _new_values(self):
+        """Create the values of an empty cell.
+
+        :return: The cell values.
+        :rtype: list
+        """
+        return [0]
+
+    def _cell(self):
+        """Retrieve the cell of the current thread, adding it if necessary.
+
+        :return: The cell of the current thread.
+        :rtype: list
+        """
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = self._new_values()
+            with _cells_lock:
+                self._cells.append(
+                    (weakref.ref(threading.current_thread()), cell))
+            return cell
+
+    def _merged(self):
+        """Merge the cells of all threads.
+
+        :return: The sum of the cell values.
+        :rtype: list
+        """
+        with _cells_lock:
+            merged = list(self._retired)
+            cells = []
+            for thread_ref, cell in self._cells:
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    # the thread no longer updates its cell
+                    _add_values(self._retired, cell)
+                else:
+                    cells.append((thread_ref, cell))
+                _add_values(merged, cell)
+            self._cells = cells
+        return merged
+
+    def snapshot(self):
+        """Retrieve the current value of the metric.
+
+        :return: The value of the metric.
+        :rtype: int, float, dict
+        """
+        return self._merged()[0]
+
+
+class Counter(_Metric):
+    """A count that only increases, such as the count of requests served.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param description: The description of the metric.
+    :type description: str
+    """
+
+    kind = 'counter'
+
+    def inc(self, amount=1):
+        """Increase the count.
+
+        :param amount: The amount to increase the count by.
+        :type amount: int, float
+        :return: None
+        :raises ValueError: If the amount is negative.
+        """
+        if amount < 0:
+            raise ValueError('"amount" of a counter can not be negative.')
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += amount
+
+
+class Gauge(_Metric):
+    """A value that may go up and down, such as the size of a queue.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param description: The description of the metric.
+    :type description: str
+
+    Increments and decrements are accumulated per thread. Setting the value
+    adjusts the base of the gauge against the current sum of the cells, so
+    that the cells are only ever written by their own threads.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name, description=''):
+        super().__init__(name, description)
+        self._base = 0
+
+    def inc(self, amount=1):
+        """Increase the value.
+
+        :param amount: The amount to increase the value by.
+        :type amount: int, float
+        :return: None
+        """
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[0] += amount
+
+    def dec(self, amount=1):
+        """Decrease the value.
+
+        :param amount: The amount to decrease the value by.
+        :type amount: int, float
+        :return: None
+        """
+        self.inc(-amount)
+
+    def set(self, value):
+        """Set the value.
+
+        :param value: The value of the gauge.
+        :type value: int, float
+        :return: None
+        """
+        self._base = value - self._merged()[0]
+
+    def snapshot(self):
+        return self._base + self._merged()[0]
+
+
+class Histogram(_Metric):
+    """The distribution of observed values, such as latencies, counted in
+    buckets of fixed upper bounds.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param description: The description of the metric.
+    :type description: str
+    :param buckets: The increasing upper bounds of the buckets. A bucket of
+        an infinite bound is added for the values above the last bound.
+    :type buckets: tuple<float>
+    :raises ValueError: If the bounds are empty or not increasing.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, description='', buckets=DEFAULT_BUCKETS):
+        if buckets is not DEFAULT_BUCKETS:
+            buckets = tuple(float(bound) for bound in buckets)
+            if not buckets or any(lower >= upper for lower, upper
+                                  in zip(buckets, buckets[1:])):
+                raise ValueError('"buckets" must be increasing bounds.')
+            if buckets[-1] == math.inf:
+                buckets = buckets[:-1]
+        self.buckets = buckets
+        super().__init__(name, description)
+
+    def _new_values(self):
+        # a count per bucket, the count of the infinite bucket and the sum
+        return [0] * (len(self.buckets) + 2)
+
+    def observe(self, value):
+        """Count an observed value.
+
+        :param value: The value, such as the seconds of an operation.
+        :type value: float
+        :return: None
+        """
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextlib.contextmanager
+    def time(self):
+        """Observe the seconds taken by the body of a *with* statement.
+
+        :return: A context manager.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        """Retrieve the counts of the histogram.
+
+        :return: The cumulative count of each bucket, as a list of upper
+            bound and count pairs ending with the infinite bound, along with
+            the sum and count of the observed values.
+        :rtype: dict
+        """
+        merged = self._merged()
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(self.buckets + (math.inf,), merged[:-1]):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {'buckets': buckets, 'sum': merged[-1], 'count': cumulative}
+
+
+class MetricsRegistry(object):
+    """The metrics of a component, keyed by name.
+
+    A metric is created on the first retrieval of its name, subsequent
+    retrievals return the same metric.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def counter(self, name, description=''):
+        """Retrieve a counter, creating it if necessary.
+
+        :param name: The name of the counter.
+        :type name: str
+        :param description: The description of the counter, utilized when it
+            is created.
+        :type description: str
+        :return: The counter.
+        :rtype: Counter
+        :raises ValueError: If the name is not valid, or names a metric of
+            another kind.
+        """
+        return self._metric(Counter, name, description)
+
+    def gauge(self, name, description=''):
+        """Retrieve a gauge, creating it if necessary.
+
+        :param name: The name of the gauge.
+        :type name: str
+        :param description: The description of the gauge, utilized when it
+            is created.
+        :type description: str
+        :return: The gauge.
+        :rtype: Gauge
+        :raises ValueError: If the name is not valid, or names a metric of
+            another kind.
+        """
+        return self._metric(Gauge, name, description)
+
+    def histogram(self, name, description='', buckets=DEFAULT_BUCKETS):
+        """Retrieve a histogram, creating it if necessary.
+
+        :param name: The name of the histogram.
+        :type name: str
+        :param description: The description of the histogram, utilized when
+            it is created.
+        :type description: str
+        :param buckets: The upper bounds of the buckets, utilized when the
+            histogram is created.
+        :type buckets: tuple<float>
+        :return: The histogram.
+        :rtype: Histogram
+        :raises ValueError: If the name is not valid, or names a metric of
+            another kind.
+        """
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics.setdefault(
+                name, Histogram(name, description, buckets))
+        return _checked_kind(metric, Histogram)
+
+    def register(self, metric):
+        """Add a metric created elsewhere, such as a metric shared by
+        components, replacing any metric of the same name.
+
+        :param metric: The metric.
+        :type metric: Counter, Gauge, Histogram
+        :return: None
+        """
+        self._metrics[metric.name] = metric
+
+    def collect(self):
+        """Retrieve the metrics of the registry.
+
+        :return: The metrics, ordered by name.
+        :rtype: list
+        """
+        return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def snapshot(self):
+        """Retrieve the current values of the metrics.
+
+        :return: The value of each metric, keyed by name, see the *snapshot*
+            method of the metric.
+        :rtype: dict
+        """
+        return dict((metric.name, metric.snapshot())
+                    for metric in self.collect())
+
+    def render(self, service_name=None):
+        """Render the metrics in the Prometheus text format.
+
+        :param service_name: The value of the *service* label of the
+            metrics, if any.
+        :type service_name: str
+        :return: The metrics text.
+        :rtype: str
+        """
+        return render_text([(service_name, self)])
+
+    def _metric(self, metric_class, name, description):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics.setdefault(
+                name, metric_class(name, description))
+        return _checked_kind(metric, metric_class)
+
+
+class LogEmitStart(logging.Filter):
+    """A logger filter that marks the start of the emit of a record, for a
+    :class:`LogEmitTimer` of the logger.
+
+    Attached ahead of the other filters of a logger, the filter marks each
+    record with the *time.perf_counter* value at which the logger began to
+    handle it.
+    """
+
+    def filter(self, record):
+        record.cognate_emit_start = time.perf_counter()
+        return True
+
+    def close(self):
+        """The filter holds no resources.
+
+        :return: None
+        """
+
+
+class LogEmitTimer(logging.Handler):
+    """A log handler that observes the seconds taken by a logger to emit a
+    record.
+
+    :param histogram: The histogram of the seconds.
+    :type histogram: Histogram
+
+    Attached after the output handlers of a logger, the handler observes the
+    time since the record was marked by the :class:`LogEmitStart` filter of
+    the logger, which is the time taken to filter, format and write the
+    record. With the ``--log_async`` option, this is the time taken to queue
+    the record. A record that was not marked, such as a record propagated
+    from another logger, is not observed.
+    """
+
+    def __init__(self, histogram):
+        super().__init__()
+        self.histogram = histogram
+
+    def handle(self, record):
+        # no output is written, and so the handler lock is not taken
+        start = getattr(record, 'cognate_emit_start', None)
+        if start is not None:
+            self.histogram.observe(time.perf_counter() - start)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+class MetricsServer(object):
+    """A background thread serving the metrics of components in the
+    Prometheus text format on a local port.
+
+    :param port: The port to listen on.
+    :type port: int
+    :raises OSError: If the port can not be bound.
+
+    Components are registered with the server of their ``--metrics_port``,
+    and are held by weak reference. The *http.server* module is imported by
+    the first server, rather than by the import of this module.
+    """
+
+    def __init__(self, port):
+        import http.server  # pylint: disable=import-outside-toplevel
+
+        self._components = weakref.WeakKeyDictionary()
+        self._http_server = http.server.ThreadingHTTPServer(
+            (METRICS_HOST, port), _request_handler_class())
+        self._http_server.daemon_threads = True
+        self._http_server.metrics_server = self
+        # The port listened on.
+        self.port = self._http_server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        """Start the server thread.
+
+        :return: None
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._http_server.serve_forever,
+                kwargs={'poll_interval': 0.1},
+                name='CognateMetricsServer-%d' % self.port)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop the server thread and close the port.
+
+        :return: None
+        """
+        if self._thread is not None:
+            self._http_server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._http_server.server_close()
+
+    def register(self, component):
+        """Register a component to have its metrics served.
+
+        :param component: The component.
+        :type component: cognate.component_core.ComponentCore
+        :return: None
+        """
+        self._components[component] = True
+
+    def unregister(self, component):
+        """Unregister a component.
+
+        :param component: The component.
+        :type component: cognate.component_core.ComponentCore
+        :return: True if no component remains registered.
+        :rtype: bool
+        """
+        self._components.pop(component, None)
+        return not self._components
+
+    def render(self):
+        """Render the metrics of the registered components.
+
+        :return: The metrics text.
+        :rtype: str
+        """
+        return render_text([(component.service_name, component.metrics)
+                            for component in list(self._components)])
+
+
+def _request_handler_class():
+    """Retrieve the request handler class of the metrics servers, creating
+    it on first use.
+
+    :return: The request handler class.
+    :rtype: type
+    """
+    global _request_handler  # pylint: disable=global-statement
+    if _request_handler is None:
+        import http.server  # pylint: disable=import-outside-toplevel
+
+        class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+            """Answers a request for the metrics of a
+            :class:`MetricsServer`."""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = self.server.metrics_server.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass  # requests are not written to stderr
+
+        _request_handler = _MetricsRequestHandler
+    return _request_handler
+
+
+def serve_metrics(component, port):
+    """Serve the metrics of a component on a local port, withdrawing them
+    from any other port.
+
+    :param component: The component.
+    :type component: cognate.component_core.ComponentCore
+    :param port: The port to serve the metrics on, 0 to withdraw them only.
+    :type port: int
+    :return: The server of the port, or None if the port is 0.
+    :rtype: MetricsServer
+    :raises OSError: If the port can not be bound.
+
+    A server is started for the first component of its port, and stopped
+    once no component remains registered with it.
+    """
+    with _servers_lock:
+        for server_port, server in list(_servers.items()):
+            if server_port != port and server.unregister(component):
+                del _servers[server_port]
+                server.stop()
+        if not port:
+            return None
+        server = _servers.get(port)
+        if server is None:
+            server = _servers[port] = MetricsServer(port)
+            server.start()
+        server.register(component)
+        return server
+
+
+def shared_histogram(service_name, name, description=''):
+    """Retrieve a histogram shared by the components of a service, creating
+    it if necessary.
+
+    :param service_name: The service name of the components.
+    :type service_name: str
+    :param name: The name of the histogram.
+    :type name: str
+    :param description: The description of the histogram, utilized when it
+        is created.
+    :type description: str
+    :return: The histogram, of the default buckets.
+    :rtype: Histogram
+
+    The histogram is held only by its users, such as the metrics of the
+    components, and is discarded along with the last of them.
+    """
+    key = (service_name, name)
+    histogram = _shared_histograms.get(key)
+    if histogram is None:
+        with _shared_histograms_lock:
+            histogram = _shared_histograms.get(key)
+            if histogram is None:
+                histogram = _shared_histograms[key] = Histogram(name,
+                                                               description)
+    return histogram
+
+
+def render_text(registries):
+    """Render the metrics of registries in the Prometheus text format.
+
+    :param registries: The *service* label value, which may be None, and
+        the registry of each component.
+    :type registries: list<tuple>
+    :return: The metrics text.
+    :rtype: str
+
+    The metrics of the same name and *service* label are added together,
+    counting a metric held by more than one registry once.
+    """
+    # the kind, description and value of each series, keyed by name
+    families = {}
+    seen = set()
+    for service_name, registry in registries:
+        for metric in registry.collect():
+            if (service_name, id(metric)) in seen:
+                continue
+            seen.add((service_name, id(metric)))
+            family = families.setdefault(
+                metric.name, (metric.kind, metric.description, {}))
+            if family[0] != metric.kind:
+                continue
+            series = family[2]
+            value = metric.snapshot()
+            if service_name not in series:
+                series[service_name] = value
+            elif metric.kind != 'histogram':
+                series[service_name] += value
+            else:
+                series[service_name] = _add_histograms(series[service_name],
+                                                       value)
+
+    lines = []
+    for name in sorted(families):
+        kind, description, series = families[name]
+        if description:
+            lines.append('# HELP %s %s' % (name, description.replace(
+                '\\', '\\\\').replace('\n', '\\n')))
+        lines.append('# TYPE %s %s' % (name, kind))
+        for service_name in sorted(series, key=str):
+            labels = []
+            if service_name is not None:
+                labels.append('service="%s"' % _escape_label(service_name))
+            value = series[service_name]
+            if kind != 'histogram':
+                lines.append('%s%s %s' % (name, _labels(labels),
+                                          _format_value(value)))
+                continue
+            for bound, count in value['buckets']:
+                bucket_labels = labels + ['le="%s"' % _format_value(bound)]
+                lines.append('%s_bucket%s %d' % (name, _labels(bucket_labels),
+                                                 count))
+            lines.append('%s_sum%s %s' % (name, _labels(labels),
+                                          _format_value(value['sum'])))
+            lines.append('%s_count%s %d' % (name, _labels(labels),
+                                            value['count']))
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _checked_kind(metric, metric_class):
+    if not isinstance(metric, metric_class):
+        raise ValueError('"%s" is a %s metric of the registry.' %
+                         (metric.name, metric.kind))
+    return metric
+
+
+def _add_values(target, values):
+    for index, value in enumerate(values):
+        target[index] += value
+
+
+def _add_histograms(first, second):
+    """Add the snapshots of two histograms of the same buckets.
+
+    :return: The sum of the snapshots, or the first snapshot if the buckets
+        differ.
+    :rtype: dict
+    """
+    bounds = [bound for bound, _ in first['buckets']]
+    if bounds != [bound for bound, _ in second['buckets']]:
+        return first
+    return {'buckets': [(bound, count + other) for (bound, count), (_, other)
+                        in zip(first['buckets'], second['buckets'])],
+            'sum': first['sum'] + second['sum'],
+            'count': first['count'] + second['count']}
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n')
+
+
+def _labels(labels):
+    return '{%s}' % ','.join(labels) if labels else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _after_fork_in_child():
+    """Reset the process wide metrics state in a forked child process, which
+    does not serve the metrics of the parent process.
+    """
+    # pylint: disable=global-statement
+    global _cells_lock, _servers_lock, _shared_histograms_lock
+    _cells_lock = threading.Lock()
+    _servers_lock = threading.Lock()
+    _shared_histograms_lock = threading.Lock()
+    for server in _servers.values():
+        # the server thread does not exist in the child
+        server._http_server.server_close()  # pylint: disable=protected-access
+    _servers.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
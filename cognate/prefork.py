@@ -0,0 +1,230 @@
+"""The *PreforkRunner* class runs a configured component in forked worker
+processes, to make use of more than one processor core.
+
+The component is configured once, in the parent process. The parent then
+forks the worker processes, which inherit the configured component, copy on
+write, rather than each configuring a component of its own. Each worker is
+assigned a service name derived from that of the component, of the form
+``<service_name>-<index>``, so that each worker logs to a log file of its
+own. The parent process supervises the workers, restarting a worker that
+exits on an error or a signal.
+
+The number of workers is given by the ``--workers`` option of the component,
+and the garbage collector is frozen before forking with the ``--gc_freeze``
+option, which keeps the collector of a worker from touching, and so copying,
+the memory pages of the objects created by the parent. The collector of the
+parent process is unfrozen again once the worker is forked.
+
+The records held by buffered log handlers are written before forking, see
+:mod:`cognate.log_support`, so that a worker does not inherit, and write
+again, the pending records of the parent.
+
+For example, a service started with ``--workers 4 --log_path /var/log``::
+
+    service = HelloWorld(argv=sys.argv)
+    PreforkRunner(service, 'run').run()
+
+runs *HelloWorld.run* in four worker processes, logging to the files
+*HelloWorld-0.log* through *HelloWorld-3.log*.
+"""
+import gc
+import logging
+import os
+import signal
+import time
+
+from cognate import log_support
+
+# The default seconds before a failed worker is restarted.
+DEFAULT_RESTART_DELAY = 1.0
+
+
+class PreforkRunner(object):
+    """Runs a target of a configured component in forked worker processes.
+
+    :param component: The configured component.
+    :type component: cognate.component_core.ComponentCore
+    :param target: The method name, or a callable accepting the component,
+        that performs the work of a worker.
+    :type target: str, callable
+    :param workers: The number of worker processes, the default being the
+        *workers* option of the component. With 0 workers, the target is run
+        in the calling process.
+    :type workers: int
+    :param gc_freeze: Freeze the garbage collector before forking, the
+        default being the *gc_freeze* option of the component.
+    :type gc_freeze: bool
+    :param restart_delay: The seconds before a failed worker is restarted.
+    :type restart_delay: float
+
+    A worker that returns from the target exits with a status of 0, and is
+    not restarted. A worker that raises an exception exits with a status of
+    1, and is restarted along with a worker that is terminated by a signal.
+    Upon SIGTERM or SIGINT, the parent process terminates the workers, and
+    :meth:`~PreforkRunner.run` returns once the workers have exited.
+    """
+
+    def __init__(self, component, target, workers=None, gc_freeze=None,
+                 restart_delay=DEFAULT_RESTART_DELAY):
+        self.component = component
+        self.target = target
+        self.workers = component.workers if workers is None else workers
+        self.gc_freeze = component.gc_freeze if gc_freeze is None \
+            else gc_freeze
+        self.restart_delay = restart_delay
+        # The worker index of each running worker process, keyed by pid.
+        self.worker_pids = {}
+        # The count of worker processes restarted after a failure.
+        self.restarts = 0
+        # The index of the worker in a worker process, otherwise None.
+        self.worker_index = None
+        self._stopping = False
+
+    def run(self):
+        """Run the target in the worker processes, until all workers exit
+        without error, or the runner is stopped.
+
+        :return: None
+        :raises ValueError: If workers are requested on a platform without
+            *os.fork*.
+        """
+        if self.workers < 1:
+            self._invoke_target()
+            return
+        if not hasattr(os, 'fork'):
+            raise ValueError('"workers" requires a platform with os.fork.')
+
+        log = self.component.log
+        previous_handlers = dict(
+            (signum, signal.signal(signum, self._handle_signal))
+            for signum in (signal.SIGTERM, signal.SIGINT))
+        try:
+            for index in range(self.workers):
+                self._spawn(index)
+            log.info('Started %d workers', self.workers)
+
+            self._supervise()
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def stop(self):
+        """Terminate the worker processes, without restarting them.
+
+        :return: None
+        """
+        self._stopping = True
+        for pid in list(self.worker_pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def worker_service_name(self, index):
+        """Derive the service name of a worker.
+
+        :param index: The index of the worker.
+        :type index: int
+        :return: The service name of the worker.
+        :rtype: str
+        """
+        return '%s-%d' % (self.component.service_name, index)
+
+    def _spawn(self, index):
+        """Fork a worker process.
+
+        :param index: The index of the worker.
+        :type index: int
+        :return: None
+        """
+        freeze = self.gc_freeze and hasattr(gc, 'freeze')
+        if freeze:
+            gc.collect()
+            gc.freeze()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                self._run_worker(index)  # never returns
+        finally:
+            if freeze:
+                # only the objects inherited by the worker remain frozen
+                gc.unfreeze()
+        self.worker_pids[pid] = index
+        self.component.log.debug('Worker %d started with pid %d', index, pid)
+
+    def _run_worker(self, index):
+        """Run the target in a forked worker process, then exit the process.
+
+        :param index: The index of the worker.
+        :type index: int
+        :return: None
+        """
+        status = 1
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            self.worker_index = index
+            self.worker_pids = {}
+
+            # only the name and log of the worker are derived, the configure
+            # hooks of the component are not run again
+            component = self.component
+            component.service_name = self.worker_service_name(index)
+            component.service_name_set = True
+            log_path = component.log_path
+            if log_path and log_path.endswith('.log'):
+                component.log_path = '%s-%d.log' % (log_path[:-4], index)
+            component._reconfigure_logging()  # pylint: disable=protected-access
+
+            self._invoke_target()
+            status = 0
+        except SystemExit as error:
+            status = error.code if isinstance(error.code, int) else 1
+        except BaseException:  # pylint: disable=broad-except
+            logging.getLogger(self.worker_service_name(index)).exception(
+                'Worker %d failed', index)
+        finally:
+            try:
+                self.component.close()
+                log_support.stop_async_logging()
+            finally:
+                os._exit(status)  # pylint: disable=protected-access
+
+    def _invoke_target(self):
+        if callable(self.target):
+            self.target(self.component)
+        else:
+            getattr(self.component, self.target)()
+
+    def _supervise(self):
+        """Wait on the worker processes, restarting those that fail.
+
+        :return: None
+        """
+        log = self.component.log
+        while self.worker_pids:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            index = self.worker_pids.pop(pid, None)
+            if index is None:
+                continue
+
+            if os.WIFSIGNALED(status):
+                code = -os.WTERMSIG(status)
+            else:
+                code = os.WEXITSTATUS(status)
+            if code == 0 or self._stopping:
+                log.info('Worker %d exited with status %d', index, code)
+                continue
+
+            log.warning('Worker %d failed with status %d, restarting in %ss',
+                        index, code, self.restart_delay)
+            time.sleep(self.restart_delay)
+            if not self._stopping:
+                self.restarts += 1
+                self._spawn(index)
+
+    def _handle_signal(self, signum, frame):  # pylint: disable=unused-argument
+        self.stop()
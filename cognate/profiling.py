@@ -0,0 +1,522 @@
+"""The *profiling* module provides the means to find where the time of a
+component goes.
+
+Startup Profile
+================
+
+A component configured with the ``--profile_startup`` option records a
+:class:`StartupProfile` of its construction, held by the *startup_profile*
+attribute of the instance. The profile holds the seconds spent in each phase
+of the configuration, and in each hook function invoked on the class
+hierarchy, so that a slow construction can be traced to the class at fault.
+
+The phases are, in order:
+
+    - *tokenize*, the splitting of an argument string.
+    - *sources*, the reading of the configuration file and environment.
+    - *arguments*, the resolution of the arguments, including the
+      *cognate_options* hooks.
+    - *assign*, the assignment of the options to the instance.
+    - *configure*, the *cognate_configure* hooks, of which the *logging*
+      phase is the configuration of the log by *ComponentCore*.
+    - *complete*, the registration for configuration reload and the
+      remaining work of the construction.
+
+The *tokenize* phase is recorded for an argument string only. A profile
+enabled by the configuration file or an environment variable begins with the
+*arguments* phase. The profile is also logged as a debug record, with the
+profile as the structured fields of the record.
+
+>>> from cognate.component_core import ComponentCore
+>>> class Store(ComponentCore):
+...     def cognate_configure(self, args):
+...         self.ready = True
+>>> store = Store(argv='--profile_startup')
+>>> list(store.startup_profile.phases)
+['tokenize', 'sources', 'arguments', 'assign', 'logging', 'configure', \
+'complete']
+>>> [(hook['hook'], hook['class']) for hook in store.startup_profile.hooks
+...  if hook['hook'] == 'cognate_configure']
+[('cognate_configure', 'cognate.component_core.ComponentCore'), \
+('cognate_configure', 'cognate.profiling.Store')]
+
+Sampling Profiler
+==================
+
+A component configured with the ``--profile_sample_hz`` option is registered
+with the process wide :class:`SamplingProfiler`. A single background thread
+samples the stack of every thread in the process at the highest rate asked
+for by a registered component, counting the samples of each distinct stack.
+The counts are cheap to keep, as a stack is held by the identity of its code
+objects and rendered to text only when written, and the stack of a thread
+that has not moved since the last sample is not walked again.
+
+The samples are written in the collapsed stack format of the *FlameGraph*
+tools, one line per stack, of the form ``thread;outer;...;inner count``, to
+``<log_path>/<service_name>.collapsed``, or beside the log file when
+*log_path* names a ``.log`` file. The output is written when the process
+receives SIGUSR1, when the component is closed, and when the process exits.
+Each output holds the samples of the process since the profiler started::
+
+    flamegraph.pl /var/log/OrderService.collapsed > OrderService.svg
+
+A sample costs some microseconds for each thread, so that sampling at 100 Hz
+takes well under 1% of the run time of a process of a few threads, see
+*bench/sampling_bench.py*.
+"""
+import atexit
+import os
+import signal
+import sys
+import threading
+import time
+import weakref
+
+# The signal that has the sampling profiler write its output, where supported.
+DUMP_SIGNAL = getattr(signal, 'SIGUSR1', None)
+
+# The file name extension of the collapsed stack output.
+OUTPUT_EXTENSION = '.collapsed'
+
+# The process wide sampling profiler, created on first use.
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+class StartupProfile(object):
+    """The seconds spent in the phases and hooks of the configuration of a
+    component.
+
+    :param clock: The clock utilized to time the phases, returning seconds.
+    :type clock: callable
+
+    The profile is active from its creation until
+    :meth:`~StartupProfile.finish`, while the hooks invoked on the component
+    are recorded.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        # The seconds spent in each phase, in the order of the phases.
+        self.phases = {}
+        # The hook calls, in order, each with the hook name, the qualified
+        # name of the class defining the hook function, and the seconds.
+        self.hooks = []
+        # The seconds from the creation of the profile until it is finished.
+        self.total = None
+        self._clock = clock
+        self._start = self._mark = clock()
+
+    @property
+    def active(self):
+        """True until the profile is finished.
+
+        :rtype: bool
+        """
+        return self.total is None
+
+    def mark(self, phase):
+        """Record the end of a phase, which began at the end of the previous
+        phase.
+
+        :param phase: The name of the phase.
+        :type phase: str
+        :return: None
+        """
+        now = self._clock()
+        self.add_phase(phase, now - self._mark)
+        self._mark = now
+
+    def add_phase(self, phase, seconds):
+        """Record the seconds spent in a phase.
+
+        :param phase: The name of the phase.
+        :type phase: str
+        :param seconds: The seconds spent in the phase, which are added to
+            any seconds already recorded for the phase.
+        :type seconds: float
+        :return: None
+        """
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_hook(self, hook, func, seconds):
+        """Record the seconds spent in a hook function.
+
+        :param hook: The name of the hook.
+        :type hook: str
+        :param func: The hook function.
+        :type func: function
+        :param seconds: The seconds spent in the hook function.
+        :type seconds: float
+        :return: None
+        """
+        owner = func.__qualname__.rpartition('.')[0]
+        self.hooks.append({'hook': hook,
+                           'class': '%s.%s' % (func.__module__, owner),
+                           'seconds': seconds})
+
+    def finish(self):
+        """Finish the profile, recording the total seconds.
+
+        :return: None
+        """
+        if self.total is None:
+            self.total = self._clock() - self._start
+
+    def class_totals(self):
+        """Total the seconds spent in the hooks of each class.
+
+        :return: The qualified class names and their seconds, with the
+            slowest class first.
+        :rtype: list<tuple<str, float>>
+        """
+        totals = {}
+        for hook in self.hooks:
+            totals[hook['class']] = totals.get(hook['class'], 0.0) + \
+                hook['seconds']
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def as_dict(self):
+        """Render the profile as plain data, as for JSON.
+
+        :return: The *total* seconds, the *phases* seconds keyed by phase, the
+            *hooks* calls, and the *classes* totals.
+        :rtype: dict
+        """
+        return {'total': self.total,
+                'phases': dict(self.phases),
+                'hooks': [dict(hook) for hook in self.hooks],
+                'classes': self.class_totals()}
+
+    def __str__(self):
+        text = ', '.join('%s %.3fms' % (phase, seconds * 1000)
+                         for phase, seconds in self.phases.items())
+        if self.total is not None:
+            text = 'total %.3fms: %s' % (self.total * 1000, text)
+        class_totals = self.class_totals()
+        if class_totals:
+            text += '; slowest hooks %s %.3fms' % (class_totals[0][0],
+                                                  class_totals[0][1] * 1000)
+        return text
+
+
+class SamplingProfiler(object):
+    """A background thread that samples the stacks of the threads of the
+    process, for the components registered with it.
+
+    Components configured with the ``--profile_sample_hz`` option are
+    registered with the process wide profiler, and are held by weak
+    reference. The thread samples at the highest rate of the registered
+    components, and stops once no component is registered.
+
+    The output of every registered component is written on SIGUSR1, provided
+    that the profiler thread is started from the main thread, and at exit.
+    A previously installed SIGUSR1 handler is still invoked.
+    """
+
+    def __init__(self):
+        # The sample rate of the registered components.
+        self._components = weakref.WeakKeyDictionary()
+        # The count of samples of each stack, keyed by thread ident and the
+        # tuple of the ids of the code objects of the stack, outermost first.
+        self._counts = {}
+        # The code objects of the sampled stacks, keyed by id.
+        self._code_objects = {}
+        # The innermost frame and count key of each thread at the last
+        # sample, keyed by thread ident.
+        self._last_stacks = {}
+        # The names of the sampled threads, keyed by thread ident.
+        self._thread_names = {}
+        # The count of samples taken.
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._write_all = False
+        self._thread = None
+        self._previous_handler = None
+        self._signal_installed = False
+        self._exit_registered = False
+
+    def register(self, component):
+        """Register a component to be sampled at its *profile_sample_hz*
+        rate.
+
+        :param component: The component to sample.
+        :type component: cognate.component_core.ComponentCore
+        :return: None
+        """
+        with self._lock:
+            self._components[component] = component.profile_sample_hz
+            if self._thread is None:
+                self._start()
+        self._wakeup.set()
+
+    def unregister(self, component):
+        """Stop sampling for a component, writing its output.
+
+        :param component: The component to stop sampling for.
+        :type component: cognate.component_core.ComponentCore
+        :return: None
+        """
+        with self._lock:
+            registered = self._components.pop(component, None) is not None
+        if registered:
+            self.write_output(component)
+            self._wakeup.set()
+
+    def is_registered(self, component):
+        """Determine if a component is registered with the profiler.
+
+        :param component: The component to check.
+        :type component: cognate.component_core.ComponentCore
+        :return: True if the component is registered.
+        :rtype: bool
+        """
+        with self._lock:
+            return component in self._components
+
+    def request_write(self):
+        """Have the profiler thread write the output of every registered
+        component.
+
+        :return: None
+
+        This is the action taken on SIGUSR1. It is safe to call from a signal
+        handler, as the output is written by the profiler thread.
+        """
+        self._write_all = True
+        self._wakeup.set()
+
+    def write_all(self):
+        """Write the output of every registered component.
+
+        :return: None
+        """
+        with self._lock:
+            components = list(self._components.keys())
+        for component in components:
+            self.write_output(component)
+
+    def write_output(self, component):
+        """Write the collapsed stacks to the output file of a component.
+
+        :param component: The component to write the output of.
+        :type component: cognate.component_core.ComponentCore
+        :return: The path of the output file, or None if the component has
+            no *log_path*.
+        :rtype: str
+        """
+        output_path = _output_path(component)
+        if output_path is None:
+            return None
+
+        temp_path = '%s.%d.tmp' % (output_path, os.getpid())
+        with open(temp_path, 'w') as output_file:
+            for line in self.collapsed():
+                output_file.write(line)
+                output_file.write('\n')
+        os.replace(temp_path, output_path)
+        return output_path
+
+    def collapsed(self):
+        """Render the samples in the collapsed stack format.
+
+        :return: A line for each distinct stack, with the count of samples.
+        :rtype: list<str>
+        """
+        with self._lock:
+            counts = list(self._counts.items())
+            thread_names = dict(self._thread_names)
+            code_objects = dict(self._code_objects)
+
+        labels = {}
+        lines = []
+        for (ident, code_ids), count in counts:
+            frames = [thread_names.get(ident, 'Thread-%d' % ident)]
+            for code_id in code_ids:
+                label = labels.get(code_id)
+                if label is None:
+                    code = code_objects[code_id]
+                    label = labels[code_id] = '%s (%s:%d)' % (
+                        code.co_name, code.co_filename, code.co_firstlineno)
+                frames.append(label)
+            lines.append('%s %d' % (';'.join(frames), count))
+        lines.sort()
+        return lines
+
+    def _stack_key(self, ident, frame):
+        """Create the count key of the stack of a frame, with the lock held.
+
+        :param ident: The ident of the thread of the frame.
+        :type ident: int
+        :param frame: The innermost frame of the stack.
+        :type frame: frame
+        :return: The key of the stack in the counts.
+        :rtype: tuple
+        """
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        # code objects are compared by identity, which is far cheaper than
+        # their equality, and held for the rendering of the stacks
+        key = (ident, tuple(map(id, reversed(codes))))
+        if key not in self._counts:
+            self._counts[key] = 0
+            code_objects = self._code_objects
+            for code in codes:
+                code_objects[id(code)] = code
+        return key
+
+    def clear(self):
+        """Discard the samples taken.
+
+        :return: None
+        """
+        with self._lock:
+            self._counts = {}
+            self._code_objects = {}
+            self._last_stacks = {}
+            self.samples = 0
+
+    def _start(self):
+        """Start the profiler thread, with the lock held."""
+        if not self._signal_installed:
+            self._install_signal_handler()
+        if not self._exit_registered:
+            atexit.register(self._at_exit)
+            self._exit_registered = True
+        self._thread = threading.Thread(target=self._sample_loop,
+                                        name='CognateSamplingProfiler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _install_signal_handler(self):
+        if DUMP_SIGNAL is None or \
+                threading.current_thread() is not threading.main_thread():
+            return
+        self._previous_handler = signal.signal(DUMP_SIGNAL,
+                                               self._handle_signal)
+        self._signal_installed = True
+
+    def _handle_signal(self, signum, frame):
+        self.request_write()
+        previous = self._previous_handler
+        if callable(previous):
+            previous(signum, frame)
+
+    def _at_exit(self):
+        self.write_all()
+
+    def _after_fork(self):
+        """Reset the profiler in a forked child process, which inherits the
+        registered components, but no profiler thread. The samples of the
+        parent process are discarded, and sampling resumes for the child.
+        """
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._counts = {}
+        self._code_objects = {}
+        self._last_stacks = {}
+        self._thread_names = {}
+        self.samples = 0
+        self._thread = None
+        if len(self._components):
+            self._start()
+
+    def _sample_loop(self):
+        own_ident = threading.get_ident()
+        while True:
+            with self._lock:
+                rates = list(self._components.values())
+                if not rates:
+                    self._thread = None
+                    return
+            interval = 1.0 / max(rates)
+
+            if self._wakeup.wait(interval):
+                self._wakeup.clear()
+                write_all, self._write_all = self._write_all, False
+                if write_all:
+                    self.write_all()
+                continue
+
+            self.sample(own_ident)
+
+    def sample(self, exclude=None):
+        """Take a single sample of the stacks of the threads of the process.
+
+        :param exclude: The ident of a thread not to sample, such as the
+            profiler thread itself.
+        :type exclude: int
+        :return: None
+        """
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        with self._lock:
+            counts = self._counts
+            last_stacks = self._last_stacks
+            stacks = {}
+            for ident, frame in frames.items():
+                if ident == exclude:
+                    continue
+                # the stack beneath a frame is fixed for the life of the
+                # frame, so that an idle thread is not walked again
+                last = last_stacks.get(ident)
+                if last is not None and last[0] is frame:
+                    key = last[1]
+                else:
+                    key = self._stack_key(ident, frame)
+                stacks[ident] = (frame, key)
+                counts[key] += 1
+                if ident not in self._thread_names:
+                    self._thread_names.update(
+                        (thread.ident, thread.name)
+                        for thread in threading.enumerate())
+            # the frames are held until the next sample only
+            self._last_stacks = stacks
+            self.samples += 1
+
+
+def sampling_profiler():
+    """Retrieve the process wide sampling profiler.
+
+    :return: The sampling profiler.
+    :rtype: SamplingProfiler
+    """
+    global _profiler  # pylint: disable=global-statement
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SamplingProfiler()
+    return _profiler
+
+
+def _output_path(component):
+    """Resolve the collapsed stack output file of a component.
+
+    :param component: The component.
+    :type component: cognate.component_core.ComponentCore
+    :return: The absolute path of the file, or None if the component has no
+        *log_path*.
+    :rtype: str
+    """
+    log_path = component.log_path
+    if not log_path:
+        return None
+    if log_path.endswith('.log'):
+        output_path = log_path[:-len('.log')] + OUTPUT_EXTENSION
+    else:
+        output_path = os.path.join(log_path,
+                                   component.service_name + OUTPUT_EXTENSION)
+    return os.path.abspath(output_path)
+
+
+def _after_fork_in_child():
+    """Reset the process wide sampling profiler in a forked child process."""
+    global _profiler_lock  # pylint: disable=global-statement
+    _profiler_lock = threading.Lock()
+    if _profiler is not None:
+        _profiler._after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,5 +1,6 @@
 """Hello World example utilizing ComponentCore"""
 from cognate.component_core import ComponentCore
+from cognate.prefork import PreforkRunner
 
 import sys
 
@@ -23,4 +24,4 @@ class HelloWorld(ComponentCore):
 if __name__ == '__main__':
     argv = sys.argv
     service = HelloWorld(argv=argv)
-    service.run()
+    PreforkRunner(service, 'run').run()
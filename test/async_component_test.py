@@ -0,0 +1,153 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from os import path, remove
+
+from test.cognate_test_case import CognateTestCase, TEST_OUT
+
+from cognate.async_component import AsyncComponentCore
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class Connection(AsyncComponentCore):
+    """A component that opens a connection when configured."""
+
+    def __init__(self, latency=0.0, **kwargs):
+        self.latency = latency
+        self.events = []
+
+        super().__init__(**kwargs)
+
+    def cognate_options(self, arg_parser):
+        arg_parser.add_argument('--latency', type=float, default=self.latency)
+
+    async def cognate_configure(self, args):
+        await asyncio.sleep(self.latency)
+        self.events.append(('configure', self.log is not None))
+
+    async def cognate_start(self):
+        await asyncio.sleep(0)
+        self.events.append('start')
+
+    def cognate_stop(self):
+        self.events.append('stop')
+
+
+class PooledConnection(Connection):
+    async def cognate_configure(self, args):
+        self.events.append('pool')
+
+    async def cognate_stop(self):
+        self.events.append('pool_stop')
+
+
+class TestAsyncComponentCore(CognateTestCase):
+    """Test the awaited hooks of asyncio based components."""
+
+    def test_create(self):
+        """Ensure the hooks are awaited in the order of the hierarchy."""
+        foo = run(PooledConnection.create(argv='--latency 0.01',
+                                          service_name='Pooled'))
+        self.assertEqual(foo.latency, 0.01)
+        self.assertEqual(foo.service_name, 'Pooled')
+        self.assertEqual(foo.events, [('configure', True), 'pool'])
+
+        run(foo.start())
+        run(foo.stop())
+        self.assertEqual(foo.events[2:], ['start', 'pool_stop', 'stop'])
+
+    def test_configure_once(self):
+        """Ensure a directly constructed instance is configured once."""
+        foo = Connection()
+        self.assertEqual(foo.events, [])
+        run(foo.configure())
+        run(foo.configure())
+        self.assertEqual(foo.events, [('configure', True)])
+
+    def test_create_many_concurrent(self):
+        """Ensure the hooks of many instances run concurrently."""
+        start_time = time.perf_counter()
+        components = run(Connection.create_many(
+            ['--service_name conn-%d --latency 0.1' % i for i in range(20)]))
+        elapsed = time.perf_counter() - start_time
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([component.service_name for component in components],
+                         ['conn-%d' % i for i in range(20)])
+        for component in components:
+            self.assertEqual(component.events, [('configure', True)])
+
+    def test_create_many_shared_logging(self):
+        """Ensure logging is configured once per distinct logger."""
+        log_path = path.join(TEST_OUT, 'AsyncBatch.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = '--service_name AsyncBatch --log_level info --log_path %s' % \
+               TEST_OUT
+        components = run(Connection.create_many([argv] * 3))
+        for component in components:
+            self.assertIs(component.log, components[0].log)
+            self.assertFalse(hasattr(component, '_cognate_batch'))
+        self.assertEqual(len(components[0].log.handlers), 1)
+        for component in components:
+            component.close()
+
+        with open(log_path) as log_file:
+            self.assertEqual(log_file.read().count('Logging configured'), 1)
+
+    def test_log_configured_off_loop(self):
+        """Ensure the log files are opened off the event loop thread."""
+        log_path = path.join(TEST_OUT, 'AsyncLog.log')
+        if path.exists(log_path):
+            remove(log_path)
+        threads = []
+
+        class Traced(AsyncComponentCore):
+            def _configure_logging(self):
+                threads.append(threading.current_thread())
+                super()._configure_logging()
+
+        foo = run(Traced.create(service_name='AsyncLog', log_path=TEST_OUT,
+                                log_level='info'))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertTrue(path.exists(log_path))
+        foo.close()
+
+    def test_imported_explicitly(self):
+        """Ensure asyncio is not loaded by the import of the package."""
+        output = subprocess.check_output(
+            [sys.executable, '-c',
+             'import sys, cognate; print("asyncio" in sys.modules)'],
+            cwd=path.dirname(path.dirname(path.abspath(__file__))))
+        self.assertEqual(output.strip(), b'False')
+
+    def test_synchronous_reconfigure(self):
+        """Ensure a coroutine hook is reported by a reconfiguration."""
+        foo = run(Connection.create())
+        with self.assertRaises(ValueError):
+            foo.reconfigure({'latency': 0.5})
+        self.assertEqual(foo.latency, 0.0)
+
+    def test_startup_profile(self):
+        """Ensure the awaited hooks are recorded by the startup profile."""
+        foo = run(PooledConnection.create(profile_startup=True))
+        profile = foo.startup_profile
+        self.assertFalse(profile.active)
+        self.assertIn('configure', profile.phases)
+        hooks = [(hook['hook'], hook['class'].rpartition('.')[2])
+                 for hook in profile.hooks
+                 if hook['hook'] == 'cognate_configure']
+        self.assertEqual(hooks, [('cognate_configure', 'ComponentCore'),
+                                 ('cognate_configure', 'Connection'),
+                                 ('cognate_configure', 'PooledConnection')])
@@ -1,11 +1,19 @@
+import argparse
+import io
+import json
 import logging
+import os
+import signal
+import threading
+import time
+from contextlib import redirect_stderr, redirect_stdout
 from logging import DEBUG, ERROR, INFO, WARNING
 from os import path, remove
-from unittest import TestCase
+from unittest import TestCase, mock, skipUnless
 
 from test.cognate_test_case import CognateTestCase, TEST_OUT
 
-from cognate import component_core
+from cognate import component_core, configuration, log_support
 from cognate.component_core import ComponentCore
 
 
@@ -172,6 +180,1262 @@ class TestComponentCoreArgsPassing(CognateTestCase):
         assert foo.verbose == True
 
 
+class TestComponentCoreParserTemplate(CognateTestCase):
+    """Test the per class compiled parser template."""
+
+    def test_template_reuse(self):
+        """Ensure the template is compiled once and reused per class."""
+
+        class Reused(ComponentCore):
+            pass
+
+        first = Reused()
+        template = Reused.__dict__['_cognate_template']
+        second = Reused(argv='--service_name Second')
+        self.assertIs(template, Reused.__dict__['_cognate_template'])
+        self.assertEqual(first.service_name, 'Reused')
+        self.assertEqual(second.service_name, 'Second')
+        self.assertEqual(second.service_name_set, True)
+
+    def test_instance_defaults(self):
+        """Ensure instance specific defaults are applied over the template."""
+
+        class Named(ComponentCore):
+            def __init__(self, name='World', **kwargs):
+                self.name = name
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--name', default=self.name)
+
+        world = Named()
+        dog = Named(name='Dog', log_level='info', verbose=True)
+        cat = Named(name='Dog', argv='--name Cat')
+        self.assertEqual(world.name, 'World')
+        self.assertEqual(world.log_level, ERROR)
+        self.assertEqual(world.verbose, False)
+        self.assertEqual(dog.name, 'Dog')
+        self.assertEqual(dog.service_name, 'Named')
+        self.assertEqual(dog.log_level, INFO)
+        self.assertEqual(dog.verbose, True)
+        self.assertEqual(cat.name, 'Cat')
+
+    def test_subclass_defined_later(self):
+        """Ensure a subclass defined later does not reuse a parent template."""
+
+        class Parent(ComponentCore):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--parent_opt', default='parent')
+
+        parent = Parent()
+        self.assertEqual(parent.parent_opt, 'parent')
+
+        class Child(Parent):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--child_opt', default='child')
+
+        child = Child(argv='--child_opt kid')
+        self.assertEqual(child.parent_opt, 'parent')
+        self.assertEqual(child.child_opt, 'kid')
+        self.assertIsNot(Parent.__dict__['_cognate_template'],
+                         Child.__dict__['_cognate_template'])
+
+    def test_varying_options(self):
+        """Ensure options that vary per instance are still resolved."""
+
+        class Varying(ComponentCore):
+            def __init__(self, extra=False, **kwargs):
+                self.extra = extra
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                if self.extra:
+                    arg_parser.add_argument('--more', default='more')
+
+        plain = Varying()
+        extra = Varying(extra=True, argv='--more most')
+        self.assertFalse(hasattr(plain, 'more'))
+        self.assertEqual(extra.more, 'most')
+
+    def test_help_output(self):
+        """Ensure help output is identical to that of an untemplated parser."""
+
+        class Helpful(ComponentCore):
+            def __init__(self, name='World', **kwargs):
+                self.name = name
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--name', default=self.name,
+                                        help='The name.')
+
+        Helpful()  # compile the template with the default instance values
+
+        class HelpfulUntemplated(Helpful):
+            PARSER_TEMPLATE = False
+
+        expected = io.StringIO()
+        with redirect_stdout(expected):
+            with self.assertRaises(SystemExit):
+                HelpfulUntemplated(name='Dog', service_name='DogSvc',
+                                   argv='--help')
+
+        actual = io.StringIO()
+        with redirect_stdout(actual):
+            with self.assertRaises(SystemExit):
+                Helpful(name='Dog', service_name='DogSvc', argv='--help')
+
+        self.assertIn('(default: Dog)', actual.getvalue())
+        self.assertIn('(default: DogSvc)', actual.getvalue())
+        self.assertEqual(expected.getvalue(), actual.getvalue())
+
+    def test_keyword_configuration(self):
+        """Ensure keyword configuration resolves the same args as argparse."""
+
+        class Keyword(ComponentCore):
+            def __init__(self, count='3', **kwargs):
+                self.count = count
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('level', nargs='?', default='2',
+                                        type=int, choices=[1, 2, 3])
+                arg_parser.add_argument('extras', nargs='*')
+                arg_parser.add_argument('--count', type=int,
+                                        default=self.count)
+                arg_parser.add_argument('--mode', default='fast',
+                                        choices=['fast', 'slow'])
+                arg_parser.add_argument('--flag', action='store_const',
+                                        const='on')
+                arg_parser.add_argument('--hidden', default=argparse.SUPPRESS)
+
+            def cognate_configure(self, args):
+                self.args = args
+
+        class KeywordUntemplated(Keyword):
+            PARSER_TEMPLATE = False
+
+        Keyword()  # compile the template
+        keyword = Keyword(count='7', log_level='info', service_name='Kw')
+        untemplated = KeywordUntemplated(count='7', log_level='info',
+                                         service_name='Kw')
+        self.assertEqual(vars(keyword.args), vars(untemplated.args))
+        self.assertEqual(list(vars(keyword.args)),
+                         list(vars(untemplated.args)))
+        self.assertEqual(keyword.count, 7)
+        self.assertEqual(keyword.level, 2)
+        self.assertEqual(keyword.extras, [])
+        self.assertIsNone(keyword.flag)
+        self.assertFalse(hasattr(keyword.args, 'hidden'))
+
+    def test_keyword_configuration_errors(self):
+        """Ensure keyword configuration errors are reported by argparse."""
+
+        class Invalid(ComponentCore):
+            def __init__(self, level='2', count='3', **kwargs):
+                self.level = level
+                self.count = count
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('level', nargs='?', type=int,
+                                        default=self.level, choices=[1, 2])
+                arg_parser.add_argument('--count', type=int,
+                                        default=self.count)
+
+        self.assertEqual(Invalid().level, 2)
+        with redirect_stderr(io.StringIO()) as err:
+            self.assertRaises(SystemExit, Invalid, level='5')
+        self.assertIn('invalid choice: 5', err.getvalue())
+        with redirect_stderr(io.StringIO()) as err:
+            self.assertRaises(SystemExit, Invalid, count='many')
+        self.assertIn("invalid int value: 'many'", err.getvalue())
+
+        class Required(ComponentCore):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--needed', required=True)
+
+        with redirect_stderr(io.StringIO()) as err:
+            self.assertRaises(SystemExit, Required)
+        self.assertIn('the following arguments are required: --needed',
+                      err.getvalue())
+        self.assertEqual(Required(argv='--needed yes').needed, 'yes')
+
+    def test_template_disabled(self):
+        """Ensure configuration without a parser template."""
+
+        class Untemplated(ComponentCore):
+            PARSER_TEMPLATE = False
+
+        untemplated = Untemplated(argv='--log_level debug')
+        self.assertEqual(untemplated.log_level, DEBUG)
+        self.assertNotIn('_cognate_template', Untemplated.__dict__)
+
+    def test_reset_class_caches(self):
+        """Ensure a class template can be discarded and recompiled."""
+
+        class Resettable(ComponentCore):
+            pass
+
+        Resettable()
+        template = Resettable.__dict__['_cognate_template']
+        Resettable.reset_class_caches()
+        self.assertNotIn('_cognate_template', Resettable.__dict__)
+        Resettable()
+        self.assertIsNot(template, Resettable.__dict__['_cognate_template'])
+
+    def test_copy_plan_property_option(self):
+        """Ensure an option implemented as a property is assigned."""
+
+        class Bounded(ComponentCore):
+            def __init__(self, **kwargs):
+                self._limit = 0
+                super().__init__(**kwargs)
+
+            @property
+            def limit(self):
+                return self._limit
+
+            @limit.setter
+            def limit(self, value):
+                self._limit = min(value, 10)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--limit', type=int, default=1)
+
+        foo = Bounded(argv='--limit 50')
+        self.assertEqual(foo.limit, 10)
+        self.assertNotIn('limit', foo.__dict__)
+        self.assertIn('service_name', foo.__dict__)
+
+
+class TestComponentCoreCompiledParser(CognateTestCase):
+    """Test that the compiled parser resolves arguments as argparse does."""
+
+    def setUp(self):
+        configuration.resolution_cache().enabled = False
+
+    def tearDown(self):
+        configuration.resolution_cache().enabled = True
+
+    def resolve(self, cls, argv, compiled, **kwargs):
+        """Resolve the arguments of a class with the given parser backend.
+
+        :return: The resolved arguments, or the exit code and output.
+        """
+        cls.COMPILED_PARSER = compiled
+        out, err = io.StringIO(), io.StringIO()
+        try:
+            with redirect_stdout(out), redirect_stderr(err):
+                component = cls(argv=argv, **kwargs)
+        except SystemExit as exit_error:
+            return exit_error.code, out.getvalue(), err.getvalue()
+        finally:
+            del cls.COMPILED_PARSER
+        return list(vars(component.args).items())
+
+    def assertConforms(self, cls, argv_list, compiled_count, **kwargs):
+        cls(argv=argv_list[0], **kwargs)  # compile the template
+        compiled_parser = cls.__dict__['_cognate_template'].compiled_parser
+        self.assertIsNotNone(compiled_parser)
+
+        for argv in argv_list:
+            expected = self.resolve(cls, argv, False, **kwargs)
+            actual = self.resolve(cls, argv, True, **kwargs)
+            self.assertEqual(expected, actual, argv)
+        self.assertEqual(compiled_parser.fallbacks,
+                         len(argv_list) - compiled_count)
+
+    def test_core_options(self):
+        """Ensure conformance for the options of the component core."""
+
+        class Core(ComponentCore):
+            def cognate_configure(self, args):
+                self.args = args
+
+        self.assertConforms(Core, [
+            '--service_name Dog --verbose --log_level info',
+            '/Users/neoinsanity/samples/my-argparser.py --verbose',
+            '--log_level=debug --log_path=./TEST_OUT/ --gc_freeze',
+            '--log_rate_limit 2.5 --workers 0 --log_lazy',
+            ['--service_name', ''],
+            # handed to argparse
+            '--verb',
+            '--help',
+            '-h',
+            '--log_level loud',
+            '--service_name',
+            '--service_name --verbose',
+            '--verbose=yes',
+            '--unknown value',
+            '--workers many',
+            '--workers=',
+            '-- extra',
+            '--log_level info extra',
+        ], compiled_count=5)
+
+    def test_declared_options(self):
+        """Ensure conformance for positional and optional arguments."""
+
+        class Declared(ComponentCore):
+            def __init__(self, count='3', **kwargs):
+                self.count = count
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('level', nargs='?', default='2',
+                                        type=int, choices=[1, 2, 3])
+                arg_parser.add_argument('extras', nargs='*')
+                arg_parser.add_argument('-c', '--count', type=int,
+                                        default=self.count)
+                arg_parser.add_argument('--mode', default='fast',
+                                        choices=['fast', 'slow'])
+                arg_parser.add_argument('--flag', action='store_const',
+                                        const='on')
+                arg_parser.add_argument('--off', action='store_false')
+                arg_parser.add_argument('--hidden', default=argparse.SUPPRESS)
+
+            def cognate_configure(self, args):
+                self.args = args
+
+        self.assertConforms(Declared, [
+            '--verbose',
+            '--count 5 --mode slow --flag --off --hidden yes',
+            '--count 5 1 x y',
+            '-c 7 3',
+            '--mode slow 1',
+            # handed to argparse
+            '3 a b --count 5',
+            '--count 5 4',
+            '--mode medium',
+            '--count many',
+            '--count -1',
+            '-c7',
+            '--hid shown',
+        ], compiled_count=5, count='7')
+
+    def test_required_positionals(self):
+        """Ensure conformance for required positional arguments."""
+
+        class Copy(ComponentCore):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('source')
+                arg_parser.add_argument('target')
+                arg_parser.add_argument('--needed', required=True)
+
+            def cognate_configure(self, args):
+                self.args = args
+
+        self.assertConforms(Copy, [
+            'src dst --needed yes',
+            'src --needed yes dst',
+            '--needed yes src dst',
+            # handed to argparse
+            'src --needed yes',
+            'src dst',
+            'src dst more --needed yes',
+        ], compiled_count=3)
+
+    def test_unsupported_options(self):
+        """Ensure options the compiled parser can not resolve use argparse."""
+
+        class Appending(ComponentCore):
+            COMPILED_PARSER = True
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--tag', action='append')
+
+        foo = Appending(argv='--tag a --tag b')
+        self.assertEqual(foo.tag, ['a', 'b'])
+        self.assertIsNone(
+            Appending.__dict__['_cognate_template'].compiled_parser)
+
+
+class TestComponentCoreConfigFile(CognateTestCase):
+    """Test configuration from a file of option values."""
+
+    def setUp(self):
+        self.config_path = path.join(TEST_OUT, 'component_config.json')
+        with open(self.config_path, 'w') as config_file:
+            json.dump({'log_level': 'info',
+                       'region': 'eu-west',
+                       'ConfigSvc': {'verbose': True,
+                                     'log_level': 'warn'}},
+                      config_file)
+
+    def test_config_defaults(self):
+        """Ensure file values replace the option defaults."""
+
+        class Regional(ComponentCore):
+            def __init__(self, region='us-east', **kwargs):
+                self.region = region
+
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--region', default=self.region)
+
+        foo = Regional(argv=['--config', self.config_path])
+        self.assertEqual(foo.config, self.config_path)
+        self.assertEqual(foo.region, 'eu-west')
+        self.assertEqual(foo.log_level, INFO)
+        self.assertEqual(foo.verbose, False)
+
+        bar = Regional(config=self.config_path, region='ap-south')
+        self.assertEqual(bar.region, 'eu-west')
+
+    def test_argv_precedence(self):
+        """Ensure command line arguments take precedence over the file."""
+        foo = ComponentCore(argv='--config=%s --log_level debug' %
+                                 self.config_path)
+        self.assertEqual(foo.log_level, DEBUG)
+
+    def test_service_section(self):
+        """Ensure the section of the service name applies."""
+        foo = ComponentCore(argv='--service_name ConfigSvc --config %s' %
+                                 self.config_path)
+        self.assertEqual(foo.verbose, True)
+        self.assertEqual(foo.log_level, WARNING)
+        foo.close()
+
+    def test_untemplated_config(self):
+        """Ensure file values apply when the parser template is disabled."""
+
+        class Untemplated(ComponentCore):
+            PARSER_TEMPLATE = False
+
+        foo = Untemplated(config=self.config_path)
+        self.assertEqual(foo.log_level, INFO)
+
+
+class FileOptions(ComponentCore):
+    """A component whose options declare literal defaults, or none."""
+
+    def cognate_options(self, arg_parser):
+        arg_parser.add_argument('-f', '--file', default='input.dat')
+        arg_parser.add_argument('--output_file')
+
+
+class TestComponentCoreSourceDefaults(CognateTestCase):
+    """Test configuration sources for options without instance defaults."""
+
+    def setUp(self):
+        self.config_path = path.join(TEST_OUT, 'literal_config.json')
+        with open(self.config_path, 'w') as config_file:
+            json.dump({'file': 'from_config.dat',
+                       'output_file': 'out.txt',
+                       'input_file': 'in.txt'},
+                      config_file)
+
+    def test_literal_defaults(self):
+        """Ensure file values replace literal and missing defaults."""
+        foo = FileOptions(config=self.config_path)
+        self.assertEqual(foo.file, 'from_config.dat')
+        self.assertEqual(foo.output_file, 'out.txt')
+
+        bar = FileOptions(argv='--config %s' % self.config_path)
+        self.assertEqual(bar.file, 'from_config.dat')
+        self.assertEqual(bar.output_file, 'out.txt')
+
+        baz = FileOptions(argv='--config %s -f given.dat' % self.config_path)
+        self.assertEqual(baz.file, 'given.dat')
+        self.assertEqual(baz.output_file, 'out.txt')
+
+        self.assertEqual(FileOptions().file, 'input.dat')
+
+    def test_untemplated_literal_defaults(self):
+        """Ensure file values replace literal defaults without a template."""
+
+        class Untemplated(FileOptions):
+            PARSER_TEMPLATE = False
+
+        foo = Untemplated(argv='--config %s' % self.config_path)
+        self.assertEqual(foo.file, 'from_config.dat')
+        self.assertEqual(foo.output_file, 'out.txt')
+
+    def test_positional_default(self):
+        """Ensure file values replace the default of an optional
+        positional argument."""
+
+        class Positional(ComponentCore):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('input_file', nargs='?',
+                                        default='input.dat')
+
+        self.assertEqual(Positional(config=self.config_path).input_file,
+                         'in.txt')
+        foo = Positional(argv='--config %s' % self.config_path)
+        self.assertEqual(foo.input_file, 'in.txt')
+        bar = Positional(argv='given.txt --config %s' % self.config_path)
+        self.assertEqual(bar.input_file, 'given.txt')
+
+
+class TestComponentCoreEnvironment(CognateTestCase):
+    """Test configuration from environment variables."""
+
+    def setUp(self):
+        self.config_path = path.join(TEST_OUT, 'environment_config.json')
+        with open(self.config_path, 'w') as config_file:
+            json.dump({'log_level': 'info', 'log_queue_size': 10},
+                      config_file)
+
+    def tearDown(self):
+        configuration.clear_environment_snapshot()
+
+    def snapshot(self, **environ):
+        configuration.clear_environment_snapshot()
+        with mock.patch.dict(os.environ, environ):
+            configuration.environment_snapshot()
+
+    def test_precedence(self):
+        """Ensure the environment is applied between the file and argv."""
+        self.snapshot(COGNATE_ENVSVC_LOG_LEVEL='warn',
+                      COGNATE_ENVSVC_CONFIG=self.config_path,
+                      COGNATE_ENVSVC_VERBOSE='no')
+
+        foo = ComponentCore(service_name='EnvSvc', verbose=True)
+        self.assertEqual(foo.config, self.config_path)
+        self.assertEqual(foo.log_queue_size, 10)
+        self.assertEqual(foo.log_level, WARNING)
+        self.assertEqual(foo.verbose, False)
+
+        bar = ComponentCore(argv='--service_name EnvSvc --log_level debug')
+        self.assertEqual(bar.log_level, DEBUG)
+        self.assertEqual(bar.log_queue_size, 10)
+
+        baz = ComponentCore(service_name='OtherSvc')
+        self.assertEqual(baz.log_level, ERROR)
+
+    def test_literal_defaults(self):
+        """Ensure the environment replaces literal and missing defaults."""
+        self.snapshot(COGNATE_G_FILE='x', COGNATE_G_OUTPUT_FILE='y')
+
+        foo = FileOptions(service_name='G')
+        self.assertEqual(foo.file, 'x')
+        self.assertEqual(foo.output_file, 'y')
+
+        bar = FileOptions(argv='--service_name G --output_file z')
+        self.assertEqual(bar.file, 'x')
+        self.assertEqual(bar.output_file, 'z')
+
+        baz = FileOptions(service_name='H')
+        self.assertEqual(baz.file, 'input.dat')
+        self.assertIsNone(baz.output_file)
+
+    def test_snapshot_once(self):
+        """Ensure the environment is read once per process."""
+        self.snapshot(COGNATE_SNAPSVC_LOG_LEVEL='info')
+        with mock.patch.dict(os.environ, {'COGNATE_SNAPSVC_LOG_LEVEL': 'debug'}):
+            foo = ComponentCore(service_name='SnapSvc')
+        self.assertEqual(foo.log_level, INFO)
+
+
+class Tunable(ComponentCore):
+    """A component that records the options changed on reconfiguration."""
+
+    def __init__(self, pool_size=4, **kwargs):
+        self.pool_size = pool_size
+        self.configured = []
+
+        super().__init__(**kwargs)
+
+    def cognate_options(self, arg_parser):
+        arg_parser.add_argument('--pool_size', type=int,
+                                default=self.pool_size)
+
+    def cognate_configure(self, args):
+        if args.pool_size < 1:
+            raise ValueError('"pool_size" must be at least 1.')
+        self.configured.append(self.changed_options)
+
+
+class TestComponentCoreReconfigure(CognateTestCase):
+    """Test the reconfiguration of constructed components."""
+
+    def test_reconfigure_dict(self):
+        """Ensure only changed options are reported to the hooks."""
+        foo = Tunable()
+        self.assertEqual(foo.configured, [None])
+
+        changed = foo.reconfigure({'pool_size': '8', 'verbose': False})
+        self.assertEqual(changed, frozenset(['pool_size']))
+        self.assertEqual(foo.pool_size, 8)
+        self.assertEqual(foo.configured[-1], frozenset(['pool_size']))
+        self.assertIsNone(foo.changed_options)
+
+        self.assertEqual(foo.reconfigure({'pool_size': 8}), frozenset())
+        self.assertEqual(len(foo.configured), 2)
+
+    def test_reconfigure_argv(self):
+        """Ensure an argument list is applied over the current values."""
+        foo = Tunable(argv='--pool_size 2 --log_level info')
+        changed = foo.reconfigure('--log_level debug')
+        self.assertEqual(changed, frozenset(['log_level']))
+        self.assertEqual(foo.log_level, DEBUG)
+        self.assertEqual(foo.pool_size, 2)
+
+        self.assertEqual(foo.reconfigure(['--log_level', 'debug']),
+                         frozenset())
+
+    def test_reconfigure_argv_literal_default(self):
+        """Ensure options absent from the argument list keep their values."""
+        foo = FileOptions('--file custom.dat --output_file out.txt')
+        changed = foo.reconfigure('--log_level info')
+        self.assertEqual(changed, frozenset(['log_level']))
+        self.assertEqual(foo.file, 'custom.dat')
+        self.assertEqual(foo.output_file, 'out.txt')
+
+    def test_reconfigure_validation(self):
+        """Ensure unknown options and invalid values are rejected."""
+        foo = Tunable()
+        self.assertRaisesRegex(ValueError,
+                               '"pool" is not an option of Tunable',
+                               foo.reconfigure, {'pool': 2})
+        self.assertRaisesRegex(ValueError, '"log_level" value \'loud\'',
+                               foo.reconfigure, {'log_level': 'loud'})
+
+    def test_reconfigure_rollback(self):
+        """Ensure a failed reconfiguration restores the previous values."""
+        foo = Tunable(log_level='info')
+        self.assertRaisesRegex(ValueError, '"pool_size" must be at least 1',
+                               foo.reconfigure,
+                               {'pool_size': 0, 'log_level': 'debug'})
+        self.assertEqual(foo.pool_size, 4)
+        self.assertEqual(foo.log_level, INFO)
+        self.assertEqual(foo.log.level, INFO)
+
+    def test_reconfigure_logging(self):
+        """Ensure the log is configured again only for log option changes."""
+        log_path = path.join(TEST_OUT, 'Retuned.log')
+        moved_path = path.join(TEST_OUT, 'RetunedMoved.log')
+        for file_path in (log_path, moved_path):
+            if path.exists(file_path):
+                remove(file_path)
+
+        foo = Tunable(argv='--service_name Retuned --log_level info '
+                           '--log_path %s' % log_path)
+        handler = foo.log.handlers[0]
+        foo.reconfigure({'pool_size': 16})
+        self.assertEqual(foo.log.handlers, [handler])
+
+        foo.reconfigure({'log_path': moved_path})
+        self.assertEqual(len(foo.log.handlers), 1)
+        self.assertIsNot(foo.log.handlers[0], handler)
+        self.assertEqual(handler.stream, None)
+        foo.log.info('Moved')
+        foo.close()
+
+        with open(moved_path) as log_file:
+            content = log_file.read()
+        self.assertIn('Reconfigured options: log_path=', content)
+        self.assertIn('Moved', content)
+
+    def test_reconfigure_external_log(self):
+        """Ensure a log given to the component is left as is."""
+        log = logging.getLogger('EXTERNAL_LOGGER')
+        foo = Tunable(log=log)
+        foo.reconfigure({'log_level': 'debug'})
+        self.assertIs(foo.log, log)
+        self.assertEqual(foo.log_level, DEBUG)
+
+
+class TestComponentCoreReload(CognateTestCase):
+    """Test the reload of the configuration sources of components."""
+
+    def setUp(self):
+        self.config_path = path.join(TEST_OUT, 'reload_config.json')
+        self.write_config(log_level='info', pool_size=2)
+
+    def write_config(self, **values):
+        with open(self.config_path, 'w') as config_file:
+            json.dump(values, config_file)
+        # ensure the change is visible on file systems with coarse mtimes
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat.st_atime_ns,
+                                       stat.st_mtime_ns + 1000000000 *
+                                       getattr(self, 'writes', 0)))
+        self.writes = getattr(self, 'writes', 0) + 1
+
+    def wait_for(self, condition):
+        for _ in range(500):
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_reload_configuration(self):
+        """Ensure changed file values are applied, less argv options."""
+        foo = Tunable(argv='--config %s --verbose' % self.config_path)
+        self.assertEqual(foo.pool_size, 2)
+        self.assertEqual(foo.log_level, INFO)
+
+        self.write_config(log_level='debug', pool_size=6, verbose=False)
+        changed = foo.reload_configuration()
+        self.assertEqual(changed, frozenset(['log_level', 'pool_size']))
+        self.assertEqual(foo.configured[-1], changed)
+        self.assertEqual(foo.log_level, DEBUG)
+        self.assertEqual(foo.verbose, True)
+
+        self.write_config(pool_size=6)
+        self.assertEqual(foo.reload_configuration(), frozenset())
+        self.assertEqual(foo.log_level, DEBUG)
+
+    def test_reload_unchanged(self):
+        """Ensure reloading an unchanged file changes nothing."""
+        self.write_config(file='from_config.dat', output_file='out.txt')
+        foo = FileOptions(config=self.config_path)
+        self.assertEqual(foo.reload_configuration(), frozenset())
+        self.assertEqual(foo.file, 'from_config.dat')
+
+    def test_reload_log_level(self):
+        """Ensure a record is written once while the log is reconfigured."""
+        log_path = path.join(TEST_OUT, 'Releveled.log')
+        if path.exists(log_path):
+            remove(log_path)
+        self.write_config(log_level='debug')
+        foo = Tunable(argv='--service_name Releveled --log_path %s '
+                           '--config %s' % (log_path, self.config_path))
+
+        self.write_config(log_level='info')
+        self.assertEqual(foo.reload_configuration(),
+                         frozenset(['log_level']))
+        foo.close()
+
+        with open(log_path) as log_file:
+            content = log_file.read()
+        self.assertEqual(content.count('Logging configured for'), 2)
+        self.assertEqual(content.count('Reconfigured options'), 1)
+
+    def test_reload_concurrent_logging(self):
+        """Ensure no record logged during a reload is lost."""
+        log_path = path.join(TEST_OUT, 'Concurrent.log')
+        if path.exists(log_path):
+            remove(log_path)
+        self.write_config(log_level='info')
+        foo = Tunable(argv='--service_name Concurrent --log_path %s '
+                           '--config %s' % (log_path, self.config_path))
+        stopped = threading.Event()
+        logged = []
+
+        def log_records():
+            while not stopped.is_set() or len(logged) < 100:
+                foo.log.warning('Record %d.', len(logged))
+                logged.append(True)
+
+        worker = threading.Thread(target=log_records)
+        worker.start()
+        try:
+            for level in ('debug', 'info') * 10:
+                self.write_config(log_level=level)
+                foo.reload_configuration()
+        finally:
+            stopped.set()
+            worker.join()
+        foo.close()
+
+        with open(log_path) as log_file:
+            content = log_file.read()
+        for index in range(len(logged)):
+            self.assertEqual(content.count('Record %d.' % index), 1)
+
+    def test_file_watch(self):
+        """Ensure a watched file is reloaded on change."""
+        foo = Tunable(config=self.config_path, config_reload=True,
+                      config_poll_interval=0.01)
+        watcher = configuration.config_watcher()
+        self.assertTrue(watcher.is_registered(foo))
+
+        self.write_config(log_level='info', pool_size=12)
+        self.assertTrue(self.wait_for(lambda: foo.pool_size == 12))
+
+        foo.close()
+        self.assertFalse(watcher.is_registered(foo))
+
+    @skipUnless(hasattr(signal, 'SIGHUP'), 'SIGHUP is not supported')
+    def test_signal_reload(self):
+        """Ensure registered components are reloaded on SIGHUP."""
+        foo = Tunable(config=self.config_path, config_reload=True,
+                      config_poll_interval=0)
+        bar = Tunable(config=self.config_path)
+
+        self.write_config(log_level='info', pool_size=24)
+        os.kill(os.getpid(), signal.SIGHUP)
+        self.assertTrue(self.wait_for(lambda: foo.pool_size == 24))
+        self.assertEqual(bar.pool_size, 2)
+        foo.close()
+
+    def test_concurrent_reconfigure(self):
+        """Ensure logging continues while the log is reconfigured."""
+        log_path = path.join(TEST_OUT, 'Concurrent.log')
+        if path.exists(log_path):
+            remove(log_path)
+        foo = Tunable(argv='--service_name Concurrent --log_level info '
+                           '--log_path %s' % log_path)
+        stop = threading.Event()
+        errors = []
+
+        def work():
+            try:
+                while not stop.is_set():
+                    foo.log.warning('working %d', foo.pool_size)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+
+        workers = [threading.Thread(target=work) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        try:
+            for size in range(1, 50):
+                foo.reconfigure({'pool_size': size,
+                                 'log_level': ['info', 'debug'][size % 2]})
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(foo.log.handlers), 1)
+        foo.close()
+
+
+class SlottedTunable(Tunable):
+    """A tunable component with its options held in slots."""
+    SLOTTED_OPTIONS = True
+
+    @property
+    def verbose(self):
+        return self.__dict__.get('_verbose', False)
+
+    @verbose.setter
+    def verbose(self, value):
+        self.__dict__['_verbose'] = value
+
+
+class TestComponentCoreSlottedOptions(CognateTestCase):
+    """Test components with options held in the slots of a slotted class."""
+
+    def setUp(self):
+        SlottedTunable.reset_class_caches()
+
+    def test_slotted_class(self):
+        """Ensure instances after the first are created from the slotted
+        class, with unchanged attribute access."""
+        first = SlottedTunable(argv='--pool_size 2')
+        self.assertIs(type(first), SlottedTunable)
+
+        foo = SlottedTunable(argv='--pool_size 3 --log_level info',
+                             service_name='Slotted')
+        slotted = type(foo)
+        self.assertIsNot(slotted, SlottedTunable)
+        self.assertIsInstance(foo, SlottedTunable)
+        self.assertEqual(slotted.__name__, 'SlottedTunable')
+        self.assertIs(type(SlottedTunable()), slotted)
+
+        self.assertEqual(foo.pool_size, 3)
+        self.assertEqual(foo.log_level, INFO)
+        self.assertEqual(foo.service_name, 'Slotted')
+        self.assertTrue(foo.service_name_set)
+        self.assertIn('pool_size', slotted.__slots__)
+        self.assertNotIn('pool_size', vars(foo))
+        self.assertNotIn('log_level', vars(foo))
+
+        # the property of the class is not shadowed by a slot
+        self.assertNotIn('verbose', slotted.__slots__)
+        foo = SlottedTunable(verbose=True)
+        self.assertTrue(foo.verbose)
+        self.assertTrue(foo.__dict__['_verbose'])
+
+    def test_slotted_reconfigure(self):
+        """Ensure the options of a slotted instance are reconfigured."""
+        SlottedTunable()
+        foo = SlottedTunable(argv='--pool_size 2')
+        self.assertEqual(foo.reconfigure({'pool_size': 5}),
+                         frozenset(['pool_size']))
+        self.assertEqual(foo.pool_size, 5)
+        self.assertEqual(foo.configured[-1], frozenset(['pool_size']))
+
+    def test_slotted_lazy_logging(self):
+        """Ensure the log slot of a lazy instance is configured on first
+        access."""
+        SlottedTunable()
+        foo = SlottedTunable(argv='--log_lazy --service_name SlottedLazy')
+        self.assertIsNot(type(foo), SlottedTunable)
+        self.assertNotIn('log', vars(foo))
+        self.assertIsNone(foo._own_log())
+
+        log = foo.log
+        self.assertEqual(log.name, 'SlottedLazy')
+        self.assertIs(foo._own_log(), log)
+        self.assertIs(foo.log, log)
+
+        with self.assertRaises(AttributeError):
+            foo.missing_attribute  # pylint: disable=pointless-statement
+        foo.close()
+
+    def test_slotted_build_many(self):
+        """Ensure a batch constructs instances of the slotted class."""
+        components = list(SlottedTunable.build_many(
+            ['--service_name svc-%d' % i for i in range(3)]))
+        self.assertIs(type(components[0]), SlottedTunable)
+        self.assertEqual([type(component) for component in components[1:]],
+                         [SlottedTunable.__dict__['_cognate_slotted']] * 2)
+        self.assertEqual([component.service_name
+                          for component in components],
+                         ['svc-0', 'svc-1', 'svc-2'])
+
+    def test_reset_class_caches(self):
+        """Ensure the slotted class is generated again after a reset."""
+        SlottedTunable()
+        slotted = type(SlottedTunable())
+        SlottedTunable.reset_class_caches()
+        self.assertIs(type(SlottedTunable()), SlottedTunable)
+        self.assertIsNot(type(SlottedTunable()), slotted)
+
+
+class TestComponentCoreHookDispatch(CognateTestCase):
+    """Test the invocation of hook methods on the class hierarchy."""
+
+    def test_mixin_hooks(self):
+        """Ensure hooks defined by mixin classes are invoked."""
+
+        class OptionMixin(object):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--mixin_opt', default='mixin')
+
+            def cognate_configure(self, args):
+                self.mixin_configured = args.mixin_opt
+
+        class Mixed(OptionMixin, ComponentCore):
+            pass
+
+        mixed = Mixed(argv='--mixin_opt set')
+        self.assertEqual(mixed.mixin_opt, 'set')
+        self.assertEqual(mixed.mixin_configured, 'set')
+
+    def test_invocation_order(self):
+        """Ensure hooks are invoked from the base class outward, once each."""
+
+        class Base(ComponentCore):
+            def the_func(self, calls):
+                calls.append('Base')
+
+        class Left(Base):
+            def the_func(self, calls):
+                calls.append('Left')
+
+        class Right(Base):
+            def the_func(self, calls):
+                calls.append('Right')
+
+        class Diamond(Left, Right):
+            def the_func(self, calls):
+                calls.append('Diamond')
+
+        calls = []
+        Diamond().invoke_method_on_children(func_name='the_func', calls=calls)
+        self.assertEqual(calls, ['Base', 'Right', 'Left', 'Diamond'])
+
+    def test_dispatch_table_cache(self):
+        """Ensure dispatch tables are resolved once and stored per class."""
+
+        class Cached(ComponentCore):
+            def the_func(self):
+                pass
+
+        cached = Cached()
+        table = Cached._dispatch_table('the_func')
+        self.assertEqual(table, (Cached.the_func,))
+        self.assertIs(table, Cached._dispatch_table('the_func'))
+        self.assertEqual(ComponentCore._dispatch_table('the_func'), ())
+
+        cached.invoke_method_on_children(func_name='the_func')
+        Cached.reset_class_caches()
+        self.assertNotIn('_cognate_dispatch', Cached.__dict__)
+
+
+class TestComponentCoreBuildMany(CognateTestCase):
+    """Test the bulk construction of components."""
+
+    def test_build_many(self):
+        """Ensure each argument list configures its own instance."""
+
+        class Member(ComponentCore):
+            def __init__(self, region='east', **kwargs):
+                self.region = region
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--region', default=self.region)
+
+        argv_list = ['--service_name m1',
+                     ['--service_name', 'm2', '--region', 'north'],
+                     '--service_name m1']
+        members = Member.build_many(argv_list, region='west',
+                                    log_level='info')
+        self.assertFalse(isinstance(members, list))
+
+        m1, m2, m1_again = list(members)
+        self.assertEqual(m1.service_name, 'm1')
+        self.assertEqual(m1.service_name_set, True)
+        self.assertEqual(m1.region, 'west')
+        self.assertEqual(m1.log_level, INFO)
+        self.assertEqual(m2.service_name, 'm2')
+        self.assertEqual(m2.region, 'north')
+        self.assertEqual(m1_again.service_name, 'm1')
+        self.assertIsNot(m1, m1_again)
+        self.assertFalse(hasattr(m1, '_cognate_batch'))
+
+    def test_build_many_shared_sources(self):
+        """Ensure the sources and arguments of identical argument lists are
+        resolved once, without the resolution cache."""
+        config_path = path.join(TEST_OUT, 'batch_config.json')
+        with open(config_path, 'w') as config_file:
+            json.dump({'file': 'from_config.dat'}, config_file)
+
+        configuration.clear_resolution_cache()
+        cache = configuration.resolution_cache()
+        argv = '--service_name Batched --config %s' % config_path
+        with mock.patch.object(configuration, 'load_config_file',
+                               wraps=configuration.load_config_file) as load:
+            members = list(FileOptions.build_many([argv] * 3))
+        self.assertEqual(load.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+        for member in members:
+            self.assertEqual(member.file, 'from_config.dat')
+            self.assertEqual(member.service_name_set, True)
+
+    def test_build_many_shared_logging(self):
+        """Ensure logging is configured once per distinct logger."""
+        log_path = path.join(TEST_OUT, 'BatchService.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        logging.getLogger('BatchService').handlers = []
+        argv = '--service_name BatchService --log_path %s' % TEST_OUT
+        services = list(ComponentCore.build_many([argv] * 3))
+
+        self.assertIs(services[0].log, services[1].log)
+        self.assertIs(services[0].log, services[2].log)
+        self.assertEqual(len(services[0].log.handlers), 1)
+        self.assertEqual(services[2].log_level, ERROR)
+        self.assertTrue(path.exists(log_path))
+
+    def test_build_many_isolated_args(self):
+        """Ensure instances sharing an argument list do not share args."""
+
+        class Mutating(ComponentCore):
+            def cognate_configure(self, args):
+                self.seen = getattr(args, 'marker', None)
+                args.marker = 'mutated'
+
+        first, second = Mutating.build_many(['--verbose'] * 2)
+        self.assertIsNone(first.seen)
+        self.assertIsNone(second.seen)
+
+
+    def test_build_many_kept_state(self):
+        """Ensure the instances that follow the first with an argument list
+        are assigned its state, as instances of their own."""
+
+        class Member(ComponentCore):
+            def __init__(self, **kwargs):
+                self.events = []
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--region', default='east')
+
+        argv_list = ['--service_name kept --region north'] * 3 + \
+            ['--service_name kept']
+        keep_state = component_core._BuildBatch.keep_state
+        with mock.patch.object(component_core._BuildBatch, 'keep_state',
+                               autospec=True,
+                               side_effect=keep_state) as keep_state:
+            members = list(Member.build_many(argv_list, verbose=True))
+        self.assertEqual(keep_state.call_count, 2)
+
+        first, second, third, other = members
+        for member in (second, third):
+            self.assertEqual(vars(member).keys() - {'events'},
+                             vars(first).keys() - {'events'})
+            self.assertEqual(member.region, 'north')
+            self.assertEqual(member.verbose, True)
+            self.assertEqual(member.service_name_set, True)
+            self.assertIs(member.log, first.log)
+        self.assertEqual(other.region, 'east')
+        self.assertIs(other.log, first.log)
+
+        second.events.append('second')
+        second.region = 'south'
+        self.assertEqual((first.events, third.events), ([], []))
+        self.assertEqual((first.region, third.region), ('north', 'north'))
+
+
+class TestComponentCoreResolutionCache(CognateTestCase):
+    """Test the caching of resolved arguments across constructions."""
+
+    def setUp(self):
+        configuration.clear_resolution_cache()
+
+    def tearDown(self):
+        configuration.resolution_cache().enabled = True
+        configuration.clear_resolution_cache()
+
+    def test_repeat_construction(self):
+        """Ensure a repeated construction is resolved from the cache."""
+
+        class Cached(ComponentCore):
+            def __init__(self, region='east', **kwargs):
+                self.region = region
+                self.configured = 0
+                super().__init__(**kwargs)
+
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--region', default=self.region)
+
+            def cognate_configure(self, args):
+                self.configured += 1
+
+        cache = configuration.resolution_cache()
+        first = Cached(argv='--service_name c1 --region north')
+        with mock.patch.object(argparse.ArgumentParser, 'parse_args',
+                               side_effect=AssertionError('parsed')):
+            second = Cached(argv='--service_name c1 --region north')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual((second.service_name, second.region), ('c1', 'north'))
+        self.assertEqual(second.configured, 1)
+        self.assertIsNot(first, second)
+
+        # the instance defaults are part of the key
+        west = Cached(argv='--service_name c1 --region north', region='west')
+        self.assertEqual(west.region, 'north')
+        self.assertEqual(cache.misses, 2)
+        west = Cached(argv='--service_name c1', region='west')
+        self.assertEqual(west.region, 'west')
+        self.assertEqual(cache.misses, 3)
+
+    def test_bypass(self):
+        """Ensure the class flag and the cache switch bypass the cache."""
+
+        class Uncached(ComponentCore):
+            RESOLUTION_CACHE = False
+
+        cache = configuration.resolution_cache()
+        Uncached(argv='--service_name u1')
+        Uncached(argv='--service_name u1')
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+
+        cache.enabled = False
+        ComponentCore(argv='--service_name u2')
+        ComponentCore(argv='--service_name u2')
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+
+        cache.enabled = True
+        ComponentCore(argv='--service_name u2')
+        ComponentCore(argv='--service_name u2')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_keyword_construction(self):
+        """Ensure construction by keyword arguments bypasses the cache."""
+        cache = configuration.resolution_cache()
+        ComponentCore(service_name='k1')
+        ComponentCore(service_name='k1')
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 0))
+
+    def test_errors_not_cached(self):
+        """Ensure arguments that fail to parse are not cached."""
+        cache = configuration.resolution_cache()
+        for _ in range(2):
+            with redirect_stderr(io.StringIO()):
+                self.assertRaises(SystemExit, ComponentCore,
+                                  argv='--log_level loud')
+        self.assertEqual((cache.hits, len(cache)), (0, 0))
+
+
+class TestComponentCoreStartupProfile(CognateTestCase):
+    """Test the timing of the phases and hooks of the configuration."""
+
+    def tearDown(self):
+        configuration.clear_environment_snapshot()
+
+    def test_profile(self):
+        """Ensure the phases and the hooks of each class are timed."""
+
+        class Base(ComponentCore):
+            def cognate_options(self, arg_parser):
+                arg_parser.add_argument('--base', default='base')
+
+        class Slow(Base):
+            def cognate_configure(self, args):
+                time.sleep(0.02)
+
+        self.assertIsNone(Slow().startup_profile)
+
+        log_path = path.join(TEST_OUT, 'ProfiledSvc.log')
+        if path.exists(log_path):
+            remove(log_path)
+        foo = Slow(argv='--profile_startup --service_name ProfiledSvc '
+                        '--log_level debug --log_format json --log_path %s' %
+                        TEST_OUT)
+        profile = foo.startup_profile
+        self.assertTrue(foo.profile_startup)
+        self.assertFalse(profile.active)
+        self.assertEqual(list(profile.phases),
+                         ['tokenize', 'sources', 'arguments', 'assign',
+                          'logging', 'configure', 'complete'])
+        self.assertGreaterEqual(profile.phases['configure'], 0.02)
+        self.assertGreaterEqual(profile.total,
+                                sum(seconds for phase, seconds in
+                                    profile.phases.items()
+                                    if phase != 'logging'))
+
+        hooks = [(hook['hook'], hook['class'].rpartition('.')[2])
+                 for hook in profile.hooks]
+        self.assertEqual(hooks, [('cognate_options', 'ComponentCore'),
+                                 ('cognate_options', 'Base'),
+                                 ('cognate_configure', 'ComponentCore'),
+                                 ('cognate_configure', 'Slow')])
+        self.assertTrue(profile.class_totals()[0][0].endswith('Slow'))
+
+        # the profile is logged with structured fields
+        with open(log_path) as log_file:
+            records = [json.loads(line) for line in log_file]
+        logged = [record for record in records
+                  if record['message'].startswith('Startup profile:')]
+        self.assertEqual(len(logged), 1)
+        self.assertEqual(logged[0]['fields']['phases'], profile.phases)
+        self.assertEqual(len(logged[0]['fields']['hooks']), 4)
+
+        # hooks invoked after construction are not recorded
+        foo.start()
+        foo.reconfigure({'base': 'changed'})
+        self.assertEqual(len(profile.hooks), 4)
+        foo.close()
+
+    def test_profile_from_environment(self):
+        """Ensure the profile is enabled by an environment variable."""
+        configuration.clear_environment_snapshot()
+        with mock.patch.dict(os.environ,
+                             {'COGNATE_ENVPROFILE_PROFILE_STARTUP': 'yes'}):
+            configuration.environment_snapshot()
+
+        foo = ComponentCore(service_name='EnvProfile', log_lazy=True)
+        self.assertEqual(list(foo.startup_profile.phases),
+                         ['arguments', 'assign', 'configure', 'complete'])
+
+    def test_profile_slotted(self):
+        """Ensure instances of a slotted class are profiled."""
+
+        class Profiled(ComponentCore):
+            SLOTTED_OPTIONS = True
+
+        Profiled()
+        foo = Profiled(profile_startup=True)
+        self.assertIsNot(type(foo), Profiled)
+        self.assertEqual(len(foo.startup_profile.hooks), 2)
+        self.assertIsNone(Profiled().startup_profile)
+
+
 class TestComponentCoreLogSetup(CognateTestCase):
     """Test the logging features of the component core."""
 
@@ -237,6 +1501,152 @@ class TestComponentCoreLogSetup(CognateTestCase):
         self.assertEqual('./' + foo.log_path, log_path)
         self.assertEqual(foo.log_level, WARNING)
 
+    def test_async_logging(self):
+        """Test logging through the background log listener."""
+        log_path = path.join(TEST_OUT, 'AsyncService.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = ('--service_name AsyncService --log_level info --log_async '
+                '--log_queue_policy drop --log_path %s' % TEST_OUT)
+        foo = ComponentCore(argv=argv)
+        self.assertEqual(foo.log_async, True)
+        self.assertEqual(foo.log_queue_policy, 'drop')
+        self.assertEqual(len(foo.log.handlers), 1)
+        handler = foo.log.handlers[0]
+        self.assertIsInstance(handler, log_support.AsyncQueueHandler)
+        self.assertEqual(handler.policy, 'drop')
+
+        foo.log.info('Queued message')
+        log_support.stop_async_logging()
+        with open(log_path) as log_file:
+            content = log_file.read()
+        self.assertIn('Logging configured for: AsyncService', content)
+        self.assertIn('Queued message', content)
+
+    def test_shared_log_handlers(self):
+        """Test components logging to the same target share one handler."""
+        log_path = path.join(TEST_OUT, 'SharedService.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = ('--service_name SharedService --log_level info --log_path %s' %
+                TEST_OUT)
+        first = ComponentCore(argv=argv)
+        second = ComponentCore(argv=argv)
+        self.assertIs(first.log, second.log)
+        self.assertEqual(len(first.log.handlers), 1)
+        handler = first.log.handlers[0]
+
+        first.log.info('Written once')
+        with open(log_path) as log_file:
+            self.assertEqual(log_file.read().count('Written once'), 1)
+
+        first.close()
+        self.assertEqual(second.log.handlers, [handler])
+        second.close()
+        second.close()  # closing again is harmless
+        self.assertEqual(second.log.handlers, [])
+        self.assertIsNone(handler.stream)
+
+        third = ComponentCore(argv=argv)
+        self.assertEqual(len(third.log.handlers), 1)
+        self.assertIsNot(third.log.handlers[0], handler)
+        third.close()
+
+    def test_buffered_file_logging(self):
+        """Test buffered log file output."""
+        log_path = path.join(TEST_OUT, 'BufferedService.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = ('--service_name BufferedService --log_level info '
+                '--log_buffer_size 10 --log_flush_interval 0 --log_path %s' %
+                TEST_OUT)
+        foo = ComponentCore(argv=argv)
+        self.assertEqual(foo.log_buffer_size, 10)
+        self.assertEqual(foo.log_flush_interval, 0.0)
+        handler = foo.log.handlers[0]
+        self.assertIsInstance(handler, log_support.BufferedFileHandler)
+        self.assertEqual(handler.buffer_size, 10)
+
+        foo.log.info('Buffered message')
+        with open(log_path) as log_file:
+            self.assertEqual(log_file.read(), '')
+
+        foo.close()
+        with open(log_path) as log_file:
+            content = log_file.read()
+        self.assertIn('Logging configured for: BufferedService', content)
+        self.assertIn('Buffered message', content)
+
+    def test_json_logging(self):
+        """Test JSON formatted log file output."""
+        log_path = path.join(TEST_OUT, 'JsonService.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = ('--service_name JsonService --log_level info '
+                '--log_format json --log_path %s' % TEST_OUT)
+        foo = ComponentCore(argv=argv)
+        self.assertEqual(foo.log_format, 'json')
+        foo.log.info('Structured', extra={'fields': {'answer': 42}})
+        foo.close()
+
+        with open(log_path) as log_file:
+            entries = [json.loads(line) for line in log_file]
+        self.assertEqual(entries[0]['message'],
+                         'Logging configured for: JsonService')
+        self.assertEqual(entries[1]['service'], 'JsonService')
+        self.assertEqual(entries[1]['level'], 'INFO')
+        self.assertEqual(entries[1]['fields'], {'answer': 42})
+
+    def test_log_storm_filter(self):
+        """Test rate limiting and sampling of the component log."""
+        argv = ('--service_name StormService --log_level debug '
+                '--log_rate_limit 0.001 --log_rate_burst 1 '
+                '--log_sample_rate 0.5')
+        foo = ComponentCore(argv=argv)
+        bar = ComponentCore(argv=argv)
+        self.assertEqual(foo.log_rate_limit, 0.001)
+        self.assertEqual(foo.log_rate_burst, 1)
+        self.assertEqual(foo.log_sample_rate, 0.5)
+
+        storm_filters = [log_filter for log_filter in foo.log.filters
+                         if isinstance(log_filter, log_support.LogStormFilter)]
+        self.assertEqual(len(storm_filters), 1)
+        self.assertEqual(storm_filters[0].rate_burst, 1)
+
+        foo.close()
+        self.assertIn(storm_filters[0], bar.log.filters)
+        bar.close()
+        self.assertNotIn(storm_filters[0], bar.log.filters)
+
+        baz = ComponentCore(service_name='StormService')
+        self.assertEqual(baz.log.filters, [])
+
+    def test_lazy_logging(self):
+        """Test log configuration deferred to the first log access."""
+        log_path = path.join(TEST_OUT, 'LazyService.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = ('--service_name LazyService --log_level info --log_lazy '
+                '--log_path %s' % TEST_OUT)
+        foo = ComponentCore(argv=argv)
+        self.assertEqual(foo.log_lazy, True)
+        self.assertEqual(foo.log_level, INFO)
+        self.assertNotIn('log', foo.__dict__)
+        self.assertFalse(path.exists(log_path))
+
+        log = foo.log
+        self.assertIs(log, foo.__dict__['log'])
+        self.assertIs(log, foo.log)
+        self.assertEqual(log.name, 'LazyService')
+        self.assertEqual(log.level, INFO)
+        self.assertTrue(path.exists(log_path))
+        foo.close()
+
     def test_explict_log_passing(self):
         """Test that a component_core can accept and external logger."""
         log = logging.getLogger('SOME_LOGGER')
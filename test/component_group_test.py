@@ -0,0 +1,164 @@
+import threading
+import time
+
+from test.cognate_test_case import CognateTestCase
+
+from cognate.component_core import ComponentCore
+from cognate.component_group import ComponentGroup
+
+
+class Warmed(ComponentCore):
+    """A component with a slow start, that records the lifecycle events."""
+
+    def __init__(self, events=None, warm_up=0.0, fail_on=None, **kwargs):
+        self.events = events if events is not None else []
+        self.warm_up = warm_up
+        self.fail_on = fail_on
+
+        super().__init__(**kwargs)
+
+    def cognate_start(self):
+        time.sleep(self.warm_up)
+        if self.fail_on == 'start':
+            raise RuntimeError('%s failed to start' % self.service_name)
+        self.events.append(('start', self.service_name))
+
+    def cognate_stop(self):
+        if self.fail_on == 'stop':
+            raise RuntimeError('%s failed to stop' % self.service_name)
+        self.events.append(('stop', self.service_name))
+
+
+class Mixin(object):
+    def cognate_start(self):
+        self.events.append(('start', 'Mixin'))
+
+    def cognate_stop(self):
+        self.events.append(('stop', 'Mixin'))
+
+
+class MixedWarmed(Warmed, Mixin):
+    pass
+
+
+class TestComponentLifecycle(CognateTestCase):
+    """Test the lifecycle hooks of a component."""
+
+    def test_hook_order(self):
+        """Ensure stop hooks are invoked in the reverse of the start hooks."""
+        foo = MixedWarmed(service_name='Foo')
+        foo.start()
+        foo.stop()
+        self.assertEqual(foo.events, [('start', 'Mixin'), ('start', 'Foo'),
+                                      ('stop', 'Foo'), ('stop', 'Mixin')])
+
+    def test_no_hooks(self):
+        """Ensure a component without lifecycle hooks starts and stops."""
+        foo = ComponentCore()
+        foo.start()
+        foo.stop()
+
+
+class TestComponentGroup(CognateTestCase):
+    """Test the dependency ordered start and stop of a group."""
+
+    def test_dependency_order(self):
+        """Ensure components start after, and stop before, their
+        dependencies."""
+        events = []
+        store = Warmed(events, 0.02, service_name='Store')
+        cache = Warmed(events, service_name='Cache')
+        api = Warmed(events, service_name='Api')
+
+        group = ComponentGroup()
+        group.add(store)
+        group.add(cache, depends_on=[store])
+        group.add(api, depends_on=[cache])
+
+        with group:
+            self.assertEqual(group.started, [store, cache, api])
+        self.assertEqual(group.started, [])
+        self.assertEqual([name for _, name in events],
+                         ['Store', 'Cache', 'Api', 'Api', 'Cache', 'Store'])
+
+    def test_parallel_start(self):
+        """Ensure independent components start concurrently, so that the
+        group starts in about the time of its longest dependency chain."""
+        events = []
+        base = Warmed(events, 0.1, service_name='Base')
+        group = ComponentGroup([base])
+        for index in range(8):
+            group.add(Warmed(events, 0.1, service_name='Leaf%d' % index),
+                      depends_on=[base])
+
+        start_time = time.perf_counter()
+        group.start()
+        elapsed = time.perf_counter() - start_time
+        self.assertEqual(len(group.started), 9)
+        self.assertIs(group.started[0], base)
+        self.assertLess(elapsed, 0.5)
+        group.stop()
+        self.assertEqual(events[-1], ('stop', 'Base'))
+
+    def test_max_workers(self):
+        """Ensure the concurrency is bounded by max_workers."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        class Counted(ComponentCore):
+            def cognate_start(self):
+                with lock:
+                    active.append(self)
+                    peak.append(len(active))
+                time.sleep(0.01)
+                with lock:
+                    active.remove(self)
+
+        group = ComponentGroup([Counted() for _ in range(6)], max_workers=2)
+        group.start()
+        self.assertEqual(len(group.started), 6)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_start_failure(self):
+        """Ensure a failed start stops the started components."""
+        events = []
+        store = Warmed(events, service_name='Store')
+        broken = Warmed(events, fail_on='start', service_name='Broken')
+        api = Warmed(events, service_name='Api')
+
+        group = ComponentGroup()
+        group.add(store)
+        group.add(broken, depends_on=[store])
+        group.add(api, depends_on=[broken])
+
+        with self.assertRaises(RuntimeError):
+            group.start()
+        self.assertEqual(group.started, [])
+        self.assertEqual(events, [('start', 'Store'), ('stop', 'Store')])
+
+    def test_stop_failure(self):
+        """Ensure the remaining components are stopped after a failed stop."""
+        events = []
+        store = Warmed(events, service_name='Store')
+        broken = Warmed(events, fail_on='stop', service_name='Broken')
+        group = ComponentGroup()
+        group.add(store)
+        group.add(broken, depends_on=[store])
+        group.start()
+
+        with self.assertRaises(RuntimeError):
+            group.stop()
+        self.assertEqual(group.started, [])
+        self.assertEqual(events[-1], ('stop', 'Store'))
+
+    def test_add_validation(self):
+        """Ensure dependencies must be added to the group first."""
+        store = ComponentCore(service_name='Store')
+        group = ComponentGroup([store])
+
+        with self.assertRaises(ValueError):
+            group.add(store)
+        with self.assertRaises(ValueError):
+            group.add(ComponentCore(),
+                      depends_on=[ComponentCore(service_name='Other')])
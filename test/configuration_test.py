@@ -0,0 +1,326 @@
+import argparse
+import json
+import os
+from os import path
+from unittest import TestCase
+
+from test.cognate_test_case import CognateTestCase, TEST_OUT
+
+from cognate import configuration
+from cognate.component_core import ComponentCore
+
+
+def write_file(file_name, content):
+    file_path = path.abspath(path.join(TEST_OUT, file_name))
+    with open(file_path, 'w') as config_file:
+        config_file.write(content)
+    return file_path
+
+
+class ConfigFileTestCase(CognateTestCase):
+    def setUp(self):
+        configuration.clear_config_cache()
+
+    def test_json_file(self):
+        """Ensure JSON top level values and service objects are parsed."""
+        config_path = write_file('config_test.json', json.dumps({
+            'log_level': 'info',
+            'log-queue-size': 5,
+            'Orders': {'log_level': 'debug'},
+        }))
+        config_file = configuration.load_config_file(config_path)
+        self.assertEqual(config_file.values, {'log_level': 'info',
+                                              'log_queue_size': 5})
+        self.assertEqual(config_file.sections,
+                         {'Orders': {'log_level': 'debug'}})
+
+    def test_ini_file(self):
+        """Ensure INI default values and service sections are parsed."""
+        config_path = write_file('config_test.ini',
+                                 '[DEFAULT]\n'
+                                 'log_level = info\n'
+                                 '[Orders]\n'
+                                 'Verbose = yes\n')
+        config_file = configuration.load_config_file(config_path)
+        self.assertEqual(config_file.values, {'log_level': 'info'})
+        self.assertEqual(config_file.sections,
+                         {'Orders': {'log_level': 'info', 'Verbose': 'yes'}})
+
+    def test_parse_cache(self):
+        """Ensure a file is parsed again only once it changes."""
+        config_path = write_file('config_cache.json', '{"verbose": true}')
+        config_file = configuration.load_config_file(config_path)
+        self.assertIs(config_file,
+                      configuration.load_config_file(config_path))
+
+        write_file('config_cache.json', '{"verbose": false}')
+        stat = os.stat(config_path)
+        os.utime(config_path, ns=(stat.st_atime_ns,
+                                  stat.st_mtime_ns + 1000000000))
+        reloaded = configuration.load_config_file(config_path)
+        self.assertIsNot(config_file, reloaded)
+        self.assertEqual(reloaded.values, {'verbose': False})
+
+    def test_invalid_files(self):
+        """Ensure unreadable and malformed files are reported."""
+        self.assertRaisesRegex(ValueError,
+                               '"config" file ".*missing.json" can not be read',
+                               configuration.load_config_file,
+                               path.join(TEST_OUT, 'missing.json'))
+
+        config_path = write_file('config_list.json', '[1, 2]')
+        self.assertRaisesRegex(ValueError,
+                               'can not be parsed: expected a JSON object',
+                               configuration.load_config_file, config_path)
+
+        config_path = write_file('config_bad.ini', 'log_level = info\n')
+        self.assertRaisesRegex(ValueError, 'can not be parsed',
+                               configuration.load_config_file, config_path)
+
+    def test_defaults_for(self):
+        """Ensure values are converted for the options of a component."""
+        config_path = write_file('config_defaults.ini',
+                                 '[DEFAULT]\n'
+                                 'log_queue_size = 20\n'
+                                 'unknown = ignored\n'
+                                 '[Orders]\n'
+                                 'verbose = on\n')
+        config_file = configuration.load_config_file(config_path)
+        template = ComponentCore()._option_template()
+
+        defaults = config_file.defaults_for(template, 'Orders')
+        self.assertEqual(defaults, {'log_queue_size': 20, 'verbose': True})
+        self.assertIs(defaults, config_file.defaults_for(template, 'Orders'))
+        self.assertEqual(config_file.defaults_for(template, 'Other'),
+                         {'log_queue_size': 20})
+
+    def test_defaults_for_bounded(self):
+        """Ensure the resolved defaults are held per template and section,
+        not per service name."""
+        config_path = write_file('config_bounded.json',
+                                 '{"log_queue_size": 20,'
+                                 ' "Orders": {"verbose": true}}')
+        config_file = configuration.load_config_file(config_path)
+        template = ComponentCore()._option_template()
+
+        shared = config_file.defaults_for(template, 'svc-0')
+        for index in range(1, 100):
+            self.assertIs(config_file.defaults_for(template, 'svc-%d' % index),
+                          shared)
+        config_file.defaults_for(template, 'Orders')
+        self.assertEqual(len(config_file._defaults), 1)
+        self.assertEqual(set(config_file._defaults[template]),
+                         {None, 'Orders'})
+
+    def test_environment_snapshot(self):
+        """Ensure option values are read from service environment variables."""
+        snapshot = configuration.EnvironmentSnapshot({
+            'COGNATE_ORDER_SVC_LOG_LEVEL': 'debug',
+            'COGNATE_ORDER_SVC_VERBOSE': 'true',
+            'COGNATE_OTHER_LOG_LEVEL': 'info',
+            'HOME': '/root',
+        })
+        self.assertNotIn('HOME', snapshot.values)
+
+        template = ComponentCore()._option_template()
+        self.assertEqual(template.env_names['log_level'], 'LOG_LEVEL')
+        defaults = snapshot.defaults_for(template, 'order-svc')
+        self.assertEqual(defaults, {'log_level': 'debug', 'verbose': True})
+        self.assertIs(defaults, snapshot.defaults_for(template, 'order-svc'))
+        self.assertEqual(snapshot.defaults_for(template, 'Unknown'), {})
+        for index in range(100):
+            self.assertEqual(
+                snapshot.defaults_for(template, 'svc-%d' % index), {})
+        self.assertEqual(len(snapshot._defaults), 1)
+        service_names, converted = snapshot._defaults[template]
+        self.assertEqual(service_names, {'ORDER_SVC', 'OTHER'})
+        self.assertEqual(list(converted), ['ORDER_SVC'])
+
+        snapshot = configuration.EnvironmentSnapshot(
+            {'COGNATE_BAD_LOG_QUEUE_SIZE': 'lots'})
+        self.assertRaisesRegex(ValueError,
+                               'from environment variable '
+                               '"COGNATE_BAD_LOG_QUEUE_SIZE" is not valid',
+                               snapshot.defaults_for, template, 'bad')
+
+    def test_invalid_values(self):
+        """Ensure values that do not suit their option are reported."""
+        template = ComponentCore()._option_template()
+        self.assertRaisesRegex(ValueError,
+                               '"log_queue_size" value \'many\' from test is '
+                               'not valid',
+                               template.source_defaults,
+                               {'log_queue_size': 'many'}, 'test')
+        self.assertRaisesRegex(ValueError,
+                               '"verbose" value \'maybe\' from test is not '
+                               'valid',
+                               template.source_defaults,
+                               {'verbose': 'maybe'}, 'test')
+        self.assertRaisesRegex(ValueError,
+                               '"log_level" value \'loud\' from test must be '
+                               'one of: debug, info, warn, error',
+                               template.source_defaults,
+                               {'log_level': 'loud'}, 'test')
+
+
+class CompiledParserTestCase(TestCase):
+    def test_parse(self):
+        """Ensure arguments are resolved in place, or left to argparse."""
+        ComponentCore()
+        template = ComponentCore.__dict__['_cognate_template']
+        compiled_parser = template.compiled_parser
+        self.assertIs(compiled_parser, template.compiled_parser)
+
+        namespace = argparse.Namespace(verbose=False, log_level='error')
+        self.assertTrue(compiled_parser.parse(
+            ['--verbose', '--log_level=info'], namespace))
+        self.assertEqual(vars(namespace),
+                         {'verbose': True, 'log_level': 'info'})
+
+        fallbacks = compiled_parser.fallbacks
+        for argv in (['--verb'], ['--verbose', '--help'],
+                     ['--log_level', 'loud']):
+            namespace = argparse.Namespace(verbose=False)
+            self.assertFalse(compiled_parser.parse(argv, namespace))
+            self.assertEqual(vars(namespace), {'verbose': False})
+        self.assertEqual(compiled_parser.fallbacks, fallbacks + 3)
+
+
+class ResolutionCacheTestCase(TestCase):
+    def test_eviction(self):
+        """Ensure the least recently used entries are evicted."""
+        cache = configuration.ResolutionCache(maxsize=2)
+        cache.put('a', argparse.Namespace(value=1))
+        cache.put('b', argparse.Namespace(value=2))
+        self.assertEqual(cache.get('a').value, 1)
+        cache.put('c', argparse.Namespace(value=3))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c').value, 3)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_copies(self):
+        """Ensure the cached arguments are isolated from their users."""
+        cache = configuration.ResolutionCache()
+        args = argparse.Namespace(names=['a'], level='info')
+        cache.put('key', args)
+        args.names.append('b')
+
+        cached = cache.get('key')
+        self.assertEqual(cached.names, ['a'])
+        cached.names.append('c')
+        cached.level = 'debug'
+        self.assertEqual(vars(cache.get('key')),
+                         {'names': ['a'], 'level': 'info'})
+
+    def test_split(self):
+        """Ensure argument strings are split as with shlex."""
+        cache = configuration.ResolutionCache()
+        tokens = cache.split('--service_name "a b"')
+        self.assertEqual(tokens, ['--service_name', 'a b'])
+        tokens.append('--verbose')
+        self.assertEqual(cache.split('--service_name "a b"'),
+                         ['--service_name', 'a b'])
+
+        cache.enabled = False
+        self.assertEqual(cache.split('--verbose'), ['--verbose'])
+
+    def test_clear(self):
+        """Ensure clearing discards the entries and the counts."""
+        cache = configuration.ResolutionCache()
+        cache.put('key', argparse.Namespace())
+        cache.get('key')
+        cache.get('missing')
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+        self.assertIsNone(cache.get('key'))
+
+
+class CopyPlanTestCase(TestCase):
+    def test_validation(self):
+        """Ensure the property names are validated on construction."""
+        self.assertRaisesRegex(ValueError, '"property_names" must be provided',
+                               configuration.CopyPlan, None)
+        self.assertRaisesRegex(ValueError, 'must be a sequence type',
+                               configuration.CopyPlan, 'name')
+
+    def test_object_and_mapping_sources(self):
+        """Ensure values are copied from objects and mappings."""
+        plan = configuration.CopyPlan(['first', 'second'])
+        target = argparse.Namespace()
+        plan(argparse.Namespace(first=1, second=2, third=3), target)
+        self.assertEqual(vars(target), {'first': 1, 'second': 2})
+
+        target = argparse.Namespace()
+        plan({'first': 'a', 'second': 'b'}, target)
+        self.assertEqual(vars(target), {'first': 'a', 'second': 'b'})
+
+        single = configuration.CopyPlan(['first'])
+        single({'first': 'only'}, target)
+        self.assertEqual(target.first, 'only')
+        configuration.CopyPlan([])(argparse.Namespace(first=0), target)
+        self.assertEqual(target.first, 'only')
+
+    def test_missing_names(self):
+        """Ensure names not held by the source are not copied."""
+        plan = configuration.CopyPlan(['first', 'missing', 'second'])
+        target = argparse.Namespace()
+        plan(argparse.Namespace(first=1, second=2), target)
+        self.assertEqual(vars(target), {'first': 1, 'second': 2})
+
+        target = argparse.Namespace()
+        plan({'second': 2}, target)
+        self.assertEqual(vars(target), {'second': 2})
+
+    def test_capture_and_apply(self):
+        """Ensure captured values are applied to any number of targets."""
+        plan = configuration.CopyPlan(['first', 'missing', 'second'])
+        values = plan.capture(argparse.Namespace(first=1, second=2))
+        self.assertEqual(values, {'first': 1, 'second': 2})
+
+        target = argparse.Namespace(first=0, other='kept')
+        plan.apply(values, target)
+        self.assertEqual(vars(target),
+                         {'first': 1, 'second': 2, 'other': 'kept'})
+        target.first = 'changed'
+        self.assertEqual(values['first'], 1)
+
+        class Slotted(object):
+            __slots__ = ('first', 'second')
+
+        slotted = Slotted()
+        plan.apply(values, slotted)
+        self.assertEqual((slotted.first, slotted.second), (1, 2))
+
+    def test_descriptor_targets(self):
+        """Ensure slots and properties of the target are assigned."""
+
+        class Slotted(object):
+            __slots__ = ('first', 'second')
+
+        class Guarded(object):
+            def __init__(self):
+                self.assigned = []
+
+            @property
+            def second(self):
+                return self.assigned[-1]
+
+            @second.setter
+            def second(self, value):
+                self.assigned.append(value)
+
+        plan = configuration.CopyPlan(['first', 'second'])
+        source = {'first': 1, 'second': 2}
+
+        slotted = Slotted()
+        plan(source, slotted)
+        self.assertEqual((slotted.first, slotted.second), (1, 2))
+
+        guarded = Guarded()
+        plan(source, guarded)
+        plan({'first': 3, 'second': 4}, guarded)
+        self.assertEqual(guarded.first, 3)
+        self.assertEqual(guarded.assigned, [2, 4])
+        self.assertNotIn('second', vars(guarded))
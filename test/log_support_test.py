@@ -0,0 +1,409 @@
+import json
+import logging
+import sys
+import threading
+import time
+from os import path, remove
+from unittest import TestCase
+
+from test.cognate_test_case import CognateTestCase, TEST_OUT
+
+from cognate import log_support
+from cognate.log_support import (AsyncLogListener, AsyncQueueHandler,
+                                 BufferedFileHandler, HandlerRegistry,
+                                 JsonFormatter, LogStormFilter)
+
+
+class RecordingHandler(logging.Handler):
+    """A handler that collects the messages of the records it handles."""
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.gate = gate
+        self.messages = []
+        self.flushed = False
+        self.closed = False
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.messages.append(record.getMessage())
+
+    def flush(self):
+        self.flushed = True
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+def make_record(msg, *args, level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 1, msg, args, None)
+
+
+def read_file(file_path):
+    with open(file_path) as log_file:
+        return log_file.read()
+
+
+class AsyncQueueHandlerTestCase(TestCase):
+    def test_policy_validation(self):
+        """Ensure an unknown queue policy is rejected."""
+        self.assertRaisesRegex(
+            ValueError,
+            '"policy" must be one of',
+            AsyncQueueHandler, [], AsyncLogListener(), 'discard')
+
+    def test_dispatch_on_listener_thread(self):
+        """Ensure records are dispatched to the target handlers."""
+        target = RecordingHandler()
+        listener = AsyncLogListener()
+        handler = AsyncQueueHandler([target], listener)
+        listener.start()
+        try:
+            arg = ['before']
+            handler.handle(make_record('value: %s', arg))
+            arg[0] = 'after'
+        finally:
+            listener.stop()
+
+        self.assertEqual(target.messages, ["value: ['before']"])
+        self.assertTrue(target.flushed)
+        self.assertFalse(listener.running)
+
+    def test_synchronous_when_stopped(self):
+        """Ensure records are handled in place when the listener is stopped."""
+        target = RecordingHandler()
+        handler = AsyncQueueHandler([target], AsyncLogListener())
+        handler.handle(make_record('direct'))
+        self.assertEqual(target.messages, ['direct'])
+
+    def test_target_handler_level(self):
+        """Ensure the level of the target handlers is honored."""
+        target = RecordingHandler()
+        target.setLevel(logging.ERROR)
+        handler = AsyncQueueHandler([target], AsyncLogListener())
+        handler.handle(make_record('filtered'))
+        self.assertEqual(target.messages, [])
+
+    def test_close_after_queued_records(self):
+        """Ensure the close callback follows the queued records."""
+        events = []
+        target = RecordingHandler()
+        listener = AsyncLogListener()
+        handler = AsyncQueueHandler([target], listener,
+                                    on_close=lambda: events.append('closed'))
+        listener.start()
+        try:
+            handler.handle(make_record('last'))
+            handler.close()
+        finally:
+            listener.stop()
+
+        self.assertEqual(target.messages, ['last'])
+        self.assertEqual(events, ['closed'])
+
+    def test_drop_policy(self):
+        """Ensure records are dropped and counted when the queue is full."""
+        gate = threading.Event()
+        target = RecordingHandler(gate=gate)
+        listener = AsyncLogListener(queue_size=1)
+        handler = AsyncQueueHandler([target], listener, policy='drop')
+        listener.start()
+        try:
+            handler.handle(make_record('first'))
+            # wait for the listener to block on the first record
+            while not listener.queue.empty():
+                gate.wait(0.001)
+            handler.handle(make_record('second'))
+            handler.handle(make_record('third'))
+        finally:
+            gate.set()
+            listener.stop()
+
+        self.assertEqual(target.messages, ['first', 'second'])
+        self.assertEqual(handler.dropped, 1)
+        self.assertEqual(listener.dropped, 1)
+
+
+class BufferedFileHandlerTestCase(CognateTestCase):
+    def setUp(self):
+        self.log_path = path.join(TEST_OUT, 'buffered.log')
+        if path.exists(self.log_path):
+            remove(self.log_path)
+
+    def test_buffer_size_validation(self):
+        """Ensure a buffer must hold at least one record."""
+        self.assertRaisesRegex(
+            ValueError,
+            '"buffer_size" must be at least 1.',
+            BufferedFileHandler, self.log_path, 0)
+
+    def test_buffer_size_write(self):
+        """Ensure records are written once the buffer is full."""
+        handler = BufferedFileHandler(self.log_path, buffer_size=3,
+                                      flush_interval=0)
+        try:
+            handler.handle(make_record('one'))
+            handler.handle(make_record('two'))
+            self.assertEqual(read_file(self.log_path), '')
+            self.assertIsNone(handler.flush_deadline)
+
+            handler.handle(make_record('three'))
+            self.assertEqual(read_file(self.log_path), 'one\ntwo\nthree\n')
+        finally:
+            handler.close()
+
+    def test_error_write(self):
+        """Ensure an error record writes all buffered records."""
+        handler = BufferedFileHandler(self.log_path, buffer_size=100,
+                                      flush_interval=0)
+        try:
+            handler.handle(make_record('info'))
+            handler.handle(make_record('failed', level=logging.ERROR))
+            self.assertEqual(read_file(self.log_path), 'info\nfailed\n')
+        finally:
+            handler.close()
+
+    def test_close_write(self):
+        """Ensure buffered records are written on close."""
+        handler = BufferedFileHandler(self.log_path, buffer_size=100,
+                                      flush_interval=0)
+        handler.handle(make_record('pending'))
+        handler.close()
+        self.assertEqual(read_file(self.log_path), 'pending\n')
+
+    def test_interval_write(self):
+        """Ensure buffered records are written within the flush interval."""
+        handler = BufferedFileHandler(self.log_path, buffer_size=100,
+                                      flush_interval=0.01)
+        try:
+            handler.handle(make_record('idle'))
+            self.assertIsNotNone(handler.flush_deadline)
+            for _ in range(500):
+                if handler.flush_deadline is None:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(read_file(self.log_path), 'idle\n')
+        finally:
+            handler.close()
+
+
+class JsonFormatterTestCase(TestCase):
+    def test_record_fields(self):
+        """Ensure a record is rendered as a JSON object."""
+        formatter = JsonFormatter({'service': 'Svc "1"', 'port': 80})
+        record = make_record('Hello %s', 'W\u00f6rld', level=logging.WARNING)
+        entry = json.loads(formatter.format(record))
+
+        self.assertEqual(list(entry), ['service', 'port', 'time', 'level',
+                                       'logger', 'pid', 'thread', 'message'])
+        self.assertEqual(entry['service'], 'Svc "1"')
+        self.assertEqual(entry['port'], 80)
+        self.assertEqual(entry['time'], record.created)
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['logger'], 'test')
+        self.assertEqual(entry['pid'], record.process)
+        self.assertEqual(entry['message'], 'Hello W\u00f6rld')
+
+    def test_percent_in_static_fields(self):
+        """Ensure static fields are not treated as a format template."""
+        formatter = JsonFormatter({'service': '100%s'})
+        entry = json.loads(formatter.format(make_record('done')))
+        self.assertEqual(entry['service'], '100%s')
+
+    def test_debug_location(self):
+        """Ensure debug mode adds the source file and line."""
+        entry = json.loads(JsonFormatter(debug=True).format(
+            make_record('located')))
+        self.assertEqual(entry['file'], __file__)
+        self.assertEqual(entry['line'], 1)
+
+        entry = json.loads(JsonFormatter().format(make_record('plain')))
+        self.assertNotIn('file', entry)
+
+    def test_structured_fields(self):
+        """Ensure the fields passed in extra are rendered."""
+        record = make_record('served')
+        record.fields = {'status': 200, 'path': '/'}
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry['fields'], {'status': 200, 'path': '/'})
+
+    def test_exception(self):
+        """Ensure exception text is rendered."""
+        try:
+            raise ValueError('bad value')
+        except ValueError:
+            record = logging.LogRecord('test', logging.ERROR, __file__, 1,
+                                       'failed', (), sys.exc_info())
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertIn('ValueError: bad value', entry['exc_info'])
+
+    def test_shared_service_formatter(self):
+        """Ensure the formatter of a service is shared."""
+        formatter = log_support.json_formatter('JsonSvc')
+        self.assertIs(formatter, log_support.json_formatter('JsonSvc'))
+        self.assertIsNot(formatter,
+                         log_support.json_formatter('JsonSvc', debug=True))
+        entry = json.loads(formatter.format(make_record('shared')))
+        self.assertEqual(entry['service'], 'JsonSvc')
+
+
+class LogStormFilterTestCase(TestCase):
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger('StormTest')
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        for storm_filter in list(self.logger.filters):
+            self.logger.removeFilter(storm_filter)
+
+    def test_validation(self):
+        """Ensure invalid limits are rejected."""
+        self.assertRaisesRegex(ValueError, '"rate_limit" must not be negative',
+                               LogStormFilter, rate_limit=-1)
+        self.assertRaisesRegex(ValueError, '"sample_rate" must be between',
+                               LogStormFilter, sample_rate=1.5)
+
+    def test_rate_limit_per_template(self):
+        """Ensure each message template and level has its own bucket."""
+        storm_filter = LogStormFilter('StormTest', rate_limit=0.001,
+                                      rate_burst=2)
+        self.logger.addFilter(storm_filter)
+
+        for i in range(5):
+            self.logger.error('Connection %d failed', i)
+        self.logger.warning('Connection %d failed', 9)
+        self.logger.error('Retrying')
+
+        self.assertEqual(self.handler.messages, ['Connection 0 failed',
+                                                 'Connection 1 failed',
+                                                 'Connection 9 failed',
+                                                 'Retrying'])
+        self.assertEqual(storm_filter.rate_limited, 3)
+
+    def test_sampling(self):
+        """Ensure only debug and info records are sampled."""
+        storm_filter = LogStormFilter('StormTest', sample_rate=0.0)
+        self.logger.addFilter(storm_filter)
+
+        self.logger.debug('dropped')
+        self.logger.info('dropped')
+        self.logger.warning('kept')
+        self.assertEqual(self.handler.messages, ['kept'])
+        self.assertEqual(storm_filter.sampled, 2)
+
+    def test_summary(self):
+        """Ensure suppressed records are reported in a summary record."""
+        records = []
+        self.handler.emit = records.append
+        storm_filter = LogStormFilter('StormTest', rate_limit=0.001,
+                                      sample_rate=0.0, summary_interval=0)
+        self.logger.addFilter(storm_filter)
+
+        self.logger.error('Disk full')
+        self.logger.error('Disk full')
+        self.logger.info('sampled')
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1].getMessage(),
+                         'Suppressed 1 log records (1 rate limited, 0 sampled)')
+        self.assertEqual(records[1].levelno, logging.WARNING)
+        self.assertEqual(records[1].fields['templates'],
+                         {'ERROR Disk full': 1})
+
+        storm_filter.close()
+        self.assertEqual(records[2].getMessage(),
+                         'Suppressed 1 log records (0 rate limited, 1 sampled)')
+        self.assertEqual(storm_filter.suppressed, 2)
+
+        storm_filter.close()
+        self.assertEqual(len(records), 3)
+
+
+class HandlerRegistryTestCase(TestCase):
+    def test_reference_counting(self):
+        """Ensure handlers are created once and closed on last release."""
+        registry = HandlerRegistry()
+        created = []
+
+        def factory():
+            created.append(RecordingHandler())
+            return created[-1]
+
+        key = ('test', 'target')
+        handler = registry.acquire(key, factory)
+        self.assertIs(handler, registry.acquire(key, factory))
+        self.assertIs(handler, registry.acquire(key))
+        self.assertEqual(len(created), 1)
+        self.assertEqual(registry.reference_count(key), 3)
+        self.assertRaises(KeyError, registry.acquire, ('test', 'unknown'))
+
+        registry.release(key)
+        registry.release(key)
+        self.assertEqual(registry.reference_count(key), 1)
+        self.assertFalse(handler.closed)
+        registry.release(key)
+        self.assertTrue(handler.closed)
+        self.assertEqual(registry.reference_count(key), 0)
+        registry.release(key)  # releasing an unknown key is harmless
+
+    def test_attach_once_per_logger(self):
+        """Ensure a handler is attached to a logger only once."""
+        registry = HandlerRegistry()
+        logger = logging.getLogger('HandlerRegistryTest')
+        key = ('test', 'attached')
+
+        handler = registry.attach(logger, key, RecordingHandler)
+        registry.attach(logger, key)
+        self.assertEqual(logger.handlers, [handler])
+        self.assertEqual(registry.reference_count(key), 2)
+
+        registry.detach(logger, key)
+        self.assertEqual(logger.handlers, [handler])
+        registry.detach(logger, key)
+        self.assertEqual(logger.handlers, [])
+        self.assertEqual(registry.reference_count(key), 0)
+
+
+    def test_replace(self):
+        """Ensure handlers are replaced at once, keeping those reused."""
+        registry = HandlerRegistry()
+        logger = logging.getLogger('HandlerRegistryReplaceTest')
+        kept = registry.attach(logger, ('test', 'kept'), RecordingHandler)
+        old = registry.attach(logger, ('test', 'old'), RecordingHandler)
+        foreign = RecordingHandler()
+        logger.addHandler(foreign)
+        handlers = logger.handlers
+
+        registry.replace(logger, [('test', 'kept'), ('test', 'old')],
+                         [(('test', 'new'), RecordingHandler),
+                          (('test', 'kept'), RecordingHandler)])
+        new = registry.acquire(('test', 'new'))
+        registry.release(('test', 'new'))
+        self.assertIsNot(logger.handlers, handlers)
+        self.assertEqual(logger.handlers, [foreign, new, kept])
+        self.assertTrue(old.closed)
+        self.assertFalse(kept.closed)
+        self.assertEqual(registry.reference_count(('test', 'kept')), 1)
+
+        registry.detach(logger, ('test', 'kept'))
+        registry.detach(logger, ('test', 'new'))
+        self.assertEqual(logger.handlers, [foreign])
+        logger.removeHandler(foreign)
+
+class AsyncListenerTestCase(TestCase):
+    def test_process_listener(self):
+        """Ensure the process listener is shared and restartable."""
+        listener = log_support.async_listener()
+        self.assertIs(listener, log_support.async_listener())
+        self.assertTrue(listener.running)
+
+        log_support.stop_async_logging()
+        self.assertFalse(listener.running)
+        self.assertIs(listener, log_support.async_listener())
+        self.assertTrue(listener.running)
+        self.assertEqual(log_support.dropped_records(), listener.dropped)
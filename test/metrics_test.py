@@ -0,0 +1,284 @@
+import gc
+import logging
+import math
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from os import path, remove
+from unittest import TestCase
+
+from test.cognate_test_case import CognateTestCase, TEST_OUT
+
+from cognate import metrics
+from cognate.component_core import ComponentCore
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((metrics.METRICS_HOST, 0))
+        return sock.getsockname()[1]
+
+
+def fetch(port, resource='/metrics'):
+    url = 'http://%s:%d%s' % (metrics.METRICS_HOST, port, resource)
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.headers['Content-Type'], response.read().decode()
+
+
+class TestMetrics(TestCase):
+    """Test the thread local accumulation of the metrics."""
+
+    def test_counter(self):
+        """Ensure the counts of all threads are merged, and kept once the
+        threads exit."""
+        counter = metrics.Counter('requests_total')
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        run_threads(work, 4)
+        counter.inc(5)
+        self.assertEqual(counter.snapshot(), 4005)
+        # the cells of the exited threads are folded into the counter
+        self.assertEqual(len(counter._cells), 1)
+        self.assertEqual(counter.snapshot(), 4005)
+
+        with self.assertRaises(ValueError):
+            counter.inc(-1)
+        with self.assertRaises(ValueError):
+            metrics.Counter('requests-total')
+
+    def test_gauge(self):
+        """Ensure a gauge is set against the increments of all threads."""
+        gauge = metrics.Gauge('queue_size')
+        run_threads(lambda: gauge.inc(3), 2)
+        gauge.dec()
+        self.assertEqual(gauge.snapshot(), 5)
+
+        gauge.set(10)
+        self.assertEqual(gauge.snapshot(), 10)
+        run_threads(gauge.dec, 3)
+        self.assertEqual(gauge.snapshot(), 7)
+
+    def test_histogram(self):
+        """Ensure values are counted in cumulative buckets."""
+        histogram = metrics.Histogram('latency_seconds', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        run_threads(lambda: histogram.observe(0.2), 2)
+        with histogram.time():
+            pass
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['buckets'],
+                         [(0.1, 3), (1.0, 6), (math.inf, 7)])
+        self.assertEqual(snapshot['count'], 7)
+        self.assertAlmostEqual(snapshot['sum'], 3.05, places=3)
+
+        with self.assertRaises(ValueError):
+            metrics.Histogram('latency_seconds', buckets=(1.0, 0.1))
+
+    def test_registry(self):
+        """Ensure the metrics of a registry are created once, by name."""
+        registry = metrics.MetricsRegistry()
+        counter = registry.counter('requests_total', 'The requests.')
+        self.assertIs(registry.counter('requests_total'), counter)
+        registry.gauge('queue_size').set(2)
+        counter.inc()
+
+        self.assertEqual(registry.snapshot(),
+                         {'queue_size': 2, 'requests_total': 1})
+        with self.assertRaises(ValueError):
+            registry.histogram('requests_total')
+
+    def test_render(self):
+        """Ensure the metrics are rendered in the Prometheus text format,
+        added together by service name."""
+        first = metrics.MetricsRegistry()
+        second = metrics.MetricsRegistry()
+        shared = metrics.Histogram('emit_seconds', buckets=(0.5,))
+        for registry in (first, second):
+            registry.counter('requests_total', 'The requests.').inc(2)
+            registry.register(shared)
+        shared.observe(0.25)
+
+        text = metrics.render_text([('Api', first), ('Api', second),
+                                    ('Db "1"', first)])
+        self.assertEqual(text.splitlines(), [
+            '# TYPE emit_seconds histogram',
+            'emit_seconds_bucket{service="Api",le="0.5"} 1',
+            'emit_seconds_bucket{service="Api",le="+Inf"} 1',
+            'emit_seconds_sum{service="Api"} 0.25',
+            'emit_seconds_count{service="Api"} 1',
+            'emit_seconds_bucket{service="Db \\"1\\"",le="0.5"} 1',
+            'emit_seconds_bucket{service="Db \\"1\\"",le="+Inf"} 1',
+            'emit_seconds_sum{service="Db \\"1\\""} 0.25',
+            'emit_seconds_count{service="Db \\"1\\""} 1',
+            '# HELP requests_total The requests.',
+            '# TYPE requests_total counter',
+            'requests_total{service="Api"} 4',
+            'requests_total{service="Db \\"1\\""} 2'])
+        self.assertEqual(metrics.MetricsRegistry().render(), '')
+
+
+class TestComponentMetrics(CognateTestCase):
+    """Test the metrics of components."""
+
+    def test_automatic_metrics(self):
+        """Ensure the construction and log output of a component are timed
+        with the metrics timing option."""
+        log_path = path.join(TEST_OUT, 'Measured.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        argv = '--service_name Measured --log_level info --log_path %s ' \
+               '--metrics_timing' % TEST_OUT
+        first = ComponentCore(argv=argv)
+        second = ComponentCore(argv=argv)
+        first.log.info('Measured message')
+        snapshot = first.metrics.snapshot()
+        # the histograms are shared by the components of the service
+        self.assertEqual(snapshot['cognate_construct_seconds']['count'], 2)
+        # the configuration message of each component, and the message
+        self.assertEqual(snapshot['cognate_log_emit_seconds']['count'], 3)
+        for name in ('cognate_construct_seconds', 'cognate_log_emit_seconds'):
+            self.assertIs(second.metrics.histogram(name),
+                          first.metrics.histogram(name))
+
+        # the timer of the logger follows the new log handlers
+        first.reconfigure({'log_path': path.join(TEST_OUT, 'Moved.log')})
+        first.log.info('Moved message')
+        self.assertIsInstance(first.log.handlers[-1], metrics.LogEmitTimer)
+        self.assertEqual(first.metrics.snapshot()[
+            'cognate_log_emit_seconds']['count'], 6)
+        first.close()
+        second.close()
+
+        # a component without log output has no log emit timer
+        foo = ComponentCore(service_name='Unlogged', metrics_timing=True)
+        self.assertEqual(sorted(foo.metrics.snapshot()),
+                         ['cognate_construct_seconds'])
+
+        # nothing is timed without the option
+        bar = ComponentCore(argv='--service_name Untimed --log_level info '
+                                 '--log_path %s' % TEST_OUT)
+        self.assertEqual(len(bar.log.handlers), 1)
+        self.assertEqual(bar.log.filters, [])
+        self.assertEqual(bar.metrics.snapshot(), {})
+        bar.close()
+
+    def test_emit_timing(self):
+        """Ensure the seconds taken by the output handlers are observed."""
+        log_path = path.join(TEST_OUT, 'Slowed.log')
+        foo = ComponentCore(argv='--service_name Slowed --log_level info '
+                                 '--log_path %s --metrics_timing' % log_path)
+        handler = foo.log.handlers[0]
+        emit = handler.emit
+
+        def slow_emit(record):
+            time.sleep(0.05)
+            emit(record)
+
+        handler.emit = slow_emit
+        # a record created long before it is logged is timed from the log call
+        record = foo.log.makeRecord('Slowed', logging.INFO, __file__, 0,
+                                    'Slowed message', (), None)
+        record.created -= 60
+        foo.log.handle(record)
+        foo.close()
+
+        snapshot = foo.metrics.snapshot()['cognate_log_emit_seconds']
+        self.assertEqual(snapshot['count'], 2)
+        self.assertGreaterEqual(snapshot['sum'], 0.05)
+        self.assertLess(snapshot['sum'], 30)
+
+    def test_shared_histogram_release(self):
+        """Ensure the shared histograms are discarded with their
+        components."""
+        keys = [('Released', 'cognate_construct_seconds'),
+                ('Released', 'cognate_log_emit_seconds')]
+        first = ComponentCore(argv='--service_name Released --log_level info '
+                                   '--log_path %s --metrics_timing' % TEST_OUT)
+        second = ComponentCore(argv='--service_name Released --log_level info '
+                                    '--log_path %s --metrics_timing' %
+                                    TEST_OUT)
+        for key in keys:
+            self.assertIn(key, metrics._shared_histograms)
+
+        first.close()
+        del first
+        gc.collect()
+        for key in keys:
+            self.assertIn(key, metrics._shared_histograms)
+
+        second.close()
+        del second
+        gc.collect()
+        for key in keys:
+            self.assertNotIn(key, metrics._shared_histograms)
+
+    def test_lazy_registry(self):
+        """Ensure the registry of a component is created on first access."""
+
+        class Slotted(ComponentCore):
+            SLOTTED_OPTIONS = True
+
+        for foo in (ComponentCore(service_name='Lazy'),
+                    Slotted(service_name='Lazy'), Slotted(service_name='Lazy')):
+            self.assertNotIn('metrics', getattr(foo, '__dict__', {}))
+            registry = foo.metrics
+            self.assertIsInstance(registry, metrics.MetricsRegistry)
+            self.assertIs(foo.metrics, registry)
+
+        # the registry of a slotted instance is held in its slot
+        foo = Slotted(service_name='Lazy')
+        foo.metrics.counter('lazy_total').inc()
+        self.assertEqual(vars(foo), {})
+        self.assertEqual(foo.metrics.snapshot(), {'lazy_total': 1})
+
+    def test_server_imported_on_use(self):
+        """Ensure http.server is not loaded by the import of the package."""
+        output = subprocess.check_output(
+            [sys.executable, '-c',
+             'import sys, cognate; print("http.server" in sys.modules)'],
+            cwd=path.dirname(path.dirname(path.abspath(__file__))))
+        self.assertEqual(output.strip(), b'False')
+
+    def test_metrics_port(self):
+        """Ensure the metrics are served on the metrics port."""
+        port = free_port()
+        foo = ComponentCore(argv='--service_name Served --metrics_port %d' %
+                                 port)
+        bar = ComponentCore(service_name='Exported', metrics_port=port,
+                            metrics_timing=True)
+        foo.metrics.counter('orders_total').inc(7)
+
+        content_type, text = fetch(port)
+        self.assertEqual(content_type, metrics.CONTENT_TYPE)
+        self.assertIn('orders_total{service="Served"} 7\n', text)
+        self.assertIn(
+            'cognate_construct_seconds_count{service="Exported"} 1\n', text)
+        with self.assertRaises(urllib.error.HTTPError):
+            fetch(port, '/unknown')
+
+        bar.close()
+        self.assertNotIn('"Exported"', fetch(port)[1])
+
+        # the server is stopped once no component is served
+        foo.reconfigure({'metrics_port': 0})
+        with self.assertRaises(urllib.error.URLError):
+            fetch(port)
+        foo.close()
@@ -0,0 +1,138 @@
+import gc
+import os
+import sys
+from os import path, remove
+from unittest import skipUnless
+
+from test.cognate_test_case import CognateTestCase, TEST_OUT
+
+from cognate.component_core import ComponentCore
+from cognate.prefork import PreforkRunner
+
+
+class Reporter(ComponentCore):
+    """A component whose workers report their service name and pid."""
+
+    def __init__(self, crash_marker=None, **kwargs):
+        self.crash_marker = crash_marker
+        self.configure_count = 0
+
+        super().__init__(**kwargs)
+
+    def cognate_configure(self, args):
+        self.configure_count += 1
+
+    def report(self):
+        # the first run of a worker crashes while the marker file exists
+        if self.crash_marker and path.exists(self.crash_marker):
+            os.remove(self.crash_marker)
+            os._exit(3)  # pylint: disable=protected-access
+
+        report_path = path.join(TEST_OUT, '%s.report' % self.service_name)
+        with open(report_path, 'w') as report_file:
+            report_file.write('%d %d' % (os.getpid(), self.configure_count))
+        self.log.info('Reported from %s', self.service_name)
+
+
+def read_report(service_name):
+    report_path = path.join(TEST_OUT, '%s.report' % service_name)
+    with open(report_path) as report_file:
+        pid, configure_count = report_file.read().split()
+    os.remove(report_path)
+    return int(pid), int(configure_count)
+
+
+@skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+class TestPreforkRunner(CognateTestCase):
+    """Test the supervised worker processes of the prefork runner."""
+
+    def test_workers(self):
+        """Ensure each worker runs with a derived name and log file."""
+        foo = Reporter(argv='--workers 3 --log_level info --log_path %s' %
+                       TEST_OUT, service_name='Prefork')
+        runner = PreforkRunner(foo, 'report', restart_delay=0)
+        runner.run()
+
+        pids = set()
+        for index in range(3):
+            pid, configure_count = read_report('Prefork-%d' % index)
+            self.assertNotEqual(pid, os.getpid())
+            # the worker derives its name without configuring again
+            self.assertEqual(configure_count, 1)
+            pids.add(pid)
+
+            log_path = path.join(TEST_OUT, 'Prefork-%d.log' % index)
+            with open(log_path) as log_file:
+                self.assertIn('Reported from Prefork-%d' % index,
+                              log_file.read())
+        self.assertEqual(len(pids), 3)
+        self.assertEqual(runner.restarts, 0)
+        self.assertEqual(runner.worker_pids, {})
+        self.assertEqual(foo.service_name, 'Prefork')
+        foo.close()
+
+    def test_restart(self):
+        """Ensure a crashed worker is restarted."""
+        crash_marker = path.join(TEST_OUT, 'prefork.crash')
+        with open(crash_marker, 'w'):
+            pass
+
+        foo = Reporter(crash_marker=crash_marker, workers=1,
+                       service_name='Restarted')
+        runner = PreforkRunner(foo, Reporter.report, restart_delay=0)
+        runner.run()
+
+        self.assertEqual(runner.restarts, 1)
+        self.assertFalse(path.exists(crash_marker))
+        read_report('Restarted-0')
+
+    @skipUnless(sys.version_info >= (3, 7), 'requires gc.freeze')
+    def test_gc_freeze(self):
+        """Ensure the garbage collector is frozen before forking, and
+        unfrozen in the parent once forked."""
+
+        def report_freeze(component):
+            report_path = path.join(TEST_OUT,
+                                    '%s.report' % component.service_name)
+            with open(report_path, 'w') as report_file:
+                report_file.write('%d %d' % (os.getpid(),
+                                             gc.get_freeze_count()))
+
+        foo = Reporter(argv='--workers 1 --gc_freeze',
+                       service_name='Frozen')
+        try:
+            PreforkRunner(foo, report_freeze).run()
+            self.assertEqual(gc.get_freeze_count(), 0)
+        finally:
+            gc.unfreeze()
+        _, freeze_count = read_report('Frozen-0')
+        self.assertGreater(freeze_count, 0)
+
+    def test_buffered_log(self):
+        """Ensure the records buffered before forking are written once."""
+        log_path = path.join(TEST_OUT, 'Buffered.log')
+        if path.exists(log_path):
+            remove(log_path)
+
+        foo = Reporter(argv='--workers 3 --log_level info --log_path %s '
+                            '--log_buffer_size 100' % TEST_OUT,
+                       service_name='Buffered')
+        foo.log.info('Parent pending record')
+        PreforkRunner(foo, 'report', restart_delay=0).run()
+        foo.close()
+
+        with open(log_path) as log_file:
+            content = log_file.read()
+        self.assertEqual(content.count('Logging configured for: Buffered\n'),
+                         1)
+        self.assertEqual(content.count('Parent pending record'), 1)
+        for index in range(3):
+            read_report('Buffered-%d' % index)
+
+    def test_in_process(self):
+        """Ensure the target runs in process without workers."""
+        foo = Reporter(service_name='InProcess')
+        PreforkRunner(foo, 'report').run()
+        pid, configure_count = read_report('InProcess')
+        self.assertEqual(pid, os.getpid())
+        self.assertEqual(configure_count, 1)
@@ -0,0 +1,107 @@
+import os
+import re
+import signal
+import time
+from os import path, remove
+from unittest import skipUnless
+
+from test.cognate_test_case import CognateTestCase, TEST_OUT
+
+from cognate import profiling
+from cognate.component_core import ComponentCore
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestSamplingProfiler(CognateTestCase):
+    """Test the sampling of stacks for registered components."""
+
+    def setUp(self):
+        self.profiler = profiling.sampling_profiler()
+        self.profiler.clear()
+
+    def output_path(self, service_name):
+        output_path = path.join(TEST_OUT, service_name + '.collapsed')
+        if path.exists(output_path):
+            remove(output_path)
+        return output_path
+
+    def test_collapsed_output(self):
+        """Ensure the stacks are written in the collapsed stack format."""
+        output_path = self.output_path('Sampled')
+        foo = ComponentCore(argv='--profile_sample_hz 200 --log_path %s '
+                                 '--service_name Sampled' % TEST_OUT)
+        self.assertTrue(self.profiler.is_registered(foo))
+        busy_work(0.3)
+        foo.close()
+
+        self.assertFalse(self.profiler.is_registered(foo))
+        self.assertGreater(self.profiler.samples, 10)
+        with open(output_path) as output_file:
+            lines = output_file.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            self.assertRegex(line, r'^[^;]+(;[^;]+)+ \d+$')
+
+        busy_lines = [line for line in lines
+                      if line.startswith('MainThread;') and
+                      'busy_work (%s:' % __file__ in line]
+        self.assertTrue(busy_lines)
+        busy_samples = sum(int(line.rpartition(' ')[2])
+                           for line in busy_lines)
+        self.assertGreater(busy_samples, 10)
+
+        # the thread stops once no component is registered
+        self.assertTrue(wait_for(lambda: self.profiler._thread is None))
+
+    @skipUnless(profiling.DUMP_SIGNAL is not None, 'requires SIGUSR1')
+    def test_signal(self):
+        """Ensure the output is written on the dump signal."""
+        output_path = self.output_path('Signaled')
+        foo = ComponentCore(service_name='Signaled', log_path=TEST_OUT,
+                            profile_sample_hz=100)
+        try:
+            busy_work(0.05)
+            os.kill(os.getpid(), profiling.DUMP_SIGNAL)
+            self.assertTrue(wait_for(lambda: path.exists(output_path)))
+        finally:
+            foo.close()
+
+    def test_reconfigure(self):
+        """Ensure sampling follows the reconfigured rate."""
+        log_file = path.join(TEST_OUT, 'Reconfigured.log')
+        output_path = path.join(TEST_OUT, 'Reconfigured.collapsed')
+        if path.exists(output_path):
+            remove(output_path)
+
+        foo = ComponentCore(service_name='Reconfigured', log_path=log_file)
+        self.assertFalse(self.profiler.is_registered(foo))
+        foo.reconfigure({'profile_sample_hz': 50})
+        self.assertTrue(self.profiler.is_registered(foo))
+        foo.reconfigure({'profile_sample_hz': 0})
+        self.assertFalse(self.profiler.is_registered(foo))
+        self.assertTrue(path.exists(output_path))
+        foo.close()
+
+    def test_without_log_path(self):
+        """Ensure a component without a log path has no output file."""
+        foo = ComponentCore(profile_sample_hz=100)
+        self.assertIsNone(self.profiler.write_output(foo))
+        foo.close()
+        self.assertTrue(all(re.match(r'^.+ \d+$', line)
+                            for line in self.profiler.collapsed()))